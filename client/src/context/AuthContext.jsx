@@ -9,9 +9,12 @@ export const AuthProvider = ({ children }) => {
 
   useEffect(() => {
     // 세션 확인
-    const storedUser = localStorage.getItem('user');
-    if (storedUser) {
-      setUser(JSON.parse(storedUser));
+    const storedUser = JSON.parse(localStorage.getItem('user') || 'null');
+    if (storedUser?.token) {
+      setUser(storedUser);
+    } else if (storedUser) {
+      // 토큰 없이 저장된 이전 로그인 정보는 인증에 쓸 수 없으므로 다시 로그인
+      localStorage.removeItem('user');
     }
     setLoading(false);
   }, []);
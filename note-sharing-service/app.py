@@ -7,7 +7,11 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from services.evaluation_scheduler import EvaluationScheduler
+from services.database_service import DatabaseService
+from services import query_stats
 import os
+import signal
+import sys
 
 def create_app():
     """Flask API 앱 생성"""
@@ -40,6 +44,12 @@ def create_app():
     # 설정 초기화
     Config.init_app(app)
     
+    # 요청 단위 DB 트랜잭션 (DB_REQUEST_UNIT_OF_WORK=True 인 경우만)
+    DatabaseService().init_app(app)
+    
+    # 요청별 쿼리 수/DB 시간 계측 (DB_QUERY_STATS=True 인 경우만)
+    query_stats.init_app(app)
+    
     # API 블루프린트 등록
     from routes.api_auth import api_auth_bp
     from routes.api_course import api_course_bp
@@ -128,4 +138,7 @@ if __name__ == '__main__':
     print("  - POST   /api/courses/{id}/week/{week}/generate-custom")
     print("\n✅ 서버 준비 완료!\n")
     
+    # SIGTERM(docker stop)에도 atexit 정리(카운터 flush 등)가 실행되도록 정상 종료 처리
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
     app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+다운로드 스트리밍 벤치마크
+
+로컬 파일을 GCS 대용으로 두고 stream_storage_file 응답을 반복 소비하면서
+RSS(상주 메모리)와 임시 디렉터리/캐시 디렉터리 크기 변화를 출력합니다.
+스트리밍 전송이라면 다운로드 수와 무관하게 RSS가 일정하고 디스크가 늘지 않아야 합니다.
+
+사용법:
+    python benchmarks/bench_download_stream.py [--downloads 10000] [--size-mb 20] [--cached]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from config import Config
+from services.blob_cache import BlobCache
+from utils.file_delivery import stream_storage_file
+
+class LocalBlobStorage:
+    """로컬 파일을 GCS 객체처럼 범위 읽기하는 스토리지 (GCSStorageService와 같은 읽기 인터페이스)"""
+
+    def __init__(self, blob_path: str, cache: BlobCache = None):
+        self.blob_path = blob_path
+        self.cache = cache
+
+    def open_cached(self, gcs_path, content_hash=None):
+        return self.cache.peek(content_hash) if self.cache else None
+
+    def get_blob_info(self, gcs_path):
+        return os.path.getsize(self.blob_path), 1
+
+    def iter_range(self, gcs_path, start, stop, generation=None, chunk_size=None):
+        chunk_size = chunk_size or Config.STORAGE_STREAM_CHUNK_SIZE
+        with open(self.blob_path, 'rb') as f:
+            f.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def iter_and_cache(self, gcs_path, size, generation=None, content_hash=None):
+        # 캐시 미스 경로 측정용: 캐시를 채우지 않고 매번 범위 읽기
+        return self.iter_range(gcs_path, 0, size, generation=generation)
+
+def rss_mb() -> float:
+    """현재 프로세스 RSS (MB, Linux /proc 기준)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def dir_bytes(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+def run(downloads: int, size_mb: int, cached: bool):
+    Config.MATERIAL_DELIVERY_MODE = 'proxy'
+    system_tmp = tempfile.gettempdir()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blob_path = os.path.join(tmp, 'lecture.pdf')
+        with open(blob_path, 'wb') as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(size_mb):
+                f.write(block)
+
+        cache = None
+        if cached:
+            cache = BlobCache(os.path.join(tmp, 'blob_cache'), max_bytes=(size_mb + 1) * 1024 * 1024)
+
+            def fill(temp_path):
+                shutil.copyfile(blob_path, temp_path)
+                return True
+            cache.open('bench', fill).close()
+        storage = LocalBlobStorage(blob_path, cache)
+
+        app = Flask(__name__)
+
+        @app.route('/download')
+        def download():
+            return stream_storage_file(storage, 'storage/lecture.pdf', '벤치마크 1주차 교수.pdf',
+                                       as_attachment=True, content_hash='bench')
+
+        client = app.test_client()
+        expected = size_mb * 1024 * 1024
+        tmp_before = dir_bytes(system_tmp) - dir_bytes(tmp)
+        rss_start = rss_mb()
+        samples = []
+
+        print("=" * 70)
+        print(f"다운로드 스트리밍: {downloads:,}회 × {size_mb}MB ({'디스크 캐시' if cached else 'GCS 범위 읽기'})")
+        print("=" * 70)
+        start = time.perf_counter()
+        for i in range(1, downloads + 1):
+            response = client.get('/download', buffered=False)
+            received = sum(len(chunk) for chunk in response.response)
+            response.close()
+            if received != expected:
+                raise RuntimeError(f'{i}번째 다운로드 크기 불일치: {received} != {expected}')
+            if i % max(downloads // 10, 1) == 0:
+                samples.append(rss_mb())
+                print(f"  {i:>7,}회  RSS {samples[-1]:7.1f}MB")
+        elapsed = time.perf_counter() - start
+        tmp_after = dir_bytes(system_tmp) - dir_bytes(tmp)
+
+        print(f"처리량: {downloads / elapsed:,.0f}회/초, {downloads * size_mb / elapsed:,.0f}MB/초")
+        print(f"RSS: 시작 {rss_start:.1f}MB → 최대 {max(samples):.1f}MB (증가 {max(samples) - rss_start:.1f}MB)")
+        print(f"임시 디렉터리 변화: {(tmp_after - tmp_before) / 1024:+,.0f}KB")
+        # 다른 프로세스의 작은 임시 파일은 허용, 다운로드 한 건 크기 이상 늘면 누수로 판단
+        print("✅ 메모리 일정, 디스크 증가 없음"
+              if max(samples) - rss_start < size_mb and tmp_after - tmp_before < expected else "❌ 증가 감지")
+
+def main():
+    parser = argparse.ArgumentParser(description='다운로드 스트리밍 벤치마크')
+    parser.add_argument('--downloads', type=int, default=10000)
+    parser.add_argument('--size-mb', type=int, default=20)
+    parser.add_argument('--cached', action='store_true', help='디스크 캐시 적중 경로 측정')
+    args = parser.parse_args()
+    run(args.downloads, args.size_mb, args.cached)
+
+if __name__ == '__main__':
+    main()
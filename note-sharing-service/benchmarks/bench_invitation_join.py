@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+초대 링크 동시 참가 벤치마크
+
+임시 DB에 강의/초대 링크를 만든 뒤 여러 스레드가 동시에 use_invitation을 호출하여
+처리량(참가/초), 지연 시간 분포, 등록 누락/초과 여부를 출력합니다.
+
+사용법:
+    python benchmarks/bench_invitation_join.py [--students 200] [--threads 32] [--max-uses -1]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.database_service import DatabaseService
+
+def run(students: int, threads: int, max_uses: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseService(os.path.join(tmp, 'database.db'))
+        course_id = db.add_course({'course_name': '벤치마크', 'professor_id': 'P00001', 'professor_name': '교수'})
+        code = db.create_invitation(course_id, 'P00001', max_uses=max_uses)
+        student_ids = [f'2023{i:05d}' for i in range(students)]
+
+        def join(student_id):
+            start = time.perf_counter()
+            course = db.use_invitation(code, student_id)
+            return course is not None, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(join, student_ids))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency * 1000 for _, latency in results)
+        joined = sum(1 for ok, _ in results if ok)
+        enrolled = len(db.get_enrolled_students(course_id))
+        current_uses = db.get_invitation(code)['current_uses']
+        expected = students if max_uses <= 0 else min(students, max_uses)
+
+        print("=" * 70)
+        print(f"초대 링크 동시 참가: 학생 {students}명, 스레드 {threads}개, max_uses={max_uses}")
+        print("=" * 70)
+        print(f"처리량: {students / elapsed:,.0f}건/초 (총 {elapsed:.2f}초)")
+        print(f"지연 시간: p50 {statistics.median(latencies):.1f}ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f}ms, max {latencies[-1]:.1f}ms")
+        print(f"참가 성공 {joined}건 / 등록 {enrolled}명 / current_uses {current_uses} (기대값 {expected})")
+        print("✅ 누락/초과 없음" if joined == enrolled == current_uses == expected else "❌ 불일치")
+        db.close_all()
+
+def main():
+    parser = argparse.ArgumentParser(description='초대 링크 동시 참가 벤치마크')
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--max-uses', type=int, default=-1)
+    args = parser.parse_args()
+    run(args.students, args.threads, args.max_uses)
+
+if __name__ == '__main__':
+    main()
@@ -11,11 +11,61 @@ class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     DATA_DIR = os.path.join(BASE_DIR, 'data')  # SQLite DB 저장 경로
     
+    # SQLite 설정 (연결 풀 / PRAGMA)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))  # 풀에 유지할 유휴 연결 수 (쓰기/읽기 각각)
+    DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', '5'))  # 잠금 대기 시간 (초)
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))  # 256MB
+    DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))  # 연결당 페이지 캐시 16MB
+    DB_BUSY_RETRIES = int(os.getenv('DB_BUSY_RETRIES', '5'))  # BEGIN IMMEDIATE 잠금 실패 시 재시도 횟수
+    DB_BUSY_RETRY_DELAY = float(os.getenv('DB_BUSY_RETRY_DELAY', '0.05'))  # 재시도 기본 대기 (초, 지수 증가 + 지터)
+    # 요청당 하나의 트랜잭션 (첫 쓰기부터 요청 종료까지 쓰기 잠금 유지 - 업로드 중 GCS 작업 시간도 포함)
+    DB_REQUEST_UNIT_OF_WORK = os.getenv('DB_REQUEST_UNIT_OF_WORK', 'False') == 'True'
+    DB_QUERY_STATS = os.getenv('DB_QUERY_STATS', 'False') == 'True'  # 쿼리 수/시간 계측 (SQL 원문을 모으므로 필요할 때만)
+    DB_SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '100'))  # 이 시간 이상 걸린 쿼리는 실행 계획과 함께 로그
+    DB_QUERY_WARN_COUNT = int(os.getenv('DB_QUERY_WARN_COUNT', '30'))  # 요청당 쿼리 수가 이 값 이상이면 경고 (N+1 의심)
+    DB_READ_CACHE_MAX_ENTRIES = int(os.getenv('DB_READ_CACHE_MAX_ENTRIES', '4096'))  # 사용자/강의/주차 캐시 크기
+    DB_READ_CACHE_TTL = float(os.getenv('DB_READ_CACHE_TTL', '300'))  # 캐시 유효 시간 (초)
+    
+    # 조회/다운로드 수 write-behind 설정
+    SEEN_CACHE_MAX_ENTRIES = int(os.getenv('SEEN_CACHE_MAX_ENTRIES', '50000'))  # 최근 조회/다운로드 (자료, 사용자) 쌍
+    SEEN_CACHE_TTL = float(os.getenv('SEEN_CACHE_TTL', '3600'))
+    COUNTER_FLUSH_INTERVAL = float(os.getenv('COUNTER_FLUSH_INTERVAL', '5'))  # flush 주기 = 최대 유실 구간 (초), 0이면 즉시 반영
+    COUNTER_MAX_PENDING = int(os.getenv('COUNTER_MAX_PENDING', '1000'))  # 대기 자료 수가 이 값을 넘으면 즉시 flush
+    
+    # 목록 페이지네이션 설정 (?limit=&cursor=)
+    SEARCH_LIMIT_DEFAULT = int(os.getenv('SEARCH_LIMIT_DEFAULT', '20'))  # 검색 결과 기본 개수
+    SEARCH_LIMIT_MAX = int(os.getenv('SEARCH_LIMIT_MAX', '100'))
+    SEARCH_REINDEX_BATCH_DEFAULT = int(os.getenv('SEARCH_REINDEX_BATCH_DEFAULT', '50'))  # 재색인 요청당 자료 수
+    SEARCH_REINDEX_BATCH_MAX = int(os.getenv('SEARCH_REINDEX_BATCH_MAX', '200'))
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', '50'))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '200'))
+    
     # GCS 설정
     GCS_BUCKET = os.getenv('GCS_BUCKET', 'note-sharing-files')
     
+    # 스토리지 로컬 디스크 캐시 (GCS 읽기 앞단)
+    BLOB_CACHE_ENABLED = os.getenv('BLOB_CACHE_ENABLED', 'True') == 'True'
+    BLOB_CACHE_DIR = os.getenv('BLOB_CACHE_DIR', os.path.join(DATA_DIR, 'blob_cache'))
+    BLOB_CACHE_MAX_BYTES = int(os.getenv('BLOB_CACHE_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))  # 2GB
+    STORAGE_STREAM_CHUNK_SIZE = int(os.getenv('STORAGE_STREAM_CHUNK_SIZE', str(1024 * 1024)))  # 스트리밍 전송 시 GCS 범위 읽기 단위 (바이트)
+    
+    # 자료 전송 방식: proxy(서버가 파일을 직접 전송) / redirect(짧은 수명의 서명 URL로 302)
+    MATERIAL_DELIVERY_MODE = os.getenv('MATERIAL_DELIVERY_MODE', 'proxy')
+    SIGNED_URL_REDIRECT_TTL = int(os.getenv('SIGNED_URL_REDIRECT_TTL', '300'))  # redirect 모드 서명 URL 유효 시간 (초)
+    
+    # 썸네일 서명 URL / 조건부 GET 설정
+    THUMBNAIL_URL_EXPIRATION = int(os.getenv('THUMBNAIL_URL_EXPIRATION', '3600'))  # 썸네일 서명 URL 유효 시간 (초)
+    SIGNED_URL_CACHE_MAX_ENTRIES = int(os.getenv('SIGNED_URL_CACHE_MAX_ENTRIES', '50000'))  # 재사용할 서명 URL 수
+    THUMBNAIL_MAX_AGE = int(os.getenv('THUMBNAIL_MAX_AGE', '300'))  # 썸네일 목록 브라우저 캐시 시간 (초)
+    THUMBNAIL_RETRY_INTERVAL = int(os.getenv('THUMBNAIL_RETRY_INTERVAL', '300'))  # 실패한 썸네일 페이지 첫 재시도 간격 (초, 실패마다 2배)
+    THUMBNAIL_RETRY_MAX_INTERVAL = int(os.getenv('THUMBNAIL_RETRY_MAX_INTERVAL', str(24 * 3600)))
+    MATERIAL_MAX_AGE = int(os.getenv('MATERIAL_MAX_AGE', '3600'))  # 내용 해시가 있는 자료 PDF 브라우저 캐시 시간 (초)
+    
     # Flask 설정
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    AUTH_TOKEN_MAX_AGE = int(os.getenv('AUTH_TOKEN_MAX_AGE', str(7 * 24 * 3600)))  # 로그인 토큰 유효 시간 (초)
+    # 서명 없는 X-User-ID/Role/Email 헤더 인증 허용 (로컬 개발 전용, 누구나 위조 가능하므로 운영에서는 끔)
+    AUTH_ALLOW_HEADER_IDENTITY = os.getenv('AUTH_ALLOW_HEADER_IDENTITY', 'False') == 'True'
     DEBUG = os.getenv('DEBUG', 'True') == 'True'
     
     # 세션 설정 (크로스 도메인 허용)
@@ -27,6 +77,10 @@ class Config:
     # 파일 업로드 설정
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB
     ALLOWED_EXTENSIONS = {'pdf'}
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', '4'))  # 업로드 중 GCS 저장/썸네일 렌더링/업로드 병렬 스레드 수
+    INGEST_CHUNK_SIZE = int(os.getenv('INGEST_CHUNK_SIZE', str(1024 * 1024)))  # 업로드 스트림 읽기 단위 (바이트)
+    INGEST_UPLOAD_QUEUE_CHUNKS = int(os.getenv('INGEST_UPLOAD_QUEUE_CHUNKS', '8'))  # GCS 전송 대기 chunk 수 (업로드당 메모리 상한)
+    INGEST_SPOOL_DIR = os.getenv('INGEST_SPOOL_DIR') or None  # 검증/렌더링용 업로드 임시 파일 위치 (기본: 시스템 임시 디렉터리)
     
     # PDF 이미지 변환 설정
     PDF_IMAGE_DPI = 150  # 해상도
@@ -1,210 +1,313 @@
 # -*- coding: utf-8 -*-
 """
 JSON 파일을 SQLite로 마이그레이션하는 스크립트
+
+- JSON 배열을 스트리밍으로 읽어 batch 단위 executemany (파일 전체를 메모리에 올리지 않음)
+- batch 하나 = 트랜잭션 하나, 진행 위치(migration_progress)도 같은 트랜잭션에 기록
+  → 중단 후 다시 실행하면 마지막으로 커밋된 위치부터 이어서 적재 (--restart로 처음부터)
+- 적재 중에는 보조 인덱스를 지우고 PRAGMA를 완화했다가, 끝난 뒤 인덱스를 한 번에 생성
+
+사용법:
+    python migrate_to_sqlite.py [--batch-size 10000] [--restart] [--data-dir data] [--db data/database.db]
 """
-import json
+import argparse
+import itertools
 import os
+import sqlite3
+import time
 from services.database_service import DatabaseService
+from utils.json_stream import iter_json_array
+
+# 적재 대상 테이블 (보조 인덱스를 적재 후 생성)
+LOAD_TABLES = ('users', 'courses', 'course_enrollments', 'course_weeks',
+               'materials', 'custom_pdfs', 'custom_pdf_pages', 'notifications')
+
+def _normalize_path(file_path):
+    """file_path(윈도우 구분자 포함 가능)를 gcs_path로 변환"""
+    return file_path.replace('\\', '/') if file_path else ''
+
+def _user_rows(user):
+    return [(user['user_id'], user['email'], user['password'],
+             user['name'], user['role'], user.get('student_id'))]
+
+def _course_rows(course):
+    return [(course['course_id'], course['course_name'], course['professor_id'],
+             course['professor_name'])]
+
+def _enrollment_rows(course):
+    # 수강 학생 등록
+    return [(course['course_id'], student_id) for student_id in course.get('enrolled_students', [])]
+
+def _week_rows(course):
+    # weeks 정보 마이그레이션
+    return [(course['course_id'], int(week_str), week_info.get('upload_deadline'),
+             week_info.get('evaluation_status', 'pending'))
+            for week_str, week_info in course.get('weeks', {}).items()]
+
+def _material_rows(material):
+    # type 결정
+    mat_type = 'professor' if material.get('is_professor_material', False) else 'student'
+    return [(material['material_id'], material['course_id'], material['week'],
+             mat_type, material['uploader_id'], material['uploader_name'],
+             material.get('file_name', material.get('filename', '')),
+             _normalize_path(material.get('file_path', '')), material.get('page_count', 0),
+             material.get('upload_date'), material.get('download_count', 0),
+             material.get('view_count', 0), material.get('evaluation_score'),
+             1 if material.get('evaluation_completed', False) else 0)]
+
+def _custom_pdf_rows(pdf):
+    # title 필드 (file_name이나 title)
+    title = pdf.get('title', pdf.get('file_name', 'untitled.pdf'))
+    return [(pdf['custom_pdf_id'], pdf['student_id'], pdf['course_id'],
+             pdf['week'], title, _normalize_path(pdf.get('file_path', '')), pdf.get('page_count', 0),
+             pdf.get('created_at'))]
+
+def _custom_pdf_page_clear_rows(pdf):
+    # 다시 적재해도 페이지가 중복되지 않도록 기존 페이지 삭제
+    return [(pdf['custom_pdf_id'],)]
+
+def _custom_pdf_page_rows(pdf):
+    # 선택된 페이지 정보 (material_id와 page_number 필드명이 다를 수 있음)
+    rows = []
+    selected_pages = pdf.get('selected_pages', pdf.get('page_selections', []))
+    for idx, page_info in enumerate(selected_pages):
+        mat_id = page_info.get('material_id', page_info.get('source_material_id'))
+        page_num = page_info.get('page_number', page_info.get('page_num', 1))
+        if mat_id:
+            rows.append((pdf['custom_pdf_id'], mat_id, page_num, idx))
+    return rows
+
+def _notification_rows(notif):
+    # type 필드가 없으면 'general'로 설정
+    return [(notif['notification_id'], notif['user_id'], notif['message'],
+             notif.get('type', 'general'), notif.get('related_id'),
+             1 if notif.get('is_read', False) else 0,
+             notif.get('created_at'))]
+
+# (이름, 파일명, 최상위 키, [(SQL, 항목 → 행 목록 함수)])
+SOURCES = [
+    ('users', 'users.json', 'users', [
+        ('''INSERT OR REPLACE INTO users
+            (user_id, email, password, name, role, student_id)
+            VALUES (?, ?, ?, ?, ?, ?)''', _user_rows),
+    ]),
+    ('courses', 'courses.json', 'courses', [
+        ('''INSERT OR REPLACE INTO courses
+            (course_id, course_name, professor_id, professor_name)
+            VALUES (?, ?, ?, ?)''', _course_rows),
+        ('''INSERT OR IGNORE INTO course_enrollments (course_id, student_id)
+            VALUES (?, ?)''', _enrollment_rows),
+        ('''INSERT OR REPLACE INTO course_weeks
+            (course_id, week, upload_deadline, evaluation_status)
+            VALUES (?, ?, ?, ?)''', _week_rows),
+    ]),
+    ('materials', 'materials.json', 'materials', [
+        ('''INSERT OR REPLACE INTO materials
+            (material_id, course_id, week, type, uploader_id, uploader_name,
+             filename, gcs_path, page_count, upload_date, download_count, view_count,
+             evaluation_score, evaluation_completed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', _material_rows),
+    ]),
+    ('custom_pdfs', 'custom_pdfs.json', 'custom_pdfs', [
+        ('''INSERT OR REPLACE INTO custom_pdfs
+            (custom_pdf_id, student_id, course_id, week, title, gcs_path, page_count, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', _custom_pdf_rows),
+        ('DELETE FROM custom_pdf_pages WHERE custom_pdf_id = ?', _custom_pdf_page_clear_rows),
+        ('''INSERT INTO custom_pdf_pages
+            (custom_pdf_id, material_id, page_number, order_index)
+            VALUES (?, ?, ?, ?)''', _custom_pdf_page_rows),
+    ]),
+    ('notifications', 'notifications.json', 'notifications', [
+        ('''INSERT OR REPLACE INTO notifications
+            (notification_id, user_id, message, type, related_id, is_read, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)''', _notification_rows),
+    ]),
+]
+
+class BulkImporter:
+    """스트리밍 + batch 트랜잭션 + 재개 가능한 JSON → SQLite 적재기"""
+
+    def __init__(self, db: DatabaseService, data_dir: str = 'data', batch_size: int = 10000):
+        self.db = db
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+
+        # 풀과 별도의 적재 전용 연결 (완화된 PRAGMA가 앱 연결에 남지 않도록)
+        self.conn = sqlite3.connect(db.pool.db_path, isolation_level=None)
+        self.conn.execute('PRAGMA synchronous=OFF')       # 중단 시에도 진행 위치부터 다시 적재하면 되므로 fsync 생략
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA cache_size=-262144')    # 256MB
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS migration_progress (
+                source TEXT PRIMARY KEY,
+                rows_done INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def close(self):
+        self.conn.close()
+
+    def reset_progress(self):
+        """진행 위치 초기화 (처음부터 다시 적재)"""
+        self.conn.execute('DELETE FROM migration_progress')
+
+    def _get_progress(self, source: str):
+        row = self.conn.execute(
+            'SELECT rows_done, completed FROM migration_progress WHERE source = ?', (source,)
+        ).fetchone()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def _save_progress(self, source: str, rows_done: int, completed: bool = False):
+        self.conn.execute('''
+            INSERT INTO migration_progress (source, rows_done, completed, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(source) DO UPDATE SET
+                rows_done = excluded.rows_done,
+                completed = excluded.completed,
+                updated_at = excluded.updated_at
+        ''', (source, rows_done, 1 if completed else 0))
 
-def migrate_users(db: DatabaseService):
-    """사용자 데이터 마이그레이션"""
-    print("📋 사용자 데이터 마이그레이션 중...")
-    
-    with open('data/users.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    users = data.get('users', [])
-    
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        for user in users:
-            cursor.execute('''
-                INSERT OR REPLACE INTO users 
-                (user_id, email, password, name, role, student_id)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (user['user_id'], user['email'], user['password'], 
-                  user['name'], user['role'], user.get('student_id')))
-    
-    print(f"  ✅ {len(users)}명의 사용자 마이그레이션 완료")
-
-def migrate_courses(db: DatabaseService):
-    """강의 데이터 마이그레이션"""
-    print("📋 강의 데이터 마이그레이션 중...")
-    
-    with open('data/courses.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    courses = data.get('courses', [])
-    
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        for course in courses:
-            # 수강 학생 리스트를 문자열로 변환
-            students_str = ','.join(course.get('enrolled_students', []))
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO courses 
-                (course_id, course_name, professor_id, professor_name, enrolled_students)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (course['course_id'], course['course_name'], course['professor_id'],
-                  course['professor_name'], students_str))
-            
-            # weeks 정보 마이그레이션
-            weeks = course.get('weeks', {})
-            for week_str, week_info in weeks.items():
-                week_num = int(week_str)
-                deadline = week_info.get('upload_deadline')
-                status = week_info.get('evaluation_status', 'pending')
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO course_weeks 
-                    (course_id, week, upload_deadline, evaluation_status)
-                    VALUES (?, ?, ?, ?)
-                ''', (course['course_id'], week_num, deadline, status))
-    
-    print(f"  ✅ {len(courses)}개의 강의 마이그레이션 완료")
-
-def migrate_materials(db: DatabaseService):
-    """자료 데이터 마이그레이션"""
-    print("📋 자료 데이터 마이그레이션 중...")
-    
-    with open('data/materials.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    materials = data.get('materials', [])
-    
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        for material in materials:
-            # file_path를 gcs_path로 변환
-            # storage/professor/... -> storage/professor/...
-            file_path = material.get('file_path', '')
-            gcs_path = file_path.replace('\\', '/') if file_path else ''
-            
-            # type 결정
-            mat_type = 'professor' if material.get('is_professor_material', False) else 'student'
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO materials 
-                (material_id, course_id, week, type, uploader_id, uploader_name, 
-                 filename, gcs_path, page_count, upload_date, download_count, view_count,
-                 evaluation_score, evaluation_completed)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (material['material_id'], material['course_id'], material['week'],
-                  mat_type, material['uploader_id'], material['uploader_name'],
-                  material.get('file_name', material.get('filename', '')), gcs_path, material.get('page_count', 0),
-                  material.get('upload_date'), material.get('download_count', 0),
-                  material.get('view_count', 0), material.get('evaluation_score'),
-                  1 if material.get('evaluation_completed', False) else 0))
-    
-    print(f"  ✅ {len(materials)}개의 자료 마이그레이션 완료")
-
-def migrate_custom_pdfs(db: DatabaseService):
-    """나만의 PDF 데이터 마이그레이션"""
-    print("📋 나만의 PDF 데이터 마이그레이션 중...")
-    
-    with open('data/custom_pdfs.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    custom_pdfs = data.get('custom_pdfs', [])
-    
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        for pdf in custom_pdfs:
-            # file_path를 gcs_path로 변환
-            file_path = pdf.get('file_path', '')
-            gcs_path = file_path.replace('\\', '/') if file_path else ''
-            
-            # title 필드 (file_name이나 title)
-            title = pdf.get('title', pdf.get('file_name', 'untitled.pdf'))
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO custom_pdfs 
-                (custom_pdf_id, student_id, course_id, week, title, gcs_path, page_count, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (pdf['custom_pdf_id'], pdf['student_id'], pdf['course_id'],
-                  pdf['week'], title, gcs_path, pdf.get('page_count', 0),
-                  pdf.get('created_at')))
-            
-            # 선택된 페이지 정보
-            selected_pages = pdf.get('selected_pages', pdf.get('page_selections', []))
-            for idx, page_info in enumerate(selected_pages):
-                # material_id와 page_number 필드명이 다를 수 있음
-                mat_id = page_info.get('material_id', page_info.get('source_material_id'))
-                page_num = page_info.get('page_number', page_info.get('page_num', 1))
-                
-                if mat_id:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO custom_pdf_pages 
-                        (custom_pdf_id, material_id, page_number, order_index)
-                        VALUES (?, ?, ?, ?)
-                    ''', (pdf['custom_pdf_id'], mat_id, page_num, idx))
-    
-    print(f"  ✅ {len(custom_pdfs)}개의 커스텀 PDF 마이그레이션 완료")
-
-def migrate_notifications(db: DatabaseService):
-    """알림 데이터 마이그레이션"""
-    print("📋 알림 데이터 마이그레이션 중...")
-    
-    with open('data/notifications.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    notifications = data.get('notifications', [])
-    
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        for notif in notifications:
-            # type 필드가 없으면 'general'로 설정
-            notif_type = notif.get('type', 'general')
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO notifications 
-                (notification_id, user_id, message, type, related_id, is_read, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (notif['notification_id'], notif['user_id'], notif['message'],
-                  notif_type, notif.get('related_id'), 
-                  1 if notif.get('is_read', False) else 0,
-                  notif.get('created_at')))
-    
-    print(f"  ✅ {len(notifications)}개의 알림 마이그레이션 완료")
+    def drop_indexes(self):
+        """적재 대상 테이블의 보조 인덱스 삭제 (PK/UNIQUE 자동 인덱스는 유지)"""
+        placeholders = ','.join('?' * len(LOAD_TABLES))
+        names = [row[0] for row in self.conn.execute(f'''
+            SELECT name FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+        ''', LOAD_TABLES)]
+        for name in names:
+            self.conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        return names
+
+    def import_source(self, name: str, filename: str, key: str, statements) -> int:
+        """JSON 파일 하나를 batch 트랜잭션으로 적재, 적재한 항목 수 반환"""
+        path = os.path.join(self.data_dir, filename)
+        done, completed = self._get_progress(name)
+        if completed:
+            print(f"⏭️  {name}: 이미 완료됨 ({done:,}건)")
+            return 0
+        if not os.path.exists(path):
+            print(f"⚠️  {name}: {path} 파일이 없어 건너뜀")
+            return 0
+
+        print(f"📋 {name} 마이그레이션 중..." + (f" ({done:,}건 이후부터 재개)" if done else ""))
+        items = itertools.islice(iter_json_array(path, key), done, None)
+        start = time.perf_counter()
+        imported = rows = 0
+
+        while True:
+            batch = list(itertools.islice(items, self.batch_size))
+            if not batch:
+                break
+
+            self.conn.execute('BEGIN')
+            try:
+                for sql, row_func in statements:
+                    params = [row for item in batch for row in row_func(item)]
+                    if params:
+                        self.conn.executemany(sql, params)
+                        rows += len(params)
+                done += len(batch)
+                self._save_progress(name, done)
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+
+            imported += len(batch)
+            elapsed = time.perf_counter() - start
+            print(f"  ... {done:,}건 커밋 ({imported / elapsed:,.0f}건/초, {rows / elapsed:,.0f}행/초)")
+
+        self._save_progress(name, done, completed=True)
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"  ✅ {imported:,}건 ({rows:,}행) 마이그레이션 완료 - "
+              f"{elapsed:.1f}초, {imported / elapsed:,.0f}건/초, {rows / elapsed:,.0f}행/초")
+        return imported
+
+    def run(self, restart: bool = False):
+        """전체 적재 (인덱스 삭제 → 소스별 적재 → 인덱스 생성 → 시퀀스 동기화)"""
+        if restart:
+            self.reset_progress()
+
+        dropped = self.drop_indexes()
+        if dropped:
+            print(f"🔧 적재 동안 보조 인덱스 {len(dropped)}개 제거")
+
+        start = time.perf_counter()
+        total = sum(self.import_source(*source) for source in SOURCES)
+        load_elapsed = time.perf_counter() - start
+
+        # 인덱스는 적재가 모두 끝난 뒤 한 번에 생성
+        # (중간에 중단되더라도 DatabaseService 초기화 시 IF NOT EXISTS로 다시 생성됨)
+        print("🔧 인덱스 생성 중...")
+        index_start = time.perf_counter()
+        self.db.create_indexes()
+        print(f"  ✅ 인덱스 생성 완료 ({time.perf_counter() - index_start:.1f}초)")
+
+        # ID를 직접 지정해 넣었으므로 시퀀스를 기존 최대 번호에 맞춤
+        self.db.sync_id_sequences()
+
+        # 마감일 문자열만 옮겼으므로 epoch 컬럼은 적재 후 한 번에 채움
+        self.db.sync_deadline_timestamps()
+
+        # INSERT OR REPLACE는 DELETE 트리거를 거치지 않으므로 주차 요약/검색 메타데이터는 다시 생성
+        self.db.rebuild_week_summary()
+        self.db.rebuild_search_metadata()
+
+        # 완화된 PRAGMA로 쓴 내용을 DB 파일에 반영
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        print(f"📊 총 {total:,}건, 적재 {load_elapsed:.1f}초 "
+              f"({total / max(load_elapsed, 1e-9):,.0f}건/초)")
+        return total
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description='JSON → SQLite 마이그레이션')
+    parser.add_argument('--data-dir', default='data', help='JSON 파일 디렉토리')
+    parser.add_argument('--db', default='data/database.db', help='SQLite DB 파일 경로')
+    parser.add_argument('--batch-size', type=int, default=10000, help='트랜잭션당 항목 수')
+    parser.add_argument('--restart', action='store_true', help='진행 위치를 무시하고 처음부터 적재')
+    args = parser.parse_args()
+
     print("=" * 70)
     print("JSON → SQLite 마이그레이션 시작")
     print("=" * 70)
     print()
-    
+
     # DatabaseService 초기화 (테이블 자동 생성)
-    db = DatabaseService('data/database.db')
+    db = DatabaseService(args.db)
     print("✅ SQLite 데이터베이스 초기화 완료")
     print()
-    
+
+    importer = BulkImporter(db, data_dir=args.data_dir, batch_size=args.batch_size)
     try:
-        # 각 데이터 마이그레이션
-        migrate_users(db)
-        migrate_courses(db)
-        migrate_materials(db)
-        migrate_custom_pdfs(db)
-        migrate_notifications(db)
-        
+        importer.run(restart=args.restart)
+
         print()
         print("=" * 70)
         print("✅ 모든 데이터 마이그레이션 완료!")
         print("=" * 70)
         print()
-        print(f"SQLite DB 파일: {os.path.abspath('data/database.db')}")
+        print(f"SQLite DB 파일: {os.path.abspath(args.db)}")
         print()
         print("다음 단계:")
         print("1. SQLite DB 확인: sqlite3 data\\database.db")
         print("2. storage 폴더를 GCS에 업로드: gsutil -m rsync -r storage\\ gs://note-sharing-files\\storage\\")
         print("3. update_routes.py 실행하여 코드 변경")
         print()
-        
+
+    except KeyboardInterrupt:
+        print()
+        print("⏸️  중단됨 - 다시 실행하면 마지막으로 커밋된 위치부터 이어서 적재합니다.")
     except Exception as e:
         print(f"❌ 오류 발생: {str(e)}")
+        print("   원인을 해결한 뒤 다시 실행하면 마지막으로 커밋된 위치부터 이어서 적재합니다.")
         import traceback
         traceback.print_exc()
+    finally:
+        importer.close()
+        db.close_all()
 
 if __name__ == '__main__':
     main()
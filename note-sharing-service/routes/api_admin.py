@@ -4,9 +4,16 @@
 """
 from flask import Blueprint, request, jsonify
 from services.database_service import DatabaseService
+from services.query_stats import query_stats
+from services.gcs_storage_service import GCSStorageService
+from services.pdf_service import PDFService
+from utils.auth_middleware import check_auth
+from config import Config
 
 api_admin_bp = Blueprint('api_admin', __name__)
 db = DatabaseService()
+storage = GCSStorageService()
+pdf_service = PDFService()
 
 @api_admin_bp.route('/users', methods=['GET', 'OPTIONS'])
 def get_all_users():
@@ -30,6 +37,86 @@ def get_all_courses():
         'courses': courses
     }), 200
 
+@api_admin_bp.route('/cache-stats', methods=['GET', 'OPTIONS'])
+def get_cache_stats():
+    """DB 읽기 캐시 / 스토리지 디스크 캐시 통계 (적중/미스, 교수만)"""
+    auth_result = check_auth(required_role='professor')
+    if auth_result:
+        return auth_result
+    
+    return jsonify({
+        'success': True,
+        'cache': db.get_cache_stats(),
+        'blob_cache': storage.get_cache_stats(),
+        'signed_url_cache': storage.get_signed_url_stats()
+    }), 200
+
+@api_admin_bp.route('/query-stats', methods=['GET', 'OPTIONS'])
+def get_query_stats():
+    """엔드포인트/메서드별 쿼리 수, DB 시간, 느린 쿼리 목록 (교수만, DB_QUERY_STATS=True 인 경우 수집)"""
+    auth_result = check_auth(required_role='professor')
+    if auth_result:
+        return auth_result
+    
+    return jsonify({
+        'success': True,
+        'enabled': Config.DB_QUERY_STATS,
+        'stats': query_stats.snapshot()
+    }), 200
+
+@api_admin_bp.route('/query-stats/reset', methods=['POST', 'OPTIONS'])
+def reset_query_stats():
+    """쿼리 통계 초기화 (교수만)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    auth_result = check_auth(required_role='professor')
+    if auth_result:
+        return auth_result
+    
+    query_stats.reset()
+    return jsonify({'success': True, 'message': '쿼리 통계가 초기화되었습니다.'}), 200
+
+@api_admin_bp.route('/search/reindex', methods=['POST', 'OPTIONS'])
+def reindex_search():
+    """본문이 아직 색인되지 않은 기존 자료 색인 (교수만, 요청당 최대 limit개 - SEARCH_REINDEX_BATCH_MAX까지)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    auth_result = check_auth(required_role='professor')
+    if auth_result:
+        return auth_result
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        limit = int(data.get('limit', Config.SEARCH_REINDEX_BATCH_DEFAULT))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'limit은 숫자여야 합니다.'}), 400
+    if limit < 1:
+        return jsonify({'success': False, 'message': 'limit은 1 이상이어야 합니다.'}), 400
+    limit = min(limit, Config.SEARCH_REINDEX_BATCH_MAX)
+    
+    indexed = []
+    errors = []
+    for material in db.get_unindexed_materials(limit=limit):
+        try:
+            pdf_data = storage.download_to_memory(material['gcs_path'], material.get('content_hash'))
+            if not pdf_data:
+                raise ValueError('GCS 다운로드 실패')
+            pages = db.index_material_pages(material['material_id'], pdf_service.extract_page_texts(pdf_data))
+            indexed.append({'material_id': material['material_id'], 'pages': pages})
+        except Exception as e:
+            errors.append({'material_id': material['material_id'], 'error': str(e)})
+    
+    return jsonify({
+        'success': True,
+        'indexed': len(indexed),
+        'errors': len(errors),
+        'materials': indexed,
+        'error_details': errors,
+        'remaining': len(db.get_unindexed_materials(limit=1)) > 0
+    }), 200
+
 @api_admin_bp.route('/seed-users', methods=['POST', 'OPTIONS'])
 def seed_users():
     """사용자 대량 생성"""
@@ -39,15 +126,8 @@ def seed_users():
     data = request.get_json()
     users = data.get('users', [])
     
-    created = []
-    errors = []
-    
-    for user_data in users:
-        try:
-            user_id = db.create_user(user_data)
-            created.append({'user_id': user_id, 'email': user_data['email']})
-        except ValueError as e:
-            errors.append({'email': user_data.get('email'), 'error': str(e)})
+    # 검증/ID 발급/INSERT를 한 트랜잭션으로 처리 (행별 오류는 error_details로 반환)
+    created, errors = db.seed_users(users)
     
     return jsonify({
         'success': True,
@@ -66,50 +146,8 @@ def seed_courses():
     data = request.get_json()
     courses = data.get('courses', [])
     
-    created = []
-    errors = []
-    
-    for course_data in courses:
-        try:
-            # 교수 확인
-            professor = db.get_user_by_email(course_data.get('professor_email'))
-            if not professor:
-                errors.append({'course': course_data.get('course_name'), 'error': '교수를 찾을 수 없음'})
-                continue
-            
-            # 강의 생성
-            course = {
-                'course_name': course_data['course_name'],
-                'professor_id': professor['user_id'],
-                'professor_name': professor['name'],
-                'enrolled_students': []
-            }
-            
-            course_id = db.add_course(course)
-            
-            # 주차별 마감일 설정 (옵션)
-            if 'deadline' in course_data and 'weeks' in course_data:
-                for week in range(1, course_data['weeks'] + 1):
-                    db.set_week_deadline(course_id, week, course_data['deadline'])
-            
-            # 초대 코드 생성 (옵션)
-            invitation_code = None
-            if course_data.get('create_invitation', False):
-                invitation_code = db.create_invitation(
-                    course_id=course_id,
-                    created_by=professor['user_id'],
-                    expires_at=None,
-                    max_uses=-1
-                )
-            
-            created.append({
-                'course_id': course_id,
-                'course_name': course_data['course_name'],
-                'invitation_code': invitation_code
-            })
-            
-        except Exception as e:
-            errors.append({'course': course_data.get('course_name'), 'error': str(e)})
+    # 강의/주차 마감일/초대 코드를 한 트랜잭션으로 생성 (행별 오류는 error_details로 반환)
+    created, errors = db.seed_courses(courses)
     
     return jsonify({
         'success': True,
@@ -140,10 +178,12 @@ def reset_db():
     if os.path.exists(flag_file):
         os.remove(flag_file)
     
-    # DB 파일 삭제
+    # 풀에 남아있는 연결 정리 후 DB 파일 삭제 (WAL/SHM 포함)
+    db.close_all()
     db_file = os.path.join(Config.DATA_DIR, 'database.db')
-    if os.path.exists(db_file):
-        os.remove(db_file)
+    for path in (db_file, db_file + '-wal', db_file + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
     
     return jsonify({
         'success': True,
@@ -4,6 +4,7 @@ API 인증 라우트 (JSON 응답)
 """
 from flask import Blueprint, request, jsonify, session
 from services.database_service import DatabaseService
+from utils.auth_middleware import check_auth, issue_token, get_current_user_record
 
 api_auth_bp = Blueprint('api_auth', __name__)
 db = DatabaseService()
@@ -106,6 +107,8 @@ def login():
         
         # 비밀번호 제외하고 반환
         user_data = {k: v for k, v in user.items() if k != 'password'}
+        # 클라이언트는 user를 그대로 저장하고 user.token을 Authorization: Bearer <token> 으로 전송
+        user_data['token'] = issue_token(user)
         
         return jsonify({
             'success': True,
@@ -140,8 +143,7 @@ def get_current_user():
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
-    user = db.get_user_by_id(user_id)
+    user = get_current_user_record()
     
     if user:
         user_data = {k: v for k, v in user.items() if k != 'password'}
@@ -2,9 +2,12 @@
 """
 API 강의 라우트 (JSON 응답) - SQLite + GCS 버전
 """
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify
 from services.database_service import DatabaseService
-from utils.auth_middleware import check_auth
+from utils.auth_middleware import check_auth, check_course_access, get_current_user
+from utils.pagination import get_page_args, encode_cursor
+from utils.http_cache import make_etag, not_modified, with_validators
+from config import Config
 
 api_course_bp = Blueprint('api_course', __name__)
 db = DatabaseService()
@@ -16,18 +19,25 @@ def get_courses():
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
-    role = request.headers.get('X-User-Role')
+    current_user = get_current_user()
+    user_id = current_user['user_id']
+    role = current_user['role']
+    
+    # 강의/수강 등록이 그대로면 목록 조회 없이 304
+    etag = make_etag('courses', user_id, role, db.get_course_list_validator(user_id, role))
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
     if role == 'professor':
         courses = db.get_courses_by_professor(user_id)
     else:
         courses = db.get_courses_by_student(user_id)
     
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'courses': courses
-    }), 200
+    }), etag), 200
 
 @api_course_bp.route('/<course_id>', methods=['GET', 'OPTIONS'])
 def get_course_detail(course_id):
@@ -41,20 +51,12 @@ def get_course_detail(course_id):
     if not course:
         return jsonify({'success': False, 'message': '존재하지 않는 강의입니다.'}), 404
     
-    # 주차별 자료 통계
-    weeks_data = []
-    for week in range(1, 17):
-        materials = db.get_materials_by_course_week(course_id, week)
-        professor_materials = [m for m in materials if m['type'] == 'professor']
-        student_materials = [m for m in materials if m['type'] == 'student']
-        
-        weeks_data.append({
-            'week': week,
-            'professor_count': len(professor_materials),
-            'student_count': len(student_materials),
-            'total_downloads': sum(m['download_count'] for m in materials),
-            'total_views': sum(m['view_count'] for m in materials)
-        })
+    access_result = check_course_access(course)
+    if access_result:
+        return access_result
+    
+    # 주차별 자료 통계 (단일 집계 쿼리)
+    weeks_data = db.get_week_stats(course_id)
     
     return jsonify({
         'success': True,
@@ -62,9 +64,55 @@ def get_course_detail(course_id):
         'weeks_data': weeks_data
     }), 200
 
+@api_course_bp.route('/<course_id>/search', methods=['GET', 'OPTIONS'])
+def search_course_materials(course_id):
+    """
+    강의 자료 전문 검색 (?q=검색어&limit=)
+    
+    파일명/업로더/페이지 본문에서 관련도 순으로 자료 ID와 페이지 번호를 반환합니다.
+    담당 교수/수강 학생만 검색할 수 있고, 학생에게는 마감 전 주차의 다른 학생 자료가 나오지 않습니다.
+    """
+    auth_result = check_auth()
+    if auth_result:
+        return auth_result
+    
+    course = db.get_course_by_id(course_id)
+    if not course:
+        return jsonify({'success': False, 'message': '존재하지 않는 강의입니다.'}), 404
+    
+    access_result = check_course_access(course)
+    if access_result:
+        return access_result
+    
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'success': False, 'message': '검색어를 입력해주세요.'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', Config.SEARCH_LIMIT_DEFAULT))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit은 숫자여야 합니다.'}), 400
+    limit = max(1, min(limit, Config.SEARCH_LIMIT_MAX))
+    
+    current_user = get_current_user()
+    student_id = current_user['user_id'] if current_user['role'] == 'student' else None
+    hits = db.search_materials(course_id, query, limit=limit, student_id=student_id)
+    
+    return jsonify({
+        'success': True,
+        'query': query,
+        'count': len(hits),
+        'results': hits
+    }), 200
+
 @api_course_bp.route('/<course_id>/week/<int:week>', methods=['GET', 'OPTIONS'])
 def get_week_materials(course_id, week):
-    """주차별 자료 조회"""
+    """
+    주차별 자료 조회
+    
+    최신순(sort=latest) 정렬에서 ?limit= 또는 ?cursor=가 주어지면
+    학생 자료를 keyset 페이지네이션으로 반환합니다 (next_cursor).
+    """
     try:
         auth_result = check_auth()
         if auth_result:
@@ -75,16 +123,53 @@ def get_week_materials(course_id, week):
         if not course:
             return jsonify({'success': False, 'message': '존재하지 않는 강의입니다.'}), 404
         
+        access_result = check_course_access(course)
+        if access_result:
+            return access_result
+        
         # 학생인 경우 마감일 체크 (열람 가능 여부)
-        role = request.headers.get('X-User-Role')
+        role = get_current_user()['role']
         can_view = True
         if role == 'student':
             can_view = db.can_view_materials(course_id, week)
         
-        materials = db.get_materials_by_course_week(course_id, week)
+        # 주차 자료/설정이 그대로면 자료 조회와 직렬화 없이 304
+        # (조회/다운로드 수는 flush 주기만큼 늦게 반영되므로 약한 ETag)
+        etag = make_etag('week', course_id, week, role, get_current_user()['user_id'], can_view,
+                         db.is_upload_period_open(course_id, week), request.query_string,
+                         db.get_week_validator(course_id, week))
+        cached = not_modified(etag, weak=True)
+        if cached:
+            return cached
+        
+        sort_by = request.args.get('sort', 'latest')
+        paginate = sort_by == 'latest' and ('limit' in request.args or 'cursor' in request.args)
+        
+        professor_materials = db.get_materials_by_course_week(course_id, week, material_type='professor')
+        
+        # 학생 자료는 마감일이 지나지 않았으면 본인 자료만 조회 (페이지/커서도 보이는 자료 기준)
+        visible_uploader = None
+        if role == 'student' and not can_view:
+            visible_uploader = get_current_user()['user_id']
         
-        professor_materials = [m for m in materials if m['type'] == 'professor']
-        student_materials = [m for m in materials if m['type'] == 'student']
+        next_cursor = None
+        if paginate:
+            try:
+                limit, after = get_page_args(Config.PAGE_SIZE_DEFAULT, Config.PAGE_SIZE_MAX, cursor_size=2)
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+            student_materials = db.get_materials_by_course_week(
+                course_id, week, material_type='student', limit=limit + 1, after=after,
+                uploader_id=visible_uploader
+            )
+            if len(student_materials) > limit:
+                student_materials = student_materials[:limit]
+                last = student_materials[-1]
+                next_cursor = encode_cursor(last['upload_date'], last['material_id'])
+        else:
+            student_materials = db.get_materials_by_course_week(course_id, week, material_type='student',
+                                                                uploader_id=visible_uploader)
         
         # 프론트엔드 호환성을 위해 file_name 필드 추가
         for m in professor_materials:
@@ -92,13 +177,7 @@ def get_week_materials(course_id, week):
         for m in student_materials:
             m['file_name'] = m.get('filename', '')
         
-        # 학생 자료는 마감일이 지나지 않았으면 숨김 (본인 자료는 항상 표시)
-        if role == 'student' and not can_view:
-            user_id = session.get('user_id')
-            student_materials = [m for m in student_materials if m.get('uploader_id') == user_id]
-        
         # 정렬
-        sort_by = request.args.get('sort', 'latest')
         if sort_by == 'name':
             student_materials.sort(key=lambda x: x.get('uploader_name', ''))
         elif sort_by == 'popular':
@@ -122,7 +201,7 @@ def get_week_materials(course_id, week):
         # 업로드 가능 여부
         can_upload = True if role == 'professor' else db.is_upload_period_open(course_id, week)
         
-        return jsonify({
+        return with_validators(jsonify({
             'success': True,
             'course': course,
             'professor_materials': professor_materials,
@@ -130,8 +209,9 @@ def get_week_materials(course_id, week):
             'upload_deadline': deadline,
             'can_upload': can_upload,
             'can_view': can_view if role == 'student' else True,
-            'evaluation_status': evaluation_status
-        }), 200
+            'evaluation_status': evaluation_status,
+            'next_cursor': next_cursor
+        }), etag, weak=True), 200
     except Exception as e:
         print(f"[ERROR] get_week_materials: {e}")
         import traceback
@@ -152,8 +232,8 @@ def create_course():
         return auth_result
     
     data = request.get_json()
-    professor_id = request.headers.get('X-User-ID')
-    professor = db.get_user_by_id(professor_id)
+    professor = get_current_user()
+    professor_id = professor['user_id']
     
     course = {
         'course_name': data.get('course_name'),
@@ -246,7 +326,7 @@ def create_invitation(course_id):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     
     # 강의 확인
     course = db.get_course_by_id(course_id)
@@ -337,12 +417,10 @@ def join_course_by_invitation(invitation_code):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     
-    if db.use_invitation(invitation_code, user_id):
-        invitation = db.get_invitation(invitation_code)
-        course = db.get_course_by_id(invitation['course_id'])
-        
+    course = db.use_invitation(invitation_code, user_id)
+    if course:
         return jsonify({
             'success': True,
             'message': f'"{course["course_name"]}" 강의에 참가했습니다!',
@@ -364,7 +442,7 @@ def set_week_deadline(course_id, week):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     
     course = db.get_course_by_id(course_id)
     if not course:
@@ -399,6 +477,10 @@ def get_custom_pdf_materials(course_id, week):
     if not course:
         return jsonify({'success': False, 'message': '존재하지 않는 강의입니다.'}), 404
     
+    access_result = check_course_access(course)
+    if access_result:
+        return access_result
+    
     # 마감일이 지나지 않았으면 접근 불가
     if not db.can_view_materials(course_id, week):
         deadline = db.get_week_deadline(course_id, week)
@@ -2,13 +2,12 @@
 """
 API 나만의 PDF 라우트 (SQLite + GCS 버전)
 """
-from flask import Blueprint, request, jsonify, session, send_file
+from flask import Blueprint, request, jsonify, session
 from services.database_service import DatabaseService
 from services.gcs_storage_service import GCSStorageService
-from utils.auth_middleware import check_auth
+from utils.auth_middleware import check_auth, get_current_user
+from utils.file_delivery import stream_storage_file
 from PyPDF2 import PdfReader, PdfWriter
-import os
-import tempfile
 from io import BytesIO
 
 api_custom_pdf_bp = Blueprint('api_custom_pdf', __name__)
@@ -25,8 +24,8 @@ def generate_custom_pdf(course_id, week):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
-    user = db.get_user_by_id(user_id)
+    user = get_current_user()
+    user_id = user['user_id']
     course = db.get_course_by_id(course_id)
     
     if not course:
@@ -43,6 +42,7 @@ def generate_custom_pdf(course_id, week):
     # PDF Writer 생성
     writer = PdfWriter()
     page_info_list = []
+    readers = {}  # material_id -> PdfReader (같은 자료는 한 번만 읽음)
     
     # 각 페이지 추출 및 병합
     for selection in selected_pages:
@@ -54,24 +54,27 @@ def generate_custom_pdf(course_id, week):
         if not material:
             continue
         
-        # GCS에서 임시 다운로드
-        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
         try:
-            print(f"  📥 다운로드 중: {material_id} (페이지 {page_num})")
-            if storage.download_file(material['gcs_path'], temp_pdf.name):
-                # PDF 페이지 추출
-                reader = PdfReader(temp_pdf.name)
-                writer.add_page(reader.pages[page_num - 1])  # 1-based → 0-based
-                
-                page_info_list.append({
-                    'material_id': material_id,
-                    'page_number': page_num
-                })
+            reader = readers.get(material_id)
+            if reader is None:
+                # 로컬 디스크 캐시 경유 (없을 때만 GCS에서 받음)
+                print(f"  📥 읽는 중: {material_id} (페이지 {page_num})")
+                pdf_file = storage.open_file(material['gcs_path'], material.get('content_hash'))
+                if pdf_file is None:
+                    continue
+                with pdf_file:
+                    reader = PdfReader(BytesIO(pdf_file.read()))
+                readers[material_id] = reader
+            
+            # PDF 페이지 추출
+            writer.add_page(reader.pages[page_num - 1])  # 1-based → 0-based
+            
+            page_info_list.append({
+                'material_id': material_id,
+                'page_number': page_num
+            })
         except Exception as e:
             print(f"  ⚠️ 페이지 추출 실패: {e}")
-        finally:
-            if os.path.exists(temp_pdf.name):
-                os.unlink(temp_pdf.name)
     
     if not page_info_list:
         return jsonify({'success': False, 'message': 'PDF 생성 실패'}), 500
@@ -83,12 +86,8 @@ def generate_custom_pdf(course_id, week):
     
     print(f"  ✅ PDF 병합 완료 ({len(pdf_bytes)} bytes)")
     
-    # custom_pdf_id 생성 (DB 추가 전 필요)
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) as count FROM custom_pdfs')
-        count = cursor.fetchone()['count']
-        custom_pdf_id = f"CP{count + 1:03d}"
+    # custom_pdf_id 발급 (DB 추가 전 필요, GCS 경로와 DB 행이 같은 ID 사용)
+    custom_pdf_id = db.allocate_id('custom_pdf')
     
     # GCS에 업로드 (DB 추가 전)
     gcs_path = storage.save_custom_pdf(pdf_bytes, user_id, custom_pdf_id)
@@ -100,6 +99,7 @@ def generate_custom_pdf(course_id, week):
     
     # GCS 업로드 후 DB에 저장
     custom_pdf_data = {
+        'custom_pdf_id': custom_pdf_id,
         'student_id': user_id,
         'course_id': course_id,
         'week': week,
@@ -109,7 +109,7 @@ def generate_custom_pdf(course_id, week):
         'selected_pages': page_info_list
     }
     
-    custom_pdf_id = db.add_custom_pdf(custom_pdf_data)
+    db.add_custom_pdf(custom_pdf_data)
     
     return jsonify({
         'success': True,
@@ -124,7 +124,7 @@ def get_my_custom_pdfs():
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     custom_pdfs = db.get_custom_pdfs_by_student(user_id)
     
     for cp in custom_pdfs:
@@ -145,7 +145,7 @@ def download_custom_pdf(custom_pdf_id):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     custom_pdf = db.get_custom_pdf_by_id(custom_pdf_id)
     
     if not custom_pdf:
@@ -162,22 +162,9 @@ def download_custom_pdf(custom_pdf_id):
     # 파일명 생성: "강의명+주차+나만의 자료.pdf"
     download_filename = f"{course_name}{week}주차나만의 자료.pdf"
     
-    # GCS에서 임시 다운로드
-    gcs_path = custom_pdf['gcs_path']
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    
+    # 청크 스트리밍 (디스크 캐시 또는 GCS 범위 읽기, 임시 파일 없음) 또는 서명 URL 리다이렉트
     try:
-        if storage.download_file(gcs_path, temp_file.name):
-            return send_file(
-                temp_file.name,
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name=download_filename
-            )
-        else:
-            return jsonify({'success': False, 'message': 'GCS 다운로드 실패'}), 500
+        return stream_storage_file(storage, custom_pdf['gcs_path'], download_filename, as_attachment=True)
     except Exception as e:
         print(f"[ERROR] 다운로드 오류: {e}")
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
         return jsonify({'success': False, 'message': f'다운로드 오류: {str(e)}'}), 500
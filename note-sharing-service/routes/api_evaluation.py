@@ -7,7 +7,7 @@ from services.database_service import DatabaseService
 from services.pdf_service import PDFService
 from services.gemini_service import GeminiService
 from services.evaluation_scheduler import EvaluationScheduler
-from utils.auth_middleware import check_auth
+from utils.auth_middleware import check_auth, get_current_user
 import os
 
 api_evaluation_bp = Blueprint('api_evaluation', __name__)
@@ -24,7 +24,7 @@ def trigger_evaluation(course_id, week):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     
     course = db.get_course_by_id(course_id)
     if not course:
@@ -2,18 +2,65 @@
 """
 API 자료 업로드/다운로드 라우트 (SQLite + GCS 버전)
 """
-from flask import Blueprint, request, jsonify, session, send_file, current_app
+from flask import Blueprint, request, jsonify, session, current_app
 from services.database_service import DatabaseService
 from services.gcs_storage_service import GCSStorageService
 from services.pdf_service import PDFService
-from utils.auth_middleware import check_auth
+from services.ingest_service import IngestService
+from services.thumbnail_service import ThumbnailService
+from utils.auth_middleware import check_auth, check_course_access, get_current_user
+from utils.file_delivery import stream_storage_file
+from utils.http_cache import make_etag, not_modified, with_validators, parse_db_timestamp
+from config import Config
+from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor
 import os
-import tempfile
 
 api_material_bp = Blueprint('api_material', __name__)
 db = DatabaseService()
 storage = GCSStorageService()
 pdf_service = PDFService()
+ingest_service = IngestService(storage, pdf_service)
+thumbnail_service = ThumbnailService(db, storage, pdf_service)
+
+# 업로드 알림 발송용 백그라운드 워커 (요청 스레드를 막지 않음)
+notification_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notification')
+
+# 업로드 자료 본문 색인용 백그라운드 워커
+search_index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='search-index')
+
+def _send_notifications(notifications):
+    """알림 일괄 저장 (백그라운드 실행)"""
+    try:
+        count = db.add_notifications_bulk(notifications)
+        print(f"[NOTIFY] 알림 {count}건 저장 완료")
+    except Exception as e:
+        print(f"[ERROR] 알림 저장 실패: {e}")
+
+def _purge_legacy_session_keys():
+    """예전 방식의 자료별 세션 키(viewed_*/downloaded_*) 제거 (쿠키 크기 축소)"""
+    for key in [k for k in session.keys() if k.startswith(('viewed_', 'downloaded_'))]:
+        session.pop(key, None)
+
+def _check_material_access(material):
+    """자료가 속한 강의의 담당 교수/수강 학생인지 확인 (check_course_access와 같은 반환값)"""
+    course = db.get_course_by_id(material['course_id'])
+    if not course:
+        return jsonify({'success': False, 'message': '존재하지 않는 강의입니다.'}), 404
+    return check_course_access(course)
+
+def _index_material_text(material_id, gcs_path, content_hash):
+    """페이지 텍스트 추출 후 검색 인덱스에 저장 (백그라운드 실행, 업로드 때 채운 디스크 캐시에서 읽음)"""
+    try:
+        f = storage.open_file(gcs_path, content_hash)
+        if f is None:
+            raise IOError('GCS 다운로드 실패')
+        with f:
+            texts = pdf_service.extract_page_texts(f)
+        pages = db.index_material_pages(material_id, texts)
+        print(f"[SEARCH] {material_id} 본문 {pages}페이지 색인 완료")
+    except Exception as e:
+        print(f"[ERROR] 본문 색인 실패 ({material_id}): {e}")
 
 @api_material_bp.route('/courses/<course_id>/week/<int:week>/upload', methods=['POST', 'OPTIONS'])
 def upload_material(course_id, week):
@@ -36,9 +83,10 @@ def upload_material(course_id, week):
         print("=" * 70)
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
-    role = request.headers.get('X-User-Role')
-    name = session.get('name') or db.get_user_by_id(user_id)['name']
+    user = get_current_user()
+    user_id = user['user_id']
+    role = user['role']
+    name = user['name']
     
     print(f"  ✅ 사용자 정보:")
     print(f"    - User ID: {user_id}")
@@ -49,6 +97,10 @@ def upload_material(course_id, week):
     if not course:
         return jsonify({'success': False, 'message': '존재하지 않는 강의입니다.'}), 404
     
+    access_result = check_course_access(course)
+    if access_result:
+        return access_result
+    
     # 학생 업로드인 경우 마감일 체크
     if role == 'student':
         if not db.is_upload_period_open(course_id, week):
@@ -103,25 +155,16 @@ def upload_material(course_id, week):
         traceback.print_exc()
         # 크기 확인 실패해도 계속 진행
     
-    user = db.get_user_by_id(user_id)
-    
-    # role에 따라 분기
+    # 스트림을 한 번만 읽어 검증/페이지 수/해시 계산, GCS 저장과 썸네일 렌더링은 병렬 진행
+    mat_type = 'professor' if role == 'professor' else 'student'
+    filename = secure_filename(file.filename)
+    gcs_path = storage.material_path(mat_type, course_id, week, user_id, filename)
     try:
-        print(f"  📤 GCS 업로드 시작...")
-        if role == 'professor':
-            result = storage.save_professor_material(file, course_id, week, user_id)
-            mat_type = 'professor'
-            print(f"  📁 저장 타입: 교수 자료")
-            print(f"  📂 GCS 경로: storage/professor/{course_id}/week_{week}/")
-        else:
-            result = storage.save_student_material(file, course_id, week, user_id)
-            mat_type = 'student'
-            print(f"  📁 저장 타입: 학생 자료")
-            print(f"  📂 GCS 경로: storage/students/{user_id}/{course_id}/week_{week}/")
-        
-        if not result:
-            print(f"  ❌ GCS 업로드 실패: result가 None")
-            return jsonify({'success': False, 'message': '파일 업로드에 실패했습니다. (GCS 저장 실패)'}), 500
+        print(f"  📤 GCS 업로드 시작... ({gcs_path})")
+        ingested = ingest_service.ingest(file.stream, gcs_path)
+    except ValueError as e:
+        print(f"  ❌ PDF 검증 실패: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         print(f"  ❌ 업로드 중 오류 발생: {e}")
         import traceback
@@ -131,24 +174,9 @@ def upload_material(course_id, week):
             'message': f'파일 업로드 중 오류가 발생했습니다: {str(e)}'
         }), 500
     
-    gcs_path, filename = result
+    page_count = ingested['page_count']
     print(f"  ✅ GCS 업로드 성공: {gcs_path}")
-    
-    # PDF 페이지 수 확인 (GCS에서 임시 다운로드)
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    try:
-        pdf_data = storage.download_to_memory(gcs_path)
-        if pdf_data:
-            temp_file.write(pdf_data)
-            temp_file.close()
-            page_count = pdf_service.get_page_count(temp_file.name)
-            print(f"  📄 페이지 수: {page_count}")
-        else:
-            page_count = 0
-            print(f"  ⚠️ 페이지 수 확인 실패")
-    finally:
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
+    print(f"  📄 페이지 수: {page_count}, SHA-256: {ingested['content_hash'][:12]}...")
     
     material = {
         'course_id': course_id,
@@ -158,32 +186,40 @@ def upload_material(course_id, week):
         'type': mat_type,
         'filename': filename,
         'gcs_path': gcs_path,
-        'page_count': page_count
+        'page_count': page_count,
+        'content_hash': ingested['content_hash']
     }
     
     material_id = db.add_material(material)
     print(f"  ✅ DB 저장 완료! Material ID: {material_id}")
     
-    # 썸네일 생성 (백그라운드, GCS에 저장)
+    # 페이지 본문 검색 색인 (백그라운드, 파일명/업로더는 DB 트리거로 즉시 색인됨)
+    # 요청 단위 트랜잭션이면 자료 행이 commit된 뒤 시작 (그 전에는 백그라운드 스레드에서 보이지 않음)
+    # 대기열에는 경로/해시만 두고 본문은 작업 시작 시 디스크 캐시에서 읽음 (업로드가 몰려도 PDF를 메모리에 쌓지 않음)
+    content_hash = ingested['content_hash']
+    db.call_after_commit(lambda: search_index_executor.submit(_index_material_text, material_id, gcs_path, content_hash))
+    
+    # 썸네일 업로드 (업로드와 병렬로 렌더링해 둔 이미지 사용)
     try:
-        print(f"  🖼️  썸네일 생성 중...")
-        thumbnail_paths = pdf_service.convert_pdf_to_images_from_gcs(gcs_path, material_id, storage)
+        thumbnail_paths = thumbnail_service.record_pages(
+            material_id, ingest_service.save_thumbnails(ingested['thumbnails'], material_id))
         print(f"  ✅ 썸네일 {len(thumbnail_paths)}개 GCS 업로드 완료!")
     except Exception as e:
         print(f"  ⚠️  썸네일 생성 실패 (서비스는 정상 작동): {e}")
     
     print("=" * 70 + "\n")
     
-    # 학생 업로드 시 알림 생성
+    # 학생 업로드 시 알림 생성 (일괄 저장, 백그라운드)
     if mat_type == 'student':
-        for student_id in course['enrolled_students']:
-            if student_id != user_id:
-                db.add_notification({
-                    'user_id': student_id,
-                    'type': 'material_upload',
-                    'related_id': material_id,
-                    'message': f'{course["course_name"]} {week}주차 - {user["name"]}님이 필기를 업로드했습니다.'
-                })
+        message = f'{course["course_name"]} {week}주차 - {user["name"]}님이 필기를 업로드했습니다.'
+        notifications = [{
+            'user_id': student_id,
+            'type': 'material_upload',
+            'related_id': material_id,
+            'message': message
+        } for student_id in db.get_enrolled_students(course_id) if student_id != user_id]
+        if notifications:
+            db.call_after_commit(lambda: notification_executor.submit(_send_notifications, notifications))
     
     return jsonify({
         'success': True,
@@ -199,17 +235,19 @@ def download_material(material_id):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     material = db.get_material_by_id(material_id)
     
     if not material:
         return jsonify({'success': False, 'message': '존재하지 않는 자료입니다.'}), 404
     
-    # 중복 다운로드 방지
-    download_key = f"downloaded_{material_id}"
-    if not session.get(download_key):
-        db.increment_download_count(material_id)
-        session[download_key] = True
+    access_result = _check_material_access(material)
+    if access_result:
+        return access_result
+    
+    # 중복 다운로드 방지 (사용자별, 서버에서 판별)
+    _purge_legacy_session_keys()
+    if db.record_unique_access(material_id, user_id, 'download'):
         print(f"[DEBUG] 다운로드 카운트 증가: {material_id}, user: {user_id}")
     else:
         print(f"[DEBUG] 중복 다운로드 방지: {material_id}, user: {user_id}")
@@ -223,24 +261,12 @@ def download_material(material_id):
     # 파일명 생성: "강의명 + 주차 + 교수명 or 학생명.pdf"
     download_filename = f"{course_name} {week}주차 {uploader_name}.pdf"
     
-    # GCS에서 임시 다운로드
-    gcs_path = material['gcs_path']
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    
+    # 청크 스트리밍 (디스크 캐시 또는 GCS 범위 읽기, 임시 파일 없음) 또는 서명 URL 리다이렉트
     try:
-        if storage.download_file(gcs_path, temp_file.name):
-            return send_file(
-                temp_file.name,
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name=download_filename
-            )
-        else:
-            return jsonify({'success': False, 'message': 'GCS 다운로드 실패'}), 500
+        return stream_storage_file(storage, material['gcs_path'], download_filename,
+                                   as_attachment=True, content_hash=material.get('content_hash'))
     except Exception as e:
         print(f"[ERROR] 다운로드 오류: {e}")
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
         return jsonify({'success': False, 'message': f'다운로드 오류: {str(e)}'}), 500
 
 @api_material_bp.route('/materials/<material_id>/view', methods=['GET', 'OPTIONS'])
@@ -250,43 +276,56 @@ def view_material(material_id):
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     material = db.get_material_by_id(material_id)
     
     if not material:
         return jsonify({'success': False, 'message': '존재하지 않는 자료입니다.'}), 404
     
-    # 중복 조회 방지
-    view_key = f"viewed_{material_id}"
-    if not session.get(view_key):
-        db.increment_view_count(material_id)
-        session[view_key] = True
+    access_result = _check_material_access(material)
+    if access_result:
+        return access_result
+    
+    # 중복 조회 방지 (사용자별, 서버에서 판별)
+    _purge_legacy_session_keys()
+    if db.record_unique_access(material_id, user_id, 'view'):
         print(f"[DEBUG] 조회 카운트 증가: {material_id}, user: {user_id}")
     else:
         print(f"[DEBUG] 중복 조회 방지: {material_id}, user: {user_id}")
     
-    # GCS에서 임시 다운로드
-    gcs_path = material['gcs_path']
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    
+    # Range 지원 스트리밍 (디스크 캐시 또는 GCS 범위 읽기) 또는 서명 URL 리다이렉트
     try:
-        if storage.download_file(gcs_path, temp_file.name):
-            response = send_file(
-                temp_file.name,
-                mimetype='application/pdf',
-                as_attachment=False,
-                download_name=material['filename']
-            )
-            response.headers['Content-Type'] = 'application/pdf'
-            return response
-        else:
-            return jsonify({'success': False, 'message': 'GCS 다운로드 실패'}), 500
+        return stream_storage_file(storage, material['gcs_path'], material['filename'],
+                                   as_attachment=False, content_hash=material.get('content_hash'),
+                                   last_modified=parse_db_timestamp(material.get('upload_date')))
     except Exception as e:
         print(f"[ERROR] 조회 오류: {e}")
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
         return jsonify({'success': False, 'message': f'조회 오류: {str(e)}'}), 500
 
+@api_material_bp.route('/materials/<material_id>/stats', methods=['GET', 'OPTIONS'])
+def get_material_stats(material_id):
+    """자료 조회/다운로드 통계 (고유 사용자 수 포함)"""
+    auth_result = check_auth()
+    if auth_result:
+        return auth_result
+    
+    material = db.get_material_by_id(material_id)
+    
+    if not material:
+        return jsonify({'success': False, 'message': '존재하지 않는 자료입니다.'}), 404
+    
+    access_result = _check_material_access(material)
+    if access_result:
+        return access_result
+    
+    return jsonify({
+        'success': True,
+        'material_id': material_id,
+        'view_count': material['view_count'],
+        'download_count': material['download_count'],
+        **db.get_unique_access_counts(material_id)
+    }), 200
+
 @api_material_bp.route('/materials/<material_id>/thumbnails', methods=['GET', 'OPTIONS'])
 def get_material_thumbnails(material_id):
     """자료의 썸네일 목록 조회"""
@@ -299,49 +338,59 @@ def get_material_thumbnails(material_id):
     if not material:
         return jsonify({'success': False, 'message': '존재하지 않는 자료입니다.'}), 404
     
+    access_result = _check_material_access(material)
+    if access_result:
+        return access_result
+    
+    # 썸네일 목록은 자료 내용/material_pages/서명 URL 재사용 구간이 같으면 304 (목록 조회/서명 생략)
+    # ETag는 get_signed_urls와 같은 구간(유효 시간의 절반)마다 바뀌고, 그 구간에 서명한 URL은
+    # 구간이 끝난 뒤에도 구간 길이만큼 유효하므로 max-age를 구간 길이 이하로 두면 만료된 URL을 재사용하지 않음
+    slot, window = storage.signed_url_slot(Config.THUMBNAIL_URL_EXPIRATION)
+    thumbnail_cache_control = f'private, max-age={min(Config.THUMBNAIL_MAX_AGE, window)}'
+    
+    def thumbnail_etag():
+        return make_etag('thumbnails', material_id, material.get('content_hash') or material['gcs_path'],
+                         material['upload_date'], material['page_count'],
+                         db.get_material_pages_validator(material_id), slot)
+    
+    cached = not_modified(thumbnail_etag(), cache_control=thumbnail_cache_control)
+    if cached:
+        return cached
+    
     print(f"\n[THUMBNAIL] 요청: {material_id}")
     print(f"  - GCS 경로: {material['gcs_path']}")
     print(f"  - 페이지 수: {material['page_count']}")
     
-    # 썸네일 GCS 경로 확인
-    thumbnail_prefix = f"storage/thumbnails/{material_id}/"
-    thumbnail_files = storage.list_files(thumbnail_prefix)
-    
-    print(f"  - 기존 썸네일: {len(thumbnail_files)}개")
-    
-    # 썸네일이 없으면 생성
-    if not thumbnail_files:
-        print(f"[THUMBNAIL] {material_id} 썸네일 생성 시작...")
-        try:
-            thumbnail_files = pdf_service.convert_pdf_to_images_from_gcs(
-                material['gcs_path'], 
-                material_id,
-                storage
-            )
-            print(f"[THUMBNAIL] 생성 완료: {len(thumbnail_files)}개")
-        except Exception as e:
-            print(f"[ERROR] 썸네일 생성 실패: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({
-                'success': False, 
-                'message': f'썸네일 생성 실패: {str(e)}'
-            }), 500
+    # 썸네일 목록 (material_pages 조회, 없으면 생성)
+    try:
+        thumbnail_files = thumbnail_service.get_thumbnail_paths(material)
+        print(f"  - 썸네일: {len(thumbnail_files)}개")
+    except Exception as e:
+        print(f"[ERROR] 썸네일 생성 실패: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False, 
+            'message': f'썸네일 생성 실패: {str(e)}'
+        }), 500
     
-    # GCS Signed URL 생성 (1시간 유효)
+    # 렌더링/재시도로 material_pages가 바뀌었을 수 있으므로 응답 ETag는 목록 조회 뒤 다시 계산
+    etag = thumbnail_etag()
+    
+    # GCS Signed URL 일괄 생성 (THUMBNAIL_URL_EXPIRATION, 기본 1시간 - 만료 구간별 캐시 재사용)
+    signed_urls = storage.get_signed_urls(thumbnail_files, expiration=Config.THUMBNAIL_URL_EXPIRATION)
     thumbnail_urls = []
     for gcs_path in thumbnail_files:
-        signed_url = storage.get_signed_url(gcs_path, expiration=3600)
-        if signed_url:
-            thumbnail_urls.append(signed_url)
+        if gcs_path in signed_urls:
+            thumbnail_urls.append(signed_urls[gcs_path])
         else:
             print(f"[WARNING] Signed URL 생성 실패: {gcs_path}")
     
     print(f"[THUMBNAIL] 최종 반환: {len(thumbnail_urls)}개 URL\n")
     
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'material_id': material_id,
         'thumbnail_count': len(thumbnail_urls),
         'thumbnails': thumbnail_urls
-    }), 200
+    }), etag, cache_control=thumbnail_cache_control), 200
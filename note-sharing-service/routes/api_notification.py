@@ -4,25 +4,59 @@ API 알림 라우트 (JSON 응답)
 """
 from flask import Blueprint, jsonify, session, request
 from services.database_service import DatabaseService
-from utils.auth_middleware import check_auth
+from utils.auth_middleware import check_auth, get_current_user
+from utils.pagination import get_page_args, encode_cursor
+from utils.http_cache import make_etag, not_modified, with_validators
+from config import Config
 
 api_notification_bp = Blueprint('api_notification', __name__)
 db = DatabaseService()
 
 @api_notification_bp.route('', methods=['GET', 'OPTIONS'])
 def get_notifications():
-    """알림 목록 조회"""
+    """
+    알림 목록 조회 (최신순)
+    
+    ?limit= 또는 ?cursor=가 주어지면 keyset 페이지네이션으로 반환합니다 (next_cursor).
+    둘 다 없으면 기존처럼 전체 목록을 반환합니다.
+    """
     auth_result = check_auth()
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
-    notifications = db.get_notifications_by_user(user_id)
+    paginate = 'limit' in request.args or 'cursor' in request.args
+    limit, after = None, None
+    if paginate:
+        try:
+            limit, after = get_page_args(Config.PAGE_SIZE_DEFAULT, Config.PAGE_SIZE_MAX, cursor_size=2)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
     
-    return jsonify({
+    user_id = get_current_user()['user_id']
+    
+    # 새 알림/읽음 변경이 없으면 304
+    etag = make_etag('notifications', user_id, request.query_string, db.get_notification_watermark(user_id))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    next_cursor = None
+    if not paginate:
+        notifications = db.get_notifications_by_user(user_id)
+    else:
+        # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+        notifications = db.get_notifications_by_user(user_id, limit=limit + 1, after=after)
+    
+    if paginate and len(notifications) > limit:
+        notifications = notifications[:limit]
+        last = notifications[-1]
+        next_cursor = encode_cursor(last['created_at'], last['notification_id'])
+    
+    return with_validators(jsonify({
         'success': True,
-        'notifications': notifications
-    }), 200
+        'notifications': notifications,
+        'next_cursor': next_cursor
+    }), etag), 200
 
 @api_notification_bp.route('/<notification_id>/read', methods=['POST', 'OPTIONS'])
 def mark_as_read(notification_id):
@@ -48,7 +82,7 @@ def get_unread_count():
     if auth_result:
         return auth_result
     
-    user_id = request.headers.get('X-User-ID')
+    user_id = get_current_user()['user_id']
     count = db.get_unread_notification_count(user_id)
     
     return jsonify({
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+스토리지 blob 로컬 디스크 캐시 (콘텐츠 주소 기반 LRU)
+
+- 키: 콘텐츠 해시(SHA-256)를 알면 해시, 모르면 GCS 경로의 해시 (경로 키는 쓰기/삭제 시 무효화)
+- 채우기는 임시 파일에 받은 뒤 os.replace로 원자적으로 교체
+- 같은 키에 대한 동시 miss는 한 번의 fetch로 합침 (single-flight)
+- 바이트 예산을 넘으면 가장 오래 사용하지 않은 파일부터 삭제
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, BinaryIO
+
+class BlobCache:
+    """디렉터리별 디스크 LRU 캐시 (같은 프로세스에서 디렉터리당 하나를 공유)"""
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def for_dir(cls, root: str, max_bytes: int) -> 'BlobCache':
+        """디렉터리별 공유 캐시 반환"""
+        key = os.path.abspath(root)
+        with cls._registry_lock:
+            cache = cls._registry.get(key)
+            if cache is None:
+                cache = cls(key, max_bytes)
+                cls._registry[key] = cache
+            return cache
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> 크기 (오래된 순)
+        self._inflight = {}  # key -> threading.Event (fetch 진행 중)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._collapsed = 0
+        self._fetch_errors = 0
+        self._evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def path_key(gcs_path: str) -> str:
+        """콘텐츠 해시를 모르는 객체용 키 (GCS 경로 기반)"""
+        return 'p-' + hashlib.sha256(gcs_path.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[-2:], key)
+
+    def _load(self):
+        """기존 캐시 파일을 마지막 접근 시각 순으로 색인 (중단된 임시 파일은 삭제)"""
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if name.startswith('.tmp-'):
+                    os.unlink(path)
+                    continue
+                stat = os.stat(path)
+                found.append((stat.st_atime, name, stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """예산을 넘는 만큼 오래된 항목 삭제 (_lock 보유 상태에서 호출)"""
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _open_hit(self, key: str) -> Optional[BinaryIO]:
+        """캐시에 있으면 파일을 열어 반환 (_lock 보유 상태에서 호출, 이후 삭제되어도 열린 파일은 유효)"""
+        if key not in self._entries:
+            return None
+        try:
+            f = open(self._path(key), 'rb')
+        except FileNotFoundError:
+            # 다른 프로세스가 지운 경우
+            self._bytes -= self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return f
+
+    def peek(self, key: str) -> Optional[BinaryIO]:
+        """캐시에 있으면 파일을 열어 반환, 없으면 None (fetch하지 않음)"""
+        with self._lock:
+            f = self._open_hit(key)
+            if f is not None:
+                self._hits += 1
+            return f
+
+    def open(self, key: str, fetch: Callable[[str], bool]) -> Optional[BinaryIO]:
+        """
+        캐시된 파일을 열어 반환 (없으면 fetch로 채움)
+
+        Args:
+            key: 캐시 키 (콘텐츠 해시 또는 path_key)
+            fetch: fetch(임시 파일 경로) -> 성공 여부
+
+        Returns:
+            읽기용 파일 객체 (호출자가 닫음) 또는 fetch 실패 시 None
+        """
+        while True:
+            with self._lock:
+                f = self._open_hit(key)
+                if f is not None:
+                    self._hits += 1
+                    return f
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    self._misses += 1
+                    break
+                self._collapsed += 1
+            # 다른 스레드의 fetch 완료를 기다린 뒤 다시 확인
+            # (fetch 실패 또는 예산 초과로 저장되지 않았으면 이 스레드가 직접 받음)
+            event.wait()
+
+        try:
+            return self._fill(key, fetch)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _fill(self, key: str, fetch: Callable[[str], bool]) -> Optional[BinaryIO]:
+        final_path = self._path(key)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(final_path))
+        os.close(fd)
+        try:
+            if not fetch(temp_path):
+                with self._lock:
+                    self._fetch_errors += 1
+                return None
+            size = os.path.getsize(temp_path)
+            f = open(temp_path, 'rb')
+            if size > self.max_bytes:
+                # 예산보다 큰 객체는 캐시하지 않고 이번 요청에만 사용
+                return f
+            os.replace(temp_path, final_path)
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+                self._entries[key] = size
+                self._bytes += size
+                self._evict()
+            return f
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def put(self, key: str, source_path: str) -> bool:
+        """
+        로컬 파일을 캐시에 추가 (업로드한 파일을 다시 내려받지 않도록, 원본 파일은 그대로 둠)
+
+        Returns:
+            저장 여부 (예산보다 크거나 복사 실패 시 False)
+        """
+        size = os.path.getsize(source_path)
+        if size > self.max_bytes:
+            return False
+        final_path = self._path(key)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        temp_path = os.path.join(os.path.dirname(final_path), f'.tmp-{uuid.uuid4().hex}')
+        try:
+            try:
+                # 같은 파일시스템이면 하드 링크 (복사 없음)
+                os.link(source_path, temp_path)
+            except OSError:
+                shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, final_path)
+        except OSError as e:
+            print(f"[BLOB CACHE] 파일 추가 실패: {e}")
+            return False
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._bytes += size
+            self._evict()
+        return True
+
+    def read_bytes(self, key: str, fetch: Callable[[str], bool]) -> Optional[bytes]:
+        """캐시된 파일 내용을 바이트로 반환 (fetch 실패 시 None)"""
+        f = self.open(key, fetch)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def invalidate(self, key: str):
+        """항목 삭제 (경로 키 객체를 덮어쓰거나 지운 경우)"""
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is None:
+                return
+            self._bytes -= size
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self) -> Dict:
+        """적중률/용량 통계"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'collapsed': self._collapsed,
+                'fetch_errors': self._fetch_errors,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite 연결 풀 (WAL 모드 + 읽기 전용 연결 분리)
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+from config import Config
+from services.query_stats import InstrumentedConnection
+
+class ConnectionPool:
+    """
+    DB 파일별 SQLite 연결 풀
+
+    - 쓰기 연결과 읽기 전용 연결을 별도의 풀로 관리
+    - 같은 스레드 안에서 중첩된 connection() 호출은 하나의 연결/트랜잭션을 공유
+      (가장 바깥 블록이 끝날 때만 commit/rollback)
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, db_path: str) -> 'ConnectionPool':
+        """DB 경로별 공유 풀 반환 (같은 프로세스의 모든 DatabaseService가 공유)"""
+        key = os.path.abspath(db_path)
+        with cls._registry_lock:
+            pool = cls._registry.get(key)
+            if pool is None:
+                pool = cls(key)
+                cls._registry[key] = pool
+            return pool
+
+    def __init__(self, db_path: str, pool_size: int = None):
+        self.db_path = db_path
+        self.pool_size = pool_size or Config.DB_POOL_SIZE
+        self._idle = {
+            False: queue.LifoQueue(maxsize=self.pool_size),
+            True: queue.LifoQueue(maxsize=self.pool_size)
+        }
+        self._local = threading.local()
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        """새 연결 생성 및 PRAGMA 적용"""
+        # 계측 여부는 쿼리 실행 시점에 DB_QUERY_STATS로 판단 (풀에 남은 연결도 설정 변경을 따름)
+        factory = InstrumentedConnection
+        if readonly:
+            uri = f"file:{quote(self.db_path)}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=Config.DB_BUSY_TIMEOUT,
+                                   check_same_thread=False, factory=factory)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=Config.DB_BUSY_TIMEOUT,
+                                   check_same_thread=False, factory=factory)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={int(Config.DB_MMAP_SIZE)}')
+        conn.execute(f'PRAGMA cache_size={-int(Config.DB_CACHE_SIZE_KB)}')
+        conn.row_factory = sqlite3.Row  # 딕셔너리 형태로 결과 반환
+        return conn
+
+    def _acquire(self, readonly: bool) -> sqlite3.Connection:
+        try:
+            return self._idle[readonly].get_nowait()
+        except queue.Empty:
+            return self._connect(readonly)
+
+    def _release(self, conn: sqlite3.Connection, readonly: bool):
+        try:
+            self._idle[readonly].put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def in_transaction(self) -> bool:
+        """현재 스레드가 쓰기 연결(트랜잭션 범위)을 잡고 있는지 여부"""
+        return getattr(self._local, 'conn', None) is not None
+
+    def call_after_commit(self, callback):
+        """현재 쓰기 범위가 commit된 뒤 callback 실행 (범위 밖이면 즉시 실행)"""
+        if self.in_transaction():
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    @contextmanager
+    def connection(self, readonly: bool = False):
+        """
+        연결 컨텍스트 매니저
+
+        Args:
+            readonly: True면 읽기 전용 연결 사용
+                      (이미 쓰기 범위 안이라면 같은 쓰기 연결을 재사용)
+        """
+        local = self._local
+
+        # 진행 중인 쓰기 범위(unit of work)에 합류
+        if getattr(local, 'conn', None) is not None:
+            local.depth += 1
+            try:
+                yield local.conn
+            finally:
+                local.depth -= 1
+            return
+
+        if readonly:
+            if getattr(local, 'ro_conn', None) is not None:
+                yield local.ro_conn
+                return
+            conn = self._acquire(True)
+            local.ro_conn = conn
+            try:
+                yield conn
+            finally:
+                local.ro_conn = None
+                self._release(conn, True)
+            return
+
+        # 가장 바깥 쓰기 범위: 끝날 때 commit/rollback
+        conn = self._acquire(False)
+        local.conn = conn
+        local.depth = 1
+        local.after_commit = []
+        try:
+            yield conn
+            conn.commit()
+            callbacks = local.after_commit
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            local.conn = None
+            local.depth = 0
+            local.after_commit = []
+            self._release(conn, False)
+
+        # commit이 끝난 뒤 실행 (콜백 실패가 이미 commit된 트랜잭션을 실패로 보고하지 않도록 개별 처리)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[DB] commit 후 콜백 실패: {e}")
+
+    def close_all(self):
+        """풀에 대기 중인 모든 연결 종료 (DB 파일 삭제 전 등)"""
+        for idle in self._idle.values():
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
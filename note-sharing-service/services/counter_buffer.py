@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+조회/다운로드 수 write-behind 버퍼
+"""
+import atexit
+import threading
+
+class CounterBuffer:
+    """
+    카운터 증가분을 메모리에 모았다가 주기적으로 한 번에 반영하는 버퍼
+
+    - flush_interval초마다(또는 대기 중인 키가 max_pending개를 넘으면 즉시) flush 스레드에서 flush
+    - 프로세스 종료 시 atexit으로 남은 증가분 flush
+    - 반영 전 증가분은 pending()으로 조회해 읽기 결과에 합산
+    """
+
+    def __init__(self, flush_func, flush_interval: float, max_pending: int = 1000):
+        """
+        Args:
+            flush_func: flush_func({key: {필드: 증가분}}, committed) - 저장 후 commit 직후 committed() 호출
+                        (commit된 증가분이 pending()에 이중으로 합산되지 않도록)
+            flush_interval: flush 주기 (초) = 비정상 종료 시 최대 유실 구간
+            max_pending: 이 개수를 넘는 키가 쌓이면 즉시 flush
+        """
+        self._flush_func = flush_func
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}    # 아직 flush되지 않은 증가분
+        self._in_flight = {}  # flush 중(커밋 전)인 증가분
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self.flushed_batches = 0
+        atexit.register(self.stop)
+
+    def add(self, key, field: str, amount: int = 1):
+        """증가분 기록"""
+        with self._lock:
+            deltas = self._pending.setdefault(key, {})
+            deltas[field] = deltas.get(field, 0) + amount
+            overflow = len(self._pending) >= self.max_pending
+            self._ensure_thread()
+        if overflow:
+            # 호출자의 트랜잭션 안에서 flush하지 않도록 flush 스레드를 깨움
+            self._wake.set()
+
+    def pending(self, keys=None) -> dict:
+        """
+        아직 저장되지 않은 증가분 조회 (flush 중인 것 포함)
+
+        Args:
+            keys: 조회할 키 목록 (None이면 전체)
+        """
+        with self._lock:
+            sources = (self._in_flight, self._pending)
+            if keys is None:
+                keys = set(self._in_flight) | set(self._pending)
+            result = {}
+            for key in keys:
+                for source in sources:
+                    for field, amount in source.get(key, {}).items():
+                        merged = result.setdefault(key, {})
+                        merged[field] = merged.get(field, 0) + amount
+            return result
+
+    def flush(self):
+        """대기 중인 증가분을 한 번에 저장 (실패 시 다음 flush로 이월)"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                self._in_flight, self._pending = self._pending, {}
+                batch = self._in_flight
+            try:
+                self._flush_func(batch, self._committed)
+            except Exception as e:
+                print(f"[COUNTER] flush 실패, 다음 주기에 재시도: {e}")
+                with self._lock:
+                    for key, deltas in batch.items():
+                        pending = self._pending.setdefault(key, {})
+                        for field, amount in deltas.items():
+                            pending[field] = pending.get(field, 0) + amount
+                    self._in_flight = {}
+                return
+            # committed()를 호출하지 않는 flush_func 대비
+            self._committed()
+            self.flushed_batches += 1
+
+    def _committed(self):
+        """flush 중인 증가분이 DB에 반영됨 - 이후 pending()에서 제외 (flush_func가 commit 직후 호출)"""
+        with self._lock:
+            self._in_flight = {}
+
+    def _ensure_thread(self):
+        """주기적 flush 스레드 시작 (최초 add 시, _lock 보유 상태에서 호출)"""
+        if self._thread is not None or self._stop.is_set():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                self.flush()
+
+        self._thread = threading.Thread(target=run, name='counter-flush', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """주기적 flush 중지 후 남은 증가분 저장 (종료 시)"""
+        self._stop.set()
+        self._wake.set()
+        self.flush()
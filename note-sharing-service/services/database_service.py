@@ -4,36 +4,192 @@ SQLite 기반 데이터 관리 서비스
 """
 import sqlite3
 import os
+import copy
+import threading
+import time
+import random
 from datetime import datetime
 from typing import List, Dict, Optional
 from contextlib import contextmanager
+from flask import g
+from services.connection_pool import ConnectionPool
+from services.ttl_cache import TTLCache, MISSING
+from services.counter_buffer import CounterBuffer
+from services.query_stats import instrument_methods
+from config import Config
 
+# 주차 설정이 없는 강의의 기본 주차 수
+DEFAULT_WEEK_COUNT = 16
+
+# 전문 검색 bm25 가중치 (filename, uploader_name, body, material_id, course_id, page_number)
+SEARCH_WEIGHTS = '10.0, 5.0, 1.0, 0.0, 0.0, 0.0'
+
+def _deadline_timestamp(deadline: Optional[str]) -> Optional[int]:
+    """ISO 마감일 문자열 → epoch 초 (시간대 없는 값은 서버 로컬 시각, 해석 불가면 None)"""
+    if not deadline:
+        return None
+    try:
+        return int(datetime.fromisoformat(deadline.replace('Z', '')).timestamp())
+    except ValueError:
+        return None
+
+def _fts_phrase(value: str) -> str:
+    """FTS5 문자열 리터럴 (큰따옴표 이스케이프)"""
+    return '"' + value.replace('"', '""') + '"'
+
+def _build_search_query(course_id: str, text: str) -> Optional[str]:
+    """
+    사용자 검색어 → FTS5 MATCH 식
+    
+    단어마다 접두어 검색(조사가 붙은 한국어 단어 대응), 모든 단어 AND,
+    검색 대상은 파일명/업로더/본문 컬럼으로 제한하고 강의 ID로 필터링
+    """
+    terms = [_fts_phrase(term) + '*' for term in text.split() if any(ch.isalnum() for ch in term)]
+    if not terms:
+        return None
+    return f"course_id:{_fts_phrase(course_id)} AND {{filename uploader_name body}}: ({' '.join(terms)})"
+
+# ID 시퀀스 정의: 이름 -> (기존 데이터의 최대 번호 조회 SQL, ID 형식, 번호 오프셋)
+ID_SEQUENCES = {
+    'professor': ("SELECT MAX(CAST(SUBSTR(user_id, 2) AS INTEGER)) FROM users WHERE role = 'professor'",
+                  'P{:05d}', 0),
+    'student': ("SELECT MAX(CAST(user_id AS INTEGER)) - 202300000 FROM users WHERE role = 'student'",
+                '{:d}', 202300000),
+    'course': ('SELECT MAX(CAST(SUBSTR(course_id, 2) AS INTEGER)) FROM courses', 'C{:03d}', 0),
+    'material': ('SELECT MAX(CAST(SUBSTR(material_id, 2) AS INTEGER)) FROM materials', 'M{:03d}', 0),
+    'custom_pdf': ('SELECT MAX(CAST(SUBSTR(custom_pdf_id, 3) AS INTEGER)) FROM custom_pdfs', 'CP{:03d}', 0),
+    'notification': ('SELECT MAX(CAST(SUBSTR(notification_id, 2) AS INTEGER)) FROM notifications', 'N{:03d}', 0),
+}
+
+@instrument_methods
 class DatabaseService:
     """SQLite 기반 데이터 관리"""
     
+    # DB 경로별 공유 객체 (읽기 캐시, 카운터 버퍼 등)
+    # 같은 프로세스의 모든 인스턴스가 공유해야 무효화/증가분이 전파됨
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(self, db_path='data/database.db'):
         self.db_path = db_path
+        # data 디렉토리 생성 (풀이 파일을 열기 전에 필요)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.pool = ConnectionPool.for_path(db_path)
+        self.cache = self._shared_for('read_cache', lambda: TTLCache(
+            max_entries=Config.DB_READ_CACHE_MAX_ENTRIES,
+            ttl_seconds=Config.DB_READ_CACHE_TTL
+        ))
+        # 최근 확인한 (자료, 사용자) 조회/다운로드 쌍 (읽기 캐시와 별도로 두어 서로 밀어내지 않도록)
+        self.seen = self._shared_for('seen_cache', lambda: TTLCache(
+            max_entries=Config.SEEN_CACHE_MAX_ENTRIES,
+            ttl_seconds=Config.SEEN_CACHE_TTL
+        ))
+        self.counters = None
+        if Config.COUNTER_FLUSH_INTERVAL > 0:
+            self.counters = self._shared_for('counters', lambda: CounterBuffer(
+                self._apply_counter_deltas,
+                flush_interval=Config.COUNTER_FLUSH_INTERVAL,
+                max_pending=Config.COUNTER_MAX_PENDING
+            ))
         self._init_database()
     
+    def _shared_for(self, name: str, factory):
+        """DB 경로별 공유 객체 조회/생성"""
+        key = (self.pool.db_path, name)
+        with self._shared_lock:
+            obj = self._shared.get(key)
+            if obj is None:
+                obj = factory()
+                self._shared[key] = obj
+            return obj
+    
+    def get_connection(self, readonly=False):
+        """
+        DB 연결 컨텍스트 매니저 (풀에서 연결 대여)
+        
+        Args:
+            readonly: True면 읽기 전용 연결 사용 (쓰기 잠금과 무관하게 조회)
+        """
+        return self.pool.connection(readonly=readonly)
+    
     @contextmanager
-    def get_connection(self):
-        """DB 연결 컨텍스트 매니저"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # 딕셔너리 형태로 결과 반환
-        try:
+    def unit_of_work(self):
+        """
+        하나의 연결/트랜잭션을 공유하는 작업 단위
+        
+        블록 안의 모든 DatabaseService 호출이 같은 연결을 사용하고,
+        블록이 끝날 때 한 번만 commit (예외 시 rollback) 합니다.
+        """
+        with self.pool.connection() as conn:
             yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+    
+    def call_after_commit(self, callback):
+        """현재 쓰기 범위가 commit된 뒤 callback 실행 (범위 밖이면 즉시 실행)"""
+        self.pool.call_after_commit(callback)
+    
+    def init_app(self, app):
+        """
+        Flask 요청 단위 unit of work 등록 (DB_REQUEST_UNIT_OF_WORK=True 인 경우)
+        
+        첫 쓰기부터 요청이 끝날 때까지 쓰기 잠금을 잡으므로, 업로드처럼 쓰기 뒤에
+        GCS 작업이 이어지는 요청에서는 그동안 다른 쓰기가 대기합니다.
+        커밋된 행을 읽어야 하는 백그라운드 작업은 call_after_commit으로 시작하세요.
+        """
+        if not app.config.get('DB_REQUEST_UNIT_OF_WORK'):
+            return
+        
+        @app.before_request
+        def _begin_unit_of_work():
+            g.db_unit_of_work = self.unit_of_work()
+            g.db_unit_of_work.__enter__()
+        
+        @app.teardown_request
+        def _end_unit_of_work(exc):
+            unit_of_work = g.pop('db_unit_of_work', None)
+            if unit_of_work is None:
+                return
+            if exc is None:
+                unit_of_work.__exit__(None, None, None)
+            else:
+                unit_of_work.__exit__(type(exc), exc, exc.__traceback__)
+    
+    def close_all(self):
+        """대기 중인 카운터를 저장한 뒤 풀의 유휴 연결 모두 종료"""
+        if self.counters:
+            self.counters.flush()
+        self.pool.close_all()
+        self.cache.clear()
+        self.seen.clear()
+    
+    # ===== 읽기 캐시 =====
+    def _cached(self, key, loader):
+        """
+        읽기 캐시 조회, 없으면 loader() 결과를 저장 (read-through)
+        
+        호출자가 결과를 수정해도 캐시가 오염되지 않도록 복사본을 반환하며,
+        커밋되지 않은 쓰기 범위 안에서 읽은 값은 저장하지 않습니다.
+        """
+        value = self.cache.get(key)
+        if value is not MISSING:
+            return copy.deepcopy(value)
+        
+        generation = self.cache.generation
+        value = loader()
+        if not self.pool.in_transaction():
+            self.cache.set(key, copy.deepcopy(value), generation=generation)
+        return value
+    
+    def _invalidate(self, *keys):
+        """캐시 무효화 (즉시 + 현재 트랜잭션 commit 직후 한 번 더)"""
+        self.cache.invalidate(*keys)
+        self.pool.call_after_commit(lambda: self.cache.invalidate(*keys))
+    
+    def get_cache_stats(self) -> Dict:
+        """읽기 캐시 적중/미스 통계"""
+        return self.cache.stats()
     
     def _init_database(self):
         """데이터베이스 초기화 (테이블 생성)"""
-        # data 디렉토리 생성
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -70,12 +226,19 @@ class DatabaseService:
                     course_id TEXT NOT NULL,
                     week INTEGER NOT NULL,
                     upload_deadline TEXT,
+                    upload_deadline_ts INTEGER,
                     evaluation_status TEXT DEFAULT 'pending',
                     FOREIGN KEY (course_id) REFERENCES courses(course_id),
                     UNIQUE(course_id, week)
                 )
             ''')
             
+            # 마감일 epoch 초 컬럼 (기존 DB에는 추가 후 문자열에서 채움)
+            cursor.execute('PRAGMA table_info(course_weeks)')
+            if 'upload_deadline_ts' not in {row['name'] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE course_weeks ADD COLUMN upload_deadline_ts INTEGER')
+            self._sync_deadline_timestamps(cursor)
+            
             # Materials 테이블
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS materials (
@@ -88,6 +251,7 @@ class DatabaseService:
                     filename TEXT NOT NULL,
                     gcs_path TEXT NOT NULL,
                     page_count INTEGER DEFAULT 0,
+                    content_hash TEXT,
                     upload_date TEXT DEFAULT CURRENT_TIMESTAMP,
                     download_count INTEGER DEFAULT 0,
                     view_count INTEGER DEFAULT 0,
@@ -98,6 +262,11 @@ class DatabaseService:
                 )
             ''')
             
+            # 업로드 파일 SHA-256 컬럼 (기존 DB에는 추가)
+            cursor.execute('PRAGMA table_info(materials)')
+            if 'content_hash' not in {row['name'] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE materials ADD COLUMN content_hash TEXT')
+            
             # Custom PDFs 테이블
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS custom_pdfs (
@@ -157,11 +326,354 @@ class DatabaseService:
                 )
             ''')
             
+            # Course Enrollments 테이블 (수강 등록, 강의×학생 한 행)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS course_enrollments (
+                    course_id TEXT NOT NULL,
+                    student_id TEXT NOT NULL,
+                    enrolled_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (course_id, student_id),
+                    FOREIGN KEY (course_id) REFERENCES courses(course_id),
+                    FOREIGN KEY (student_id) REFERENCES users(user_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            # ID 시퀀스 테이블 (COUNT(*) 대신 O(1) ID 발급)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS id_sequences (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            
+            # 주차별 요약 테이블 (materials 트리거로 증분 유지)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'week_summary'")
+            summary_exists = cursor.fetchone() is not None
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS week_summary (
+                    course_id TEXT NOT NULL,
+                    week INTEGER NOT NULL,
+                    professor_count INTEGER NOT NULL DEFAULT 0,
+                    student_count INTEGER NOT NULL DEFAULT 0,
+                    total_downloads INTEGER NOT NULL DEFAULT 0,
+                    total_views INTEGER NOT NULL DEFAULT 0,
+                    evaluated_count INTEGER NOT NULL DEFAULT 0,
+                    score_sum REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (course_id, week)
+                ) WITHOUT ROWID
+            ''')
+            self._create_week_summary_triggers(cursor)
+            if not summary_exists:
+                self._rebuild_week_summary(cursor)
+            
+            # 자료별 고유 조회/다운로드 사용자 (세션 쿠키 대신 서버에서 중복 판별)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS material_viewers (
+                    material_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    first_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (material_id, kind, user_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            # 자료 전문 검색 인덱스 (FTS5)
+            # page_number 0 = 파일명/업로더 행 (materials 트리거로 유지), 1 이상 = 페이지 본문 행
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'material_search'")
+            search_exists = cursor.fetchone() is not None
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS material_search USING fts5(
+                    filename, uploader_name, body, material_id, course_id,
+                    page_number UNINDEXED,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            ''')
+            # 본문 추출/색인 완료 여부
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS material_search_status (
+                    material_id TEXT PRIMARY KEY,
+                    indexed_pages INTEGER NOT NULL,
+                    indexed_at TEXT DEFAULT CURRENT_TIMESTAMP
+                ) WITHOUT ROWID
+            ''')
+            self._create_search_triggers(cursor)
+            if not search_exists:
+                self._rebuild_search_metadata(cursor)
+            
+            # 자료별 썸네일 목록 (렌더링 시 기록, 조회 시 GCS 목록 API 대신 사용)
+            # render_status: 'rendered' | 'failed' (실패한 페이지는 gcs_path 없음)
+            # attempts: 연속 실패 횟수 (재시도 간격 계산용, 성공하면 0)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS material_pages (
+                    material_id TEXT NOT NULL,
+                    page_number INTEGER NOT NULL,
+                    gcs_path TEXT,
+                    width INTEGER,
+                    height INTEGER,
+                    byte_size INTEGER,
+                    render_status TEXT NOT NULL DEFAULT 'rendered',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    rendered_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (material_id, page_number)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('PRAGMA table_info(material_pages)')
+            if 'attempts' not in {row['name'] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE material_pages ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_materials_pages_delete
+                AFTER DELETE ON materials
+                BEGIN
+                    DELETE FROM material_pages WHERE material_id = OLD.material_id;
+                END
+            ''')
+            
             # 인덱스 생성
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_materials_course_week ON materials(course_id, week)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_custom_pdfs_student ON custom_pdfs(student_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_invitations_course ON course_invitations(course_id)')
+            self._create_indexes(cursor)
+            
+            # 기존 enrolled_students 문자열 → course_enrollments 이전 (이전 후 컬럼은 비움)
+            cursor.execute('''
+                SELECT course_id, enrolled_students FROM courses
+                WHERE enrolled_students IS NOT NULL AND enrolled_students != ''
+            ''')
+            legacy_rows = cursor.fetchall()
+            if legacy_rows:
+                cursor.executemany(
+                    'INSERT OR IGNORE INTO course_enrollments (course_id, student_id) VALUES (?, ?)',
+                    [(row['course_id'], student_id.strip())
+                     for row in legacy_rows
+                     for student_id in row['enrolled_students'].split(',') if student_id.strip()]
+                )
+                cursor.execute("UPDATE courses SET enrolled_students = NULL WHERE enrolled_students IS NOT NULL")
+            
+            # 시퀀스 초기값: 기존 데이터의 최대 번호 (최초 1회만 계산)
+            cursor.execute('SELECT name FROM id_sequences')
+            existing = {row['name'] for row in cursor.fetchall()}
+            missing = [name for name in ID_SEQUENCES if name not in existing]
+            if missing:
+                self._sync_id_sequences(cursor, missing)
+    
+    def _create_week_summary_triggers(self, cursor):
+        """materials 변경 시 week_summary를 증감하는 트리거 생성 (라우트/스케줄러의 직접 SQL 포함)"""
+        def apply(row: str, sign: int) -> str:
+            return f'''
+                INSERT INTO week_summary (course_id, week, professor_count, student_count,
+                                          total_downloads, total_views, evaluated_count, score_sum)
+                VALUES ({row}.course_id, {row}.week,
+                        {sign} * ({row}.type = 'professor'), {sign} * ({row}.type = 'student'),
+                        {sign} * COALESCE({row}.download_count, 0), {sign} * COALESCE({row}.view_count, 0),
+                        {sign} * ({row}.evaluation_score IS NOT NULL), {sign} * COALESCE({row}.evaluation_score, 0))
+                ON CONFLICT(course_id, week) DO UPDATE SET
+                    professor_count = professor_count + excluded.professor_count,
+                    student_count = student_count + excluded.student_count,
+                    total_downloads = total_downloads + excluded.total_downloads,
+                    total_views = total_views + excluded.total_views,
+                    evaluated_count = evaluated_count + excluded.evaluated_count,
+                    score_sum = score_sum + excluded.score_sum;
+            '''
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_materials_summary_insert
+            AFTER INSERT ON materials
+            BEGIN {apply('NEW', 1)} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_materials_summary_delete
+            AFTER DELETE ON materials
+            BEGIN {apply('OLD', -1)} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_materials_summary_update
+            AFTER UPDATE OF course_id, week, type, download_count, view_count, evaluation_score ON materials
+            BEGIN {apply('OLD', -1)} {apply('NEW', 1)} END
+        ''')
+    
+    def _rebuild_week_summary(self, cursor):
+        """materials 전체를 다시 집계해 week_summary 재생성"""
+        cursor.execute('DELETE FROM week_summary')
+        cursor.execute('''
+            INSERT INTO week_summary (course_id, week, professor_count, student_count,
+                                      total_downloads, total_views, evaluated_count, score_sum)
+            SELECT course_id, week,
+                   SUM(type = 'professor'), SUM(type = 'student'),
+                   COALESCE(SUM(download_count), 0), COALESCE(SUM(view_count), 0),
+                   COUNT(evaluation_score), COALESCE(SUM(evaluation_score), 0)
+            FROM materials
+            GROUP BY course_id, week
+        ''')
+    
+    def rebuild_week_summary(self):
+        """
+        week_summary 재집계
+        
+        INSERT OR REPLACE로 자료를 덮어쓰면 DELETE 트리거가 실행되지 않으므로
+        그런 방식으로 대량 적재한 뒤(마이그레이션 등) 호출
+        """
+        with self.get_connection() as conn:
+            self._rebuild_week_summary(conn.cursor())
+    
+    def _create_search_triggers(self, cursor):
+        """자료 추가/삭제 시 검색 인덱스의 파일명/업로더 행을 함께 추가/삭제"""
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_materials_search_insert
+            AFTER INSERT ON materials
+            BEGIN
+                INSERT INTO material_search (filename, uploader_name, body, material_id, course_id, page_number)
+                VALUES (NEW.filename, NEW.uploader_name, '', NEW.material_id, NEW.course_id, 0);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_materials_search_delete
+            AFTER DELETE ON materials
+            BEGIN
+                DELETE FROM material_search
+                WHERE material_search MATCH 'material_id:"' || replace(OLD.material_id, '"', '""') || '"';
+                DELETE FROM material_search_status WHERE material_id = OLD.material_id;
+            END
+        ''')
+    
+    def _rebuild_search_metadata(self, cursor):
+        """검색 인덱스의 파일명/업로더 행을 materials 기준으로 재생성 (본문 행은 유지)"""
+        cursor.execute('DELETE FROM material_search WHERE page_number = 0')
+        cursor.execute('''
+            INSERT INTO material_search (filename, uploader_name, body, material_id, course_id, page_number)
+            SELECT filename, uploader_name, '', material_id, course_id, 0 FROM materials
+        ''')
+    
+    def rebuild_search_metadata(self):
+        """
+        검색 인덱스의 파일명/업로더 행 재생성
+        
+        INSERT OR REPLACE로 자료를 덮어쓰면 DELETE 트리거가 실행되지 않으므로
+        그런 방식으로 대량 적재한 뒤(마이그레이션 등) 호출
+        """
+        with self.get_connection() as conn:
+            self._rebuild_search_metadata(conn.cursor())
+    
+    def _create_indexes(self, cursor):
+        """보조 인덱스 생성 (이미 있으면 건너뜀)"""
+        # 목록 keyset 페이지네이션용 복합 인덱스 (정렬 순서와 동일)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_materials_course_week_date
+            ON materials(course_id, week, upload_date DESC, material_id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+            ON notifications(user_id, created_at DESC, notification_id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notifications_user_unread
+            ON notifications(user_id, is_read, created_at DESC, notification_id DESC)
+        ''')
+        # 위 인덱스의 접두어와 겹치는 기존 인덱스 제거
+        cursor.execute('DROP INDEX IF EXISTS idx_materials_course_week')
+        cursor.execute('DROP INDEX IF EXISTS idx_notifications_user')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_custom_pdfs_student ON custom_pdfs(student_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_invitations_course ON course_invitations(course_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_enrollments_student ON course_enrollments(student_id, course_id)')
+        # 마감이 지났고 평가가 끝나지 않은 주차 조회용 (스케줄러)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_course_weeks_due
+            ON course_weeks(upload_deadline_ts)
+            WHERE evaluation_status != 'completed'
+        ''')
+    
+    def create_indexes(self):
+        """
+        보조 인덱스 (재)생성 후 통계 갱신
+        
+        대량 적재 시 인덱스를 지운 채 넣고 마지막에 한 번에 만드는 용도
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._create_indexes(cursor)
+            cursor.execute('ANALYZE')
+    
+    def _sync_deadline_timestamps(self, cursor):
+        """upload_deadline_ts가 비어 있는 주차를 문자열 마감일에서 채움"""
+        cursor.execute('''
+            SELECT id, upload_deadline FROM course_weeks
+            WHERE upload_deadline IS NOT NULL AND upload_deadline_ts IS NULL
+        ''')
+        rows = [(_deadline_timestamp(row['upload_deadline']), row['id']) for row in cursor.fetchall()]
+        rows = [row for row in rows if row[0] is not None]
+        if rows:
+            cursor.executemany('UPDATE course_weeks SET upload_deadline_ts = ? WHERE id = ?', rows)
+    
+    def sync_deadline_timestamps(self):
+        """마감일 문자열만 넣은 뒤(마이그레이션 등) epoch 컬럼 채우기"""
+        with self.get_connection() as conn:
+            self._sync_deadline_timestamps(conn.cursor())
+        self.cache.clear()
+    
+    def _sync_id_sequences(self, cursor, names):
+        """시퀀스 값을 테이블의 실제 최대 번호 이상으로 맞춤"""
+        for name in names:
+            max_sql = ID_SEQUENCES[name][0]
+            cursor.execute(max_sql)
+            current = max(cursor.fetchone()[0] or 0, 0)
+            cursor.execute('''
+                INSERT INTO id_sequences (name, value) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)
+            ''', (name, current))
+    
+    def sync_id_sequences(self):
+        """ID를 직접 지정해 INSERT한 뒤(마이그레이션 등) 시퀀스 재동기화"""
+        with self.get_connection() as conn:
+            self._sync_id_sequences(conn.cursor(), list(ID_SEQUENCES))
+    
+    def _next_id(self, cursor, sequence: str) -> str:
+        """
+        시퀀스에서 다음 ID 발급 (호출자의 트랜잭션 안에서 실행)
+        
+        UPDATE가 쓰기 잠금을 먼저 잡으므로 스레드/프로세스 간에도 중복되지 않으며,
+        INSERT가 실패해 롤백되면 번호도 함께 롤백됩니다.
+        """
+        return self._next_ids(cursor, sequence, 1)[0]
+    
+    def _next_ids(self, cursor, sequence: str, count: int) -> List[str]:
+        """시퀀스에서 연속된 ID count개를 한 번에 발급"""
+        if count <= 0:
+            return []
+        _, id_format, offset = ID_SEQUENCES[sequence]
+        cursor.execute('UPDATE id_sequences SET value = value + ? WHERE name = ?', (count, sequence))
+        cursor.execute('SELECT value FROM id_sequences WHERE name = ?', (sequence,))
+        last = cursor.fetchone()['value']
+        return [id_format.format(offset + value) for value in range(last - count + 1, last + 1)]
+    
+    def allocate_id(self, sequence: str) -> str:
+        """
+        ID 미리 발급 (DB 저장 전에 ID가 필요한 경우, 예: GCS 경로)
+        
+        Args:
+            sequence: ID_SEQUENCES의 이름 ('material', 'custom_pdf' 등)
+        """
+        with self.get_connection() as conn:
+            return self._next_id(conn.cursor(), sequence)
+    
+    def _run_immediate(self, func):
+        """
+        func(cursor)를 BEGIN IMMEDIATE 트랜잭션에서 실행 (잠금 경합 시 재시도)
+        
+        쓰기 잠금을 트랜잭션 시작 시점에 잡으므로 읽은 값이 커밋 전까지 바뀌지 않으며,
+        잠금을 얻지 못하면(busy_timeout 초과) 지수 백오프 + 지터 후 전체를 다시 실행합니다.
+        이미 바깥 쓰기 범위 안이라면 그 트랜잭션에 합류하고 재시도하지 않습니다.
+        """
+        nested = self.pool.in_transaction()
+        attempt = 0
+        while True:
+            try:
+                with self.get_connection() as conn:
+                    if not conn.in_transaction:
+                        conn.execute('BEGIN IMMEDIATE')
+                    return func(conn.cursor())
+            except sqlite3.OperationalError as e:
+                busy = 'locked' in str(e) or 'busy' in str(e)
+                if nested or not busy or attempt >= Config.DB_BUSY_RETRIES:
+                    raise
+                delay = Config.DB_BUSY_RETRY_DELAY * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay))
+                attempt += 1
     
     def _row_to_dict(self, row) -> Dict:
         """sqlite3.Row를 딕셔너리로 변환"""
@@ -169,24 +681,47 @@ class DatabaseService:
             return None
         return dict(row)
     
+    def _attach_enrollments(self, cursor, courses: List[Dict]) -> List[Dict]:
+        """강의 목록에 enrolled_students 리스트 채우기 (course_enrollments 인덱스 조회)"""
+        by_id = {}
+        for course in courses:
+            course['enrolled_students'] = []
+            by_id[course['course_id']] = course
+        
+        course_ids = list(by_id)
+        for start in range(0, len(course_ids), 500):
+            chunk = course_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT course_id, student_id FROM course_enrollments
+                WHERE course_id IN ({placeholders})
+                ORDER BY course_id, enrolled_at
+            ''', chunk)
+            for row in cursor.fetchall():
+                by_id[row['course_id']]['enrolled_students'].append(row['student_id'])
+        return courses
+    
     # ===== 사용자 관련 =====
     def get_user_by_id(self, user_id: str) -> Optional[Dict]:
-        """사용자 조회"""
-        with self.get_connection() as conn:
+        """사용자 조회 (캐시)"""
+        return self._cached(('user', user_id), lambda: self._load_user(user_id))
+    
+    def _load_user(self, user_id: str) -> Optional[Dict]:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
             return self._row_to_dict(cursor.fetchone())
     
     def get_user_by_email(self, email: str) -> Optional[Dict]:
         """이메일로 사용자 조회"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
             return self._row_to_dict(cursor.fetchone())
     
     def authenticate_user(self, email: str, password: str) -> Optional[Dict]:
         """로그인 인증"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users WHERE email = ? AND password = ?', (email, password))
             return self._row_to_dict(cursor.fetchone())
@@ -203,13 +738,9 @@ class DatabaseService:
             
             # user_id 자동 생성
             if user['role'] == 'professor':
-                cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'professor'")
-                count = cursor.fetchone()['count']
-                user_id = f"P{count + 1:05d}"
+                user_id = self._next_id(cursor, 'professor')
             else:  # student
-                cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'student'")
-                count = cursor.fetchone()['count']
-                user_id = f"{202300000 + count + 1}"
+                user_id = self._next_id(cursor, 'student')
             
             cursor.execute('''
                 INSERT INTO users (user_id, email, password, name, role, student_id)
@@ -217,11 +748,12 @@ class DatabaseService:
             ''', (user_id, user['email'], user['password'], user['name'], 
                   user['role'], user.get('student_id', user_id if user['role'] == 'student' else None)))
             
+            self._invalidate(('user', user_id))
             return user_id
     
     def get_all_users(self) -> List[Dict]:
         """모든 사용자 조회"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM users')
             return [self._row_to_dict(row) for row in cursor.fetchall()]
@@ -229,31 +761,25 @@ class DatabaseService:
     # ===== 강의 관련 =====
     def get_all_courses(self) -> List[Dict]:
         """모든 강의 조회"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM courses')
             courses = [self._row_to_dict(row) for row in cursor.fetchall()]
-            # enrolled_students를 리스트로 변환
-            for course in courses:
-                if course['enrolled_students']:
-                    course['enrolled_students'] = course['enrolled_students'].split(',')
-                else:
-                    course['enrolled_students'] = []
-            return courses
+            return self._attach_enrollments(cursor, courses)
     
     def get_course_by_id(self, course_id: str) -> Optional[Dict]:
-        """강의 ID로 조회"""
-        with self.get_connection() as conn:
+        """강의 ID로 조회 (캐시, 수강생/주차 설정 포함)"""
+        return self._cached(('course', course_id), lambda: self._load_course(course_id))
+    
+    def _load_course(self, course_id: str) -> Optional[Dict]:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM courses WHERE course_id = ?', (course_id,))
             course = self._row_to_dict(cursor.fetchone())
-            if course and course['enrolled_students']:
-                course['enrolled_students'] = course['enrolled_students'].split(',')
-            elif course:
-                course['enrolled_students'] = []
             
-            # weeks 정보 추가
+            # 수강생, weeks 정보 추가
             if course:
+                self._attach_enrollments(cursor, [course])
                 cursor.execute('''
                     SELECT week, upload_deadline, evaluation_status 
                     FROM course_weeks 
@@ -272,26 +798,66 @@ class DatabaseService:
     
     def get_courses_by_student(self, student_id: str) -> List[Dict]:
         """학생이 수강하는 강의 목록"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM courses 
-                WHERE enrolled_students LIKE ?
-            ''', (f'%{student_id}%',))
+                SELECT c.* FROM course_enrollments e
+                JOIN courses c ON c.course_id = e.course_id
+                WHERE e.student_id = ?
+            ''', (student_id,))
             courses = [self._row_to_dict(row) for row in cursor.fetchall()]
-            for course in courses:
-                if course['enrolled_students']:
-                    course['enrolled_students'] = course['enrolled_students'].split(',')
-                else:
-                    course['enrolled_students'] = []
-            return courses
+            return self._attach_enrollments(cursor, courses)
     
     def get_courses_by_professor(self, professor_id: str) -> List[Dict]:
         """교수가 담당하는 강의 목록"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM courses WHERE professor_id = ?', (professor_id,))
-            return [self._row_to_dict(row) for row in cursor.fetchall()]
+            courses = [self._row_to_dict(row) for row in cursor.fetchall()]
+            return self._attach_enrollments(cursor, courses)
+    
+    def get_course_list_validator(self, user_id: str, role: str) -> tuple:
+        """
+        강의 목록 응답의 검증값 (조건부 GET용)
+        
+        강의 행은 생성 후 바뀌지 않으므로 강의 ID와 강의별 수강 등록 수/최근 등록 시각만 비교합니다.
+        """
+        if role == 'professor':
+            where = 'c.professor_id = ?'
+        else:
+            where = 'c.course_id IN (SELECT course_id FROM course_enrollments WHERE student_id = ?)'
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT c.course_id, COUNT(e.student_id), MAX(e.enrolled_at)
+                FROM courses c
+                LEFT JOIN course_enrollments e ON e.course_id = c.course_id
+                WHERE {where}
+                GROUP BY c.course_id
+                ORDER BY c.course_id
+            ''', (user_id,))
+            return tuple(tuple(row) for row in cursor.fetchall())
+    
+    def get_enrolled_students(self, course_id: str) -> List[str]:
+        """강의 수강생 ID 목록"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT student_id FROM course_enrollments
+                WHERE course_id = ?
+                ORDER BY enrolled_at
+            ''', (course_id,))
+            return [row['student_id'] for row in cursor.fetchall()]
+    
+    def is_enrolled(self, course_id: str, student_id: str) -> bool:
+        """수강 여부 확인"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT 1 FROM course_enrollments
+                WHERE course_id = ? AND student_id = ?
+            ''', (course_id, student_id))
+            return cursor.fetchone() is not None
     
     def add_course(self, course: Dict) -> str:
         """강의 추가"""
@@ -299,19 +865,21 @@ class DatabaseService:
             cursor = conn.cursor()
             
             # course_id 자동 생성
-            cursor.execute('SELECT COUNT(*) as count FROM courses')
-            count = cursor.fetchone()['count']
-            course_id = f"C{count + 1:03d}"
-            
-            # enrolled_students를 문자열로 변환
-            students_str = ','.join(course.get('enrolled_students', []))
+            course_id = self._next_id(cursor, 'course')
             
             cursor.execute('''
-                INSERT INTO courses (course_id, course_name, professor_id, professor_name, enrolled_students)
-                VALUES (?, ?, ?, ?, ?)
+                INSERT INTO courses (course_id, course_name, professor_id, professor_name)
+                VALUES (?, ?, ?, ?)
             ''', (course_id, course['course_name'], course['professor_id'], 
-                  course['professor_name'], students_str))
+                  course['professor_name']))
+            
+            # 수강생 등록
+            cursor.executemany(
+                'INSERT OR IGNORE INTO course_enrollments (course_id, student_id) VALUES (?, ?)',
+                [(course_id, student_id) for student_id in course.get('enrolled_students', [])]
+            )
             
+            self._invalidate(('course', course_id))
             return course_id
     
     def set_week_deadline(self, course_id: str, week: int, deadline: str):
@@ -319,67 +887,225 @@ class DatabaseService:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT OR REPLACE INTO course_weeks (course_id, week, upload_deadline, evaluation_status)
-                VALUES (?, ?, ?, 'pending')
-            ''', (course_id, week, deadline))
+                INSERT OR REPLACE INTO course_weeks
+                (course_id, week, upload_deadline, upload_deadline_ts, evaluation_status)
+                VALUES (?, ?, ?, ?, 'pending')
+            ''', (course_id, week, deadline, _deadline_timestamp(deadline)))
+            self._invalidate(('course', course_id), ('deadlines', course_id))
     
-    def get_week_deadline(self, course_id: str, week: int) -> Optional[str]:
-        """주차별 업로드 마감일 조회"""
+    def mark_week_evaluation_completed(self, course_id: str, week: int):
+        """주차 평가 상태를 완료로 변경 (업로드 마감일은 유지)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT upload_deadline FROM course_weeks 
-                WHERE course_id = ? AND week = ?
+                INSERT INTO course_weeks (course_id, week, evaluation_status)
+                VALUES (?, ?, 'completed')
+                ON CONFLICT(course_id, week) DO UPDATE SET evaluation_status = 'completed'
             ''', (course_id, week))
-            row = cursor.fetchone()
-            return row['upload_deadline'] if row else None
+            self._invalidate(('course', course_id), ('deadlines', course_id))
     
-    def is_upload_period_open(self, course_id: str, week: int) -> bool:
-        """업로드 기간이 열려있는지 확인"""
-        deadline = self.get_week_deadline(course_id, week)
-        if not deadline:
-            return True
+    def _deadline_calendar(self, course_id: str) -> Dict[int, tuple]:
+        """
+        강의의 주차별 (마감일 문자열, epoch 초) - 강의당 한 번 조회 후 메모리에서 판정
+        
+        set_week_deadline 등 course_weeks 쓰기 시 무효화됩니다.
+        값은 읽기 전용으로만 사용하므로 읽기 캐시의 복사(deepcopy)를 거치지 않습니다.
+        """
+        key = ('deadlines', course_id)
+        calendar = self.cache.get(key)
+        if calendar is not MISSING:
+            return calendar
         
-        try:
-            deadline_dt = datetime.fromisoformat(deadline.replace('Z', ''))
-            return datetime.now() < deadline_dt
-        except:
+        generation = self.cache.generation
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT week, upload_deadline, upload_deadline_ts FROM course_weeks
+                WHERE course_id = ? AND upload_deadline IS NOT NULL
+            ''', (course_id,))
+            calendar = {row['week']: (row['upload_deadline'], row['upload_deadline_ts'])
+                        for row in cursor.fetchall()}
+        if not self.pool.in_transaction():
+            self.cache.set(key, calendar, generation=generation)
+        return calendar
+    
+    def get_week_deadline(self, course_id: str, week: int) -> Optional[str]:
+        """주차별 업로드 마감일 조회 (메모리 캘린더)"""
+        entry = self._deadline_calendar(course_id).get(week)
+        return entry[0] if entry else None
+    
+    def is_upload_period_open(self, course_id: str, week: int) -> bool:
+        """업로드 기간이 열려있는지 확인 (마감일이 없거나 해석할 수 없으면 열림)"""
+        entry = self._deadline_calendar(course_id).get(week)
+        if not entry or entry[1] is None:
             return True
+        return time.time() < entry[1]
     
     def can_view_materials(self, course_id: str, week: int) -> bool:
-        """자료 열람 가능 여부"""
-        deadline = self.get_week_deadline(course_id, week)
-        if not deadline:
-            return True
-        
-        try:
-            deadline_dt = datetime.fromisoformat(deadline.replace('Z', ''))
-            return datetime.now() >= deadline_dt
-        except:
+        """자료 열람 가능 여부 (마감일이 지나면 열람 가능)"""
+        entry = self._deadline_calendar(course_id).get(week)
+        if not entry or entry[1] is None:
             return True
+        return time.time() >= entry[1]
+    
+    def get_due_weeks(self, now: float = None) -> List[Dict]:
+        """마감일이 지났고 평가가 끝나지 않은 주차 목록 (idx_course_weeks_due 부분 인덱스 사용)"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT course_id, week, upload_deadline FROM course_weeks
+                WHERE evaluation_status != 'completed' AND upload_deadline_ts <= ?
+                ORDER BY course_id, week
+            ''', (int(now if now is not None else time.time()),))
+            return [self._row_to_dict(row) for row in cursor.fetchall()]
     
     # ===== 자료 관련 =====
-    def get_materials_by_course_week(self, course_id: str, week: int) -> List[Dict]:
-        """특정 강의의 특정 주차 자료 조회"""
-        with self.get_connection() as conn:
+    def get_week_validator(self, course_id: str, week: int) -> tuple:
+        """
+        주차 자료 응답의 검증값 (조건부 GET용, 쿼리 한 번)
+        
+        자료 수/최근 업로드 시각/조회·다운로드·평가 합계와 강의 수강 등록, 주차 설정을 포함합니다.
+        조회/다운로드 수는 flush된 값 기준이므로 약한(weak) ETag로 사용합니다.
+        """
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM materials 
+                SELECT COUNT(*), MAX(upload_date), MAX(material_id),
+                       TOTAL(view_count), TOTAL(download_count),
+                       COUNT(evaluation_score), TOTAL(evaluation_score),
+                       (SELECT COUNT(*) || ':' || IFNULL(MAX(enrolled_at), '')
+                        FROM course_enrollments WHERE course_id = ?),
+                       (SELECT group_concat(week || '=' || IFNULL(upload_deadline, '') || '/' || evaluation_status)
+                        FROM course_weeks WHERE course_id = ?)
+                FROM materials
                 WHERE course_id = ? AND week = ?
-                ORDER BY upload_date DESC
-            ''', (course_id, week))
-            return [self._row_to_dict(row) for row in cursor.fetchall()]
+            ''', (course_id, course_id, course_id, week))
+            return tuple(cursor.fetchone())
     
-    def get_materials_by_course(self, course_id: str) -> List[Dict]:
-        """특정 강의의 모든 자료 조회"""
-        with self.get_connection() as conn:
+    def get_materials_by_course_week(self, course_id: str, week: int, material_type: str = None,
+                                     limit: int = None, after: tuple = None,
+                                     uploader_id: str = None) -> List[Dict]:
+        """
+        특정 강의의 특정 주차 자료 조회 (최신순)
+        
+        Args:
+            material_type: 'professor' / 'student' (None이면 전체)
+            limit: 최대 개수 (None이면 전체)
+            after: 이전 페이지 마지막 항목의 (upload_date, material_id)
+            uploader_id: 지정하면 해당 사용자가 올린 자료만 (열람 전 학생 본인 자료)
+        """
+        sql = 'SELECT * FROM materials WHERE course_id = ? AND week = ?'
+        params = [course_id, week]
+        if material_type:
+            sql += ' AND type = ?'
+            params.append(material_type)
+        if uploader_id:
+            sql += ' AND uploader_id = ?'
+            params.append(uploader_id)
+        if after:
+            sql += ' AND (upload_date, material_id) < (?, ?)'
+            params.extend(after)
+        sql += ' ORDER BY upload_date DESC, material_id DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return self._merge_pending_counts([self._row_to_dict(row) for row in cursor.fetchall()])
+    
+    def get_materials_by_course(self, course_id: str, limit: int = None, after: tuple = None) -> List[Dict]:
+        """
+        특정 강의의 모든 자료 조회 (주차순, 주차 안에서는 최신순)
+        
+        Args:
+            limit: 최대 개수 (None이면 전체)
+            after: 이전 페이지 마지막 항목의 (week, upload_date, material_id)
+        """
+        sql = 'SELECT * FROM materials WHERE course_id = ?'
+        params = [course_id]
+        if after:
+            week, upload_date, material_id = after
+            sql += '''
+                AND (week > ? OR (week = ? AND (upload_date, material_id) < (?, ?)))
+            '''
+            params.extend([week, week, upload_date, material_id])
+        sql += ' ORDER BY week, upload_date DESC, material_id DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return self._merge_pending_counts([self._row_to_dict(row) for row in cursor.fetchall()])
+    
+    def get_week_stats(self, course_id: str) -> List[Dict]:
+        """
+        주차별 자료 통계 (week_summary 인덱스 조회, 자료 수와 무관)
+        
+        course_weeks에 설정된 주차 + 자료가 있는 주차를 반환하며,
+        설정된 주차가 하나도 없으면 1~DEFAULT_WEEK_COUNT 주차를 반환합니다.
+        """
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM materials 
-                WHERE course_id = ?
-                ORDER BY week, upload_date DESC
+                SELECT week, professor_count, student_count, total_downloads, total_views,
+                       evaluated_count, score_sum
+                FROM week_summary
+                WHERE course_id = ? AND professor_count + student_count > 0
             ''', (course_id,))
-            return [self._row_to_dict(row) for row in cursor.fetchall()]
+            summaries = cursor.fetchall()
+            
+            cursor.execute('SELECT week FROM course_weeks WHERE course_id = ?', (course_id,))
+            weeks = {row['week'] for row in cursor.fetchall()}
+            
+            # 아직 저장되지 않은 조회/다운로드 증가분 합산
+            pending = self.counters.pending() if self.counters else {}
+            pending_by_week = {}
+            if pending:
+                material_ids = list(pending)
+                placeholders = ','.join('?' * len(material_ids))
+                cursor.execute(f'''
+                    SELECT material_id, week FROM materials
+                    WHERE course_id = ? AND material_id IN ({placeholders})
+                ''', [course_id] + material_ids)
+                for row in cursor.fetchall():
+                    week_deltas = pending_by_week.setdefault(row['week'], {})
+                    for field, amount in pending[row['material_id']].items():
+                        week_deltas[field] = week_deltas.get(field, 0) + amount
+        
+        if not weeks:
+            weeks = set(range(1, DEFAULT_WEEK_COUNT + 1))
+        weeks.update(row['week'] for row in summaries)
+        weeks.update(pending_by_week)
+        
+        stats = {week: {
+            'week': week,
+            'professor_count': 0,
+            'student_count': 0,
+            'total_downloads': 0,
+            'total_views': 0,
+            'evaluated_count': 0,
+            'average_score': None
+        } for week in sorted(weeks)}
+        
+        for row in summaries:
+            week_stats = stats[row['week']]
+            week_stats['professor_count'] = row['professor_count']
+            week_stats['student_count'] = row['student_count']
+            week_stats['total_downloads'] = row['total_downloads']
+            week_stats['total_views'] = row['total_views']
+            week_stats['evaluated_count'] = row['evaluated_count']
+            if row['evaluated_count']:
+                week_stats['average_score'] = round(row['score_sum'] / row['evaluated_count'], 2)
+        
+        for week, deltas in pending_by_week.items():
+            stats[week]['total_downloads'] += deltas.get('download_count', 0)
+            stats[week]['total_views'] += deltas.get('view_count', 0)
+        
+        return list(stats.values())
     
     def add_material(self, material: Dict) -> str:
         """자료 추가"""
@@ -387,30 +1113,113 @@ class DatabaseService:
             cursor = conn.cursor()
             
             # material_id 자동 생성
-            cursor.execute('SELECT COUNT(*) as count FROM materials')
-            count = cursor.fetchone()['count']
-            material_id = f"M{count + 1:03d}"
+            material_id = self._next_id(cursor, 'material')
             
             cursor.execute('''
                 INSERT INTO materials 
                 (material_id, course_id, week, type, uploader_id, uploader_name, 
-                 filename, gcs_path, page_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 filename, gcs_path, page_count, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (material_id, material['course_id'], material['week'], 
                   material['type'], material['uploader_id'], material['uploader_name'],
-                  material['filename'], material['gcs_path'], material.get('page_count', 0)))
+                  material['filename'], material['gcs_path'], material.get('page_count', 0),
+                  material.get('content_hash')))
             
             return material_id
     
     def get_material_by_id(self, material_id: str) -> Optional[Dict]:
         """자료 ID로 조회"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM materials WHERE material_id = ?', (material_id,))
-            return self._row_to_dict(cursor.fetchone())
+            material = self._row_to_dict(cursor.fetchone())
+            if material:
+                self._merge_pending_counts([material])
+            return material
+    
+    # ===== 조회/다운로드 카운터 (write-behind) =====
+    def _merge_pending_counts(self, materials: List[Dict]) -> List[Dict]:
+        """아직 저장되지 않은 조회/다운로드 증가분을 자료 딕셔너리에 합산"""
+        if not self.counters or not materials:
+            return materials
+        pending = self.counters.pending([m['material_id'] for m in materials])
+        for material in materials:
+            for field, amount in pending.get(material['material_id'], {}).items():
+                material[field] = (material.get(field) or 0) + amount
+        return materials
+    
+    def _apply_counter_deltas(self, deltas: Dict[str, Dict[str, int]], committed=None):
+        """모인 증가분을 한 트랜잭션으로 반영 (CounterBuffer flush, commit 직후 committed 호출)"""
+        with self.get_connection() as conn:
+            if committed:
+                self.pool.call_after_commit(committed)
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE materials
+                SET view_count = view_count + ?,
+                    download_count = download_count + ?
+                WHERE material_id = ?
+            ''', [(d.get('view_count', 0), d.get('download_count', 0), material_id)
+                  for material_id, d in deltas.items()])
+    
+    def flush_counters(self):
+        """대기 중인 조회/다운로드 증가분 즉시 저장"""
+        if self.counters:
+            self.counters.flush()
+    
+    def record_unique_access(self, material_id: str, user_id: str, kind: str) -> bool:
+        """
+        사용자별 첫 조회/다운로드일 때만 카운트 증가
+        
+        Args:
+            kind: 'view' 또는 'download'
+        
+        Returns:
+            처음 접근이라 카운트를 올렸으면 True
+        """
+        increment = self.increment_view_count if kind == 'view' else self.increment_download_count
+        if not user_id:
+            increment(material_id)
+            return True
+        
+        # 최근에 확인한 (자료, 사용자)는 DB 쓰기 없이 중복 처리
+        key = (kind, material_id, user_id)
+        if self.seen.get(key) is not MISSING:
+            return False
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR IGNORE INTO material_viewers (material_id, kind, user_id)
+                VALUES (?, ?, ?)
+            ''', (material_id, kind, user_id))
+            first = cursor.rowcount == 1
+            self.pool.call_after_commit(lambda: self.seen.set(key, True))
+        
+        if first:
+            increment(material_id)
+        return first
+    
+    def get_unique_access_counts(self, material_id: str) -> Dict:
+        """자료의 고유 조회자/다운로더 수"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT kind, COUNT(*) AS count FROM material_viewers
+                WHERE material_id = ?
+                GROUP BY kind
+            ''', (material_id,))
+            counts = {row['kind']: row['count'] for row in cursor.fetchall()}
+            return {
+                'unique_viewers': counts.get('view', 0),
+                'unique_downloaders': counts.get('download', 0)
+            }
     
     def increment_download_count(self, material_id: str):
-        """다운로드 수 증가"""
+        """다운로드 수 증가 (버퍼 사용 시 주기적으로 일괄 반영)"""
+        if self.counters:
+            self.counters.add(material_id, 'download_count')
+            return
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -420,7 +1229,10 @@ class DatabaseService:
             ''', (material_id,))
     
     def increment_view_count(self, material_id: str):
-        """조회 수 증가"""
+        """조회 수 증가 (버퍼 사용 시 주기적으로 일괄 반영)"""
+        if self.counters:
+            self.counters.add(material_id, 'view_count')
+            return
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -435,10 +1247,8 @@ class DatabaseService:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # custom_pdf_id 자동 생성
-            cursor.execute('SELECT COUNT(*) as count FROM custom_pdfs')
-            count = cursor.fetchone()['count']
-            custom_pdf_id = f"CP{count + 1:03d}"
+            # custom_pdf_id: 미리 발급받은 ID가 있으면 사용 (GCS 경로와 일치)
+            custom_pdf_id = custom_pdf.get('custom_pdf_id') or self._next_id(cursor, 'custom_pdf')
             
             cursor.execute('''
                 INSERT INTO custom_pdfs 
@@ -462,7 +1272,7 @@ class DatabaseService:
     
     def get_custom_pdfs_by_student(self, student_id: str) -> List[Dict]:
         """학생의 나만의 PDF 목록"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM custom_pdfs 
@@ -473,7 +1283,7 @@ class DatabaseService:
     
     def get_custom_pdf_by_id(self, custom_pdf_id: str) -> Optional[Dict]:
         """나만의 PDF 조회"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM custom_pdfs WHERE custom_pdf_id = ?', (custom_pdf_id,))
             pdf = self._row_to_dict(cursor.fetchone())
@@ -489,6 +1299,163 @@ class DatabaseService:
             
             return pdf
     
+    # ===== 검색 관련 =====
+    def index_material_pages(self, material_id: str, page_texts: List[str]) -> int:
+        """
+        자료의 페이지 본문을 검색 인덱스에 저장 (기존 본문 행은 교체)
+        
+        Args:
+            page_texts: 페이지 순서대로의 추출 텍스트
+        
+        Returns:
+            색인한 페이지 수 (텍스트가 없는 페이지 제외)
+        """
+        pages = [(page_number, text) for page_number, text in enumerate(page_texts, start=1)
+                 if text and text.strip()]
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT course_id FROM materials WHERE material_id = ?', (material_id,))
+            material = cursor.fetchone()
+            if not material:
+                return 0
+            
+            cursor.execute('''
+                DELETE FROM material_search
+                WHERE material_search MATCH ? AND page_number > 0
+            ''', (f'material_id:{_fts_phrase(material_id)}',))
+            cursor.executemany('''
+                INSERT INTO material_search (filename, uploader_name, body, material_id, course_id, page_number)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [('', '', text, material_id, material['course_id'], page_number)
+                  for page_number, text in pages])
+            cursor.execute('''
+                INSERT INTO material_search_status (material_id, indexed_pages, indexed_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(material_id) DO UPDATE SET
+                    indexed_pages = excluded.indexed_pages,
+                    indexed_at = excluded.indexed_at
+            ''', (material_id, len(pages)))
+            return len(pages)
+    
+    def save_material_pages(self, material_id: str, pages: List[Dict]) -> int:
+        """
+        썸네일 렌더링 결과 기록 (같은 페이지는 덮어씀, 실패가 이어지면 attempts 증가)
+        
+        Args:
+            pages: [{'page_number', 'gcs_path', 'width', 'height', 'byte_size', 'render_status'}]
+            
+        Returns:
+            기록한 페이지 수
+        """
+        if not pages:
+            return 0
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO material_pages
+                    (material_id, page_number, gcs_path, width, height, byte_size, render_status, attempts, rendered_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(material_id, page_number) DO UPDATE SET
+                    gcs_path = excluded.gcs_path,
+                    width = excluded.width,
+                    height = excluded.height,
+                    byte_size = excluded.byte_size,
+                    render_status = excluded.render_status,
+                    attempts = CASE WHEN excluded.render_status = 'failed'
+                                    THEN material_pages.attempts + 1 ELSE 0 END,
+                    rendered_at = excluded.rendered_at
+            ''', [(material_id, page['page_number'], page.get('gcs_path'), page.get('width'),
+                   page.get('height'), page.get('byte_size'), page.get('render_status', 'rendered'),
+                   1 if page.get('render_status') == 'failed' else 0)
+                  for page in pages])
+            return len(pages)
+    
+    def get_material_pages(self, material_id: str) -> List[Dict]:
+        """자료의 썸네일 목록 (페이지 순, 기본 키 범위 조회 한 번)"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT page_number, gcs_path, width, height, byte_size, render_status, attempts, rendered_at
+                FROM material_pages
+                WHERE material_id = ?
+                ORDER BY page_number
+            ''', (material_id,))
+            return [self._row_to_dict(row) for row in cursor.fetchall()]
+    
+    def get_material_pages_validator(self, material_id: str) -> tuple:
+        """썸네일 목록 응답의 검증값 (페이지 수/렌더링 성공 수/최근 렌더링 시각/전체 크기, 쿼리 한 번)"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*), TOTAL(render_status = 'rendered'), MAX(rendered_at), TOTAL(byte_size)
+                FROM material_pages
+                WHERE material_id = ?
+            ''', (material_id,))
+            return tuple(cursor.fetchone())
+    
+    def get_unindexed_materials(self, limit: int = 100) -> List[Dict]:
+        """페이지 본문이 아직 색인되지 않은 자료 (기존 자료 색인용)"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT m.material_id, m.gcs_path, m.content_hash FROM materials m
+                LEFT JOIN material_search_status s ON s.material_id = m.material_id
+                WHERE s.material_id IS NULL
+                ORDER BY m.material_id
+                LIMIT ?
+            ''', (limit,))
+            return [self._row_to_dict(row) for row in cursor.fetchall()]
+    
+    def search_materials(self, course_id: str, query: str, limit: int = 20,
+                         student_id: str = None) -> List[Dict]:
+        """
+        강의 자료 전문 검색 (파일명/업로더/페이지 본문, bm25 순위)
+        
+        Args:
+            student_id: 학생 검색이면 학생 ID - 마감 전 주차의 다른 학생 자료는 SQL에서 제외
+                        (can_view_materials와 같은 기준: 마감일이 없거나 지난 주차만 열람)
+        
+        Returns:
+            [{'material_id', 'page_number'(파일명/업로더 일치면 None), 'snippet', 'score',
+              'filename', 'uploader_name', 'week', 'type'}]
+        """
+        match = _build_search_query(course_id, query)
+        if not match:
+            return []
+        
+        sql = f'''
+            SELECT s.material_id, s.page_number,
+                   snippet(material_search, -1, '<b>', '</b>', '…', 12) AS snippet,
+                   bm25(material_search, {SEARCH_WEIGHTS}) AS rank,
+                   m.filename, m.uploader_name, m.week, m.type
+            FROM material_search s
+            JOIN materials m ON m.material_id = s.material_id
+            WHERE material_search MATCH ?
+        '''
+        params = [match]
+        if student_id:
+            sql += '''
+              AND (m.type != 'student' OR m.uploader_id = ? OR NOT EXISTS (
+                  SELECT 1 FROM course_weeks w
+                  WHERE w.course_id = m.course_id AND w.week = m.week AND w.upload_deadline_ts > ?))
+            '''
+            params.extend([student_id, int(time.time())])
+        sql += ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+        
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            
+            hits = []
+            for row in cursor.fetchall():
+                hit = self._row_to_dict(row)
+                hit['page_number'] = hit['page_number'] or None
+                hit['score'] = round(-hit.pop('rank'), 4)  # bm25는 낮을수록 관련도 높음
+                hits.append(hit)
+            return hits
+    
     # ===== 알림 관련 =====
     def add_notification(self, notification: Dict):
         """알림 추가"""
@@ -496,9 +1463,7 @@ class DatabaseService:
             cursor = conn.cursor()
             
             # notification_id 자동 생성
-            cursor.execute('SELECT COUNT(*) as count FROM notifications')
-            count = cursor.fetchone()['count']
-            notification_id = f"N{count + 1:03d}"
+            notification_id = self._next_id(cursor, 'notification')
             
             cursor.execute('''
                 INSERT INTO notifications 
@@ -507,22 +1472,51 @@ class DatabaseService:
             ''', (notification_id, notification['user_id'], notification['message'],
                   notification['type'], notification.get('related_id')))
     
-    def get_notifications_by_user(self, user_id: str, unread_only=False) -> List[Dict]:
-        """사용자 알림 조회"""
+    def add_notifications_bulk(self, notifications: List[Dict]) -> int:
+        """
+        알림 일괄 추가 (ID 일괄 발급 + executemany, 한 트랜잭션)
+        
+        Returns:
+            추가된 알림 수
+        """
+        if not notifications:
+            return 0
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            if unread_only:
-                cursor.execute('''
-                    SELECT * FROM notifications 
-                    WHERE user_id = ? AND is_read = 0
-                    ORDER BY created_at DESC
-                ''', (user_id,))
-            else:
-                cursor.execute('''
-                    SELECT * FROM notifications 
-                    WHERE user_id = ?
-                    ORDER BY created_at DESC
-                ''', (user_id,))
+            notification_ids = self._next_ids(cursor, 'notification', len(notifications))
+            cursor.executemany('''
+                INSERT INTO notifications 
+                (notification_id, user_id, message, type, related_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(notification_id, n['user_id'], n['message'], n['type'], n.get('related_id'))
+                  for notification_id, n in zip(notification_ids, notifications)])
+            return len(notifications)
+    
+    def get_notifications_by_user(self, user_id: str, unread_only=False,
+                                  limit: int = None, after: tuple = None) -> List[Dict]:
+        """
+        사용자 알림 조회 (최신순)
+        
+        Args:
+            limit: 최대 개수 (None이면 전체)
+            after: 이전 페이지 마지막 항목의 (created_at, notification_id)
+        """
+        sql = 'SELECT * FROM notifications WHERE user_id = ?'
+        params = [user_id]
+        if unread_only:
+            sql += ' AND is_read = 0'
+        if after:
+            sql += ' AND (created_at, notification_id) < (?, ?)'
+            params.extend(after)
+        sql += ' ORDER BY created_at DESC, notification_id DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
             return [self._row_to_dict(row) for row in cursor.fetchall()]
     
     def mark_notification_as_read(self, notification_id: str):
@@ -535,9 +1529,19 @@ class DatabaseService:
                 WHERE notification_id = ?
             ''', (notification_id,))
     
+    def get_notification_watermark(self, user_id: str) -> tuple:
+        """알림 목록 검증값 (개수, 최신 알림 시각/ID, 읽음 수) - 조건부 GET용"""
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*), MAX(created_at), MAX(notification_id), TOTAL(is_read)
+                FROM notifications WHERE user_id = ?
+            ''', (user_id,))
+            return tuple(cursor.fetchone())
+    
     def get_unread_notification_count(self, user_id: str) -> int:
         """읽지 않은 알림 개수"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT COUNT(*) as count FROM notifications 
@@ -565,7 +1569,7 @@ class DatabaseService:
     
     def get_invitation(self, invitation_code: str) -> Optional[Dict]:
         """초대 링크 조회"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM course_invitations 
@@ -573,51 +1577,64 @@ class DatabaseService:
             ''', (invitation_code,))
             return self._row_to_dict(cursor.fetchone())
     
-    def use_invitation(self, invitation_code: str, student_id: str) -> bool:
-        """초대 링크 사용 (학생을 강의에 등록)"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # 초대 정보 조회
-            invitation = self.get_invitation(invitation_code)
-            if not invitation:
-                return False
-            
-            # 유효성 검증
-            if not invitation['is_active']:
-                return False
-            
-            if invitation['max_uses'] > 0 and invitation['current_uses'] >= invitation['max_uses']:
-                return False
+    def use_invitation(self, invitation_code: str, student_id: str) -> Optional[Dict]:
+        """
+        초대 링크 사용 (학생을 강의에 등록)
+        
+        BEGIN IMMEDIATE 트랜잭션 하나에서 유효성 확인/사용 횟수 증가/등록을 처리하며,
+        사용 횟수는 조건부 UPDATE로 증가시켜 동시 참가에도 max_uses를 넘지 않습니다.
+        비활성/만료/한도 초과 초대는 이미 수강 중인 학생에게도 실패로 반환하고,
+        유효한 초대라면 이미 수강 중인 학생은 사용 횟수를 소모하지 않습니다.
+        
+        Returns:
+            참가한 강의 {'course_id', 'course_name'}, 유효하지 않은 초대면 None
+        """
+        def join(cursor):
+            cursor.execute('''
+                SELECT c.course_id, c.course_name, i.is_active, i.expires_at, i.max_uses, i.current_uses,
+                       EXISTS(SELECT 1 FROM course_enrollments e
+                              WHERE e.course_id = c.course_id AND e.student_id = ?) AS enrolled
+                FROM course_invitations i
+                JOIN courses c ON c.course_id = i.course_id
+                WHERE i.invitation_code = ?
+            ''', (student_id, invitation_code))
+            row = cursor.fetchone()
+            if not row or not row['is_active']:
+                return None
+            if row['expires_at']:
+                # 해석할 수 없는 만료일은 만료된 것으로 취급
+                expires_ts = _deadline_timestamp(row['expires_at'])
+                if expires_ts is None or expires_ts <= time.time():
+                    return None
+            if row['max_uses'] > 0 and row['current_uses'] >= row['max_uses']:
+                return None
             
-            # 강의에 학생 추가
-            course = self.get_course_by_id(invitation['course_id'])
-            if not course:
-                return False
+            course = {'course_id': row['course_id'], 'course_name': row['course_name']}
+            if row['enrolled']:
+                return course
             
-            enrolled_students = course.get('enrolled_students', [])
-            if student_id not in enrolled_students:
-                enrolled_students.append(student_id)
-                students_str = ','.join(enrolled_students)
-                
-                cursor.execute('''
-                    UPDATE courses 
-                    SET enrolled_students = ?
-                    WHERE course_id = ?
-                ''', (students_str, invitation['course_id']))
-            
-            # 사용 횟수 증가
+            # 같은 트랜잭션 안이지만 조건을 한 번 더 걸어 한도를 넘지 않도록 증가
             cursor.execute('''
-                UPDATE course_invitations 
+                UPDATE course_invitations
                 SET current_uses = current_uses + 1
-                WHERE invitation_code = ?
+                WHERE invitation_code = ? AND is_active = 1
+                  AND (max_uses <= 0 OR current_uses < max_uses)
             ''', (invitation_code,))
+            if cursor.rowcount == 0:
+                return None
             
-            return True
+            cursor.execute('''
+                INSERT OR IGNORE INTO course_enrollments (course_id, student_id)
+                VALUES (?, ?)
+            ''', (course['course_id'], student_id))
+            self._invalidate(('course', course['course_id']))
+            return course
+        
+        return self._run_immediate(join)
     
     def get_invitations_by_course(self, course_id: str) -> List[Dict]:
         """강의의 모든 초대 링크 조회"""
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM course_invitations 
@@ -625,3 +1642,150 @@ class DatabaseService:
                 ORDER BY created_at DESC
             ''', (course_id,))
             return [self._row_to_dict(row) for row in cursor.fetchall()]
+    
+    # ===== 대량 등록 (관리자 seed) =====
+    def seed_users(self, users: List[Dict]):
+        """
+        사용자 대량 생성 (검증 → ID 일괄 발급 → executemany, 한 트랜잭션)
+        
+        Returns:
+            (created, errors) - created: [{'user_id', 'email'}], errors: [{'email', 'error'}] (입력 순서)
+        """
+        failed = {}  # 입력 위치 -> 오류 메시지
+        seen_emails = set()
+        
+        # 입력 검증 (필수 항목, 역할, 요청 안의 이메일 중복)
+        for idx, user in enumerate(users):
+            missing = [field for field in ('email', 'password', 'name', 'role') if not user.get(field)]
+            if missing:
+                failed[idx] = f"필수 항목 누락: {', '.join(missing)}"
+            elif user['role'] not in ('professor', 'student'):
+                failed[idx] = '알 수 없는 역할입니다.'
+            elif user['email'] in seen_emails:
+                failed[idx] = '이미 존재하는 이메일입니다.'
+            else:
+                seen_emails.add(user['email'])
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # 기존 이메일 중복 확인 (500개씩 IN 조회)
+            existing = set()
+            email_list = list(seen_emails)
+            for start in range(0, len(email_list), 500):
+                chunk = email_list[start:start + 500]
+                cursor.execute(f"SELECT email FROM users WHERE email IN ({','.join('?' * len(chunk))})", chunk)
+                existing.update(row['email'] for row in cursor.fetchall())
+            for idx, user in enumerate(users):
+                if idx not in failed and user['email'] in existing:
+                    failed[idx] = '이미 존재하는 이메일입니다.'
+            
+            # 역할별 ID 일괄 발급 (입력 순서대로)
+            user_ids = {}
+            for role in ('professor', 'student'):
+                targets = [idx for idx, user in enumerate(users) if idx not in failed and user['role'] == role]
+                user_ids.update(zip(targets, self._next_ids(cursor, role, len(targets))))
+            
+            rows = []
+            for idx in sorted(user_ids):
+                user, user_id = users[idx], user_ids[idx]
+                rows.append((user_id, user['email'], user['password'], user['name'], user['role'],
+                             user.get('student_id', user_id if user['role'] == 'student' else None)))
+            
+            cursor.executemany('''
+                INSERT INTO users (user_id, email, password, name, role, student_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self._invalidate(*[('user', row[0]) for row in rows])
+        
+        created = [{'user_id': row[0], 'email': row[1]} for row in rows]
+        errors = [{'email': users[idx].get('email'), 'error': failed[idx]} for idx in sorted(failed)]
+        return created, errors
+    
+    def seed_courses(self, courses: List[Dict]):
+        """
+        강의 대량 생성 (주차 마감일, 초대 코드 포함, 한 트랜잭션)
+        
+        Args:
+            courses: [{'course_name', 'professor_email', 'deadline'(옵션), 'weeks'(옵션),
+                       'create_invitation'(옵션)}]
+        
+        Returns:
+            (created, errors) - created: [{'course_id', 'course_name', 'invitation_code'}],
+                                errors: [{'course', 'error'}]
+        """
+        import secrets
+        created, errors = [], []
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # 교수 일괄 조회
+            emails = {c.get('professor_email') for c in courses if c.get('professor_email')}
+            professors = {}
+            email_list = list(emails)
+            for start in range(0, len(email_list), 500):
+                chunk = email_list[start:start + 500]
+                cursor.execute(f'''
+                    SELECT user_id, email, name FROM users
+                    WHERE email IN ({','.join('?' * len(chunk))})
+                ''', chunk)
+                for row in cursor.fetchall():
+                    professors[row['email']] = row
+            
+            # 입력 검증
+            valid = []
+            for course in courses:
+                professor = professors.get(course.get('professor_email'))
+                if not professor:
+                    errors.append({'course': course.get('course_name'), 'error': '교수를 찾을 수 없음'})
+                    continue
+                if not course.get('course_name'):
+                    errors.append({'course': course.get('course_name'), 'error': '필수 항목 누락: course_name'})
+                    continue
+                weeks = 0
+                if 'deadline' in course and 'weeks' in course:
+                    try:
+                        weeks = int(course['weeks'])
+                    except (TypeError, ValueError):
+                        errors.append({'course': course['course_name'], 'error': 'weeks는 숫자여야 합니다.'})
+                        continue
+                valid.append((course, professor, weeks))
+            
+            # ID 일괄 발급 후 executemany
+            course_rows, week_rows, invitation_rows = [], [], []
+            for (course, professor, weeks), course_id in zip(valid, self._next_ids(cursor, 'course', len(valid))):
+                course_rows.append((course_id, course['course_name'], professor['user_id'], professor['name']))
+                deadline_ts = _deadline_timestamp(course.get('deadline'))
+                week_rows.extend((course_id, week, course['deadline'], deadline_ts) for week in range(1, weeks + 1))
+                
+                invitation_code = None
+                if course.get('create_invitation', False):
+                    invitation_code = secrets.token_urlsafe(8)
+                    invitation_rows.append((invitation_code, course_id, professor['user_id'], None, -1))
+                
+                created.append({
+                    'course_id': course_id,
+                    'course_name': course['course_name'],
+                    'invitation_code': invitation_code
+                })
+            
+            cursor.executemany('''
+                INSERT INTO courses (course_id, course_name, professor_id, professor_name)
+                VALUES (?, ?, ?, ?)
+            ''', course_rows)
+            cursor.executemany('''
+                INSERT OR REPLACE INTO course_weeks
+                (course_id, week, upload_deadline, upload_deadline_ts, evaluation_status)
+                VALUES (?, ?, ?, ?, 'pending')
+            ''', week_rows)
+            cursor.executemany('''
+                INSERT INTO course_invitations
+                (invitation_code, course_id, created_by, expires_at, max_uses)
+                VALUES (?, ?, ?, ?, ?)
+            ''', invitation_rows)
+            
+            self._invalidate(*[('course', row[0]) for row in course_rows],
+                             *[('deadlines', row[0]) for row in course_rows])
+        
+        return created, errors
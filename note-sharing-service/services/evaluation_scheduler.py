@@ -5,13 +5,14 @@
 import schedule
 import time
 import threading
-from datetime import datetime
 import os
 import tempfile
 from services.database_service import DatabaseService
 from services.gcs_storage_service import GCSStorageService
 from services.pdf_service import PDFService
 from services.gemini_service import GeminiService
+from services.thumbnail_service import ThumbnailService
+from config import Config
 
 class EvaluationScheduler:
     """필기 평가 스케줄러"""
@@ -21,6 +22,7 @@ class EvaluationScheduler:
         self.storage = GCSStorageService()
         self.pdf_service = PDFService()
         self.gemini_service = GeminiService(api_key=gemini_api_key)
+        self.thumbnail_service = ThumbnailService(self.db, self.storage, self.pdf_service)
         self.running = False
         self.thread = None
     
@@ -33,36 +35,29 @@ class EvaluationScheduler:
         courses = self.db.get_all_courses()
         evaluated_count = 0
         
+        # 마감이 지났고 평가가 끝나지 않은 주차 (epoch 인덱스 조회 한 번)
+        due_weeks = {}
+        for row in self.db.get_due_weeks():
+            due_weeks.setdefault(row['course_id'], []).append(row['week'])
+        
         for course in courses:
             course_id = course['course_id']
+            if course_id not in due_weeks:
+                continue
             
-            # 1~16주차 확인
-            for week in range(1, 17):
-                deadline = self.db.get_week_deadline(course_id, week)
-                
-                if not deadline:
-                    continue
+            # 주차별 자료 수 (week_summary 조회 한 번)
+            week_summaries = {s['week']: s for s in self.db.get_week_stats(course_id)}
+            
+            for week in due_weeks[course_id]:
+                print(f"\n[평가 시작] {course['course_name']} - {week}주차")
                 
-                # 마감일 확인
-                try:
-                    deadline_dt = datetime.fromisoformat(deadline.replace('Z', ''))
-                    if datetime.now() < deadline_dt:
-                        continue  # 아직 마감 안됨
-                except:
+                # 학생 필기가 없는 주차는 자료 목록을 읽지 않고 완료 처리
+                summary = week_summaries.get(week)
+                if summary is not None and summary['student_count'] == 0:
+                    print(f"  ⚠️  평가할 학생 필기가 없습니다.")
+                    self._mark_evaluation_completed(course_id, week)
                     continue
                 
-                # evaluation_status 확인
-                weeks_config = course.get('weeks', {})
-                week_str = str(week)
-                evaluation_status = 'pending'
-                if week_str in weeks_config:
-                    evaluation_status = weeks_config[week_str].get('evaluation_status', 'pending')
-                
-                if evaluation_status == 'completed':
-                    continue  # 이미 평가 완료
-                
-                print(f"\n[평가 시작] {course['course_name']} - {week}주차")
-                
                 # 학생 필기 조회
                 materials = self.db.get_materials_by_course_week(course_id, week)
                 student_materials = [m for m in materials if m['type'] == 'student']
@@ -83,29 +78,16 @@ class EvaluationScheduler:
                     try:
                         print(f"  🔍 평가 중: {material['uploader_name']}님의 필기...")
                         
-                        # 썸네일 경로 확인
-                        thumbnail_prefix = f"storage/thumbnails/{material['material_id']}/"
-                        thumbnail_files = self.storage.list_files(thumbnail_prefix)
-                        
-                        if not thumbnail_files:
-                            # 썸네일 생성
-                            print(f"    썸네일 생성 중...")
-                            thumbnail_files = self.pdf_service.convert_pdf_to_images_from_gcs(
-                                material['gcs_path'],
-                                material['material_id'],
-                                self.storage
-                            )
+                        # 썸네일 경로 확인 (material_pages 조회, 없으면 생성)
+                        thumbnail_files = self.thumbnail_service.get_thumbnail_paths(material)
                         
                         if not thumbnail_files:
                             print(f"    ❌ 썸네일을 생성할 수 없습니다.")
                             continue
                         
                         # Gemini로 평가 (GCS Signed URL 사용)
-                        thumbnail_urls = []
-                        for thumb_path in thumbnail_files:
-                            url = self.storage.get_signed_url(thumb_path, expiration=3600)
-                            if url:
-                                thumbnail_urls.append(url)
+                        thumbnail_urls = list(self.storage.get_signed_urls(
+                            thumbnail_files, expiration=Config.THUMBNAIL_URL_EXPIRATION).values())
                         
                         evaluation_result = self.gemini_service.evaluate_material(
                             material['material_id'],
@@ -144,12 +126,7 @@ class EvaluationScheduler:
     
     def _mark_evaluation_completed(self, course_id: str, week: int):
         """평가 상태를 완료로 변경"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO course_weeks (course_id, week, evaluation_status)
-                VALUES (?, ?, 'completed')
-            ''', (course_id, week))
+        self.db.mark_week_evaluation_completed(course_id, week)
     
     def evaluate_now(self, course_id: str = None, week: int = None):
         """즉시 평가 실행 (수동 트리거)"""
@@ -165,23 +142,12 @@ class EvaluationScheduler:
                     continue
                 
                 try:
-                    # 썸네일 확인 및 생성
-                    thumbnail_prefix = f"storage/thumbnails/{material['material_id']}/"
-                    thumbnail_files = self.storage.list_files(thumbnail_prefix)
-                    
-                    if not thumbnail_files:
-                        thumbnail_files = self.pdf_service.convert_pdf_to_images_from_gcs(
-                            material['gcs_path'],
-                            material['material_id'],
-                            self.storage
-                        )
+                    # 썸네일 확인 및 생성 (material_pages 조회)
+                    thumbnail_files = self.thumbnail_service.get_thumbnail_paths(material)
                     
                     # Gemini 평가
-                    thumbnail_urls = []
-                    for thumb_path in thumbnail_files:
-                        url = self.storage.get_signed_url(thumb_path, expiration=3600)
-                        if url:
-                            thumbnail_urls.append(url)
+                    thumbnail_urls = list(self.storage.get_signed_urls(
+                        thumbnail_files, expiration=Config.THUMBNAIL_URL_EXPIRATION).values())
                     
                     evaluation_result = self.gemini_service.evaluate_material(
                         material['material_id'],
@@ -3,11 +3,24 @@
 GCS(Google Cloud Storage) 파일 저장 서비스
 """
 import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
 from google.cloud import storage
 from google.oauth2 import service_account
 from werkzeug.utils import secure_filename
-from typing import Optional, Tuple
+from typing import Optional, Tuple, BinaryIO, Iterator, Dict, List
 from io import BytesIO
+from config import Config
+from services.blob_cache import BlobCache
+from services.ttl_cache import TTLCache
+
+# resumable upload chunk 크기 단위 (256KB의 배수여야 함)
+_UPLOAD_CHUNK_MULTIPLE = 256 * 1024
+
+# 서명 URL 캐시 (경로 + 만료 구간별, 모든 인스턴스 공유)
+_signed_urls = TTLCache(max_entries=Config.SIGNED_URL_CACHE_MAX_ENTRIES, ttl_seconds=3600)
 
 class GCSStorageService:
     """GCS 기반 파일 관리 서비스"""
@@ -27,6 +40,11 @@ class GCSStorageService:
         
         self.bucket = self.client.bucket(self.bucket_name)
         self.allowed_extensions = {'pdf'}
+        
+        # 읽기 경로용 로컬 디스크 캐시 (같은 디렉터리면 인스턴스 간 공유)
+        self.cache = None
+        if Config.BLOB_CACHE_ENABLED:
+            self.cache = BlobCache.for_dir(Config.BLOB_CACHE_DIR, Config.BLOB_CACHE_MAX_BYTES)
     
     def allowed_file(self, filename: str) -> bool:
         """허용된 파일 확장자인지 확인"""
@@ -47,11 +65,12 @@ class GCSStorageService:
         filename = secure_filename(file.filename)
         
         # GCS 경로: storage/professor/{course_id}/week_{week}/{filename}
-        gcs_path = f"storage/professor/{course_id}/week_{week}/{filename}"
+        gcs_path = self.material_path('professor', course_id, week, professor_id, filename)
         
         # GCS에 업로드
         blob = self.bucket.blob(gcs_path)
         blob.upload_from_file(file, content_type='application/pdf')
+        self._invalidate_path(gcs_path)
         
         return (gcs_path, filename)
     
@@ -69,14 +88,56 @@ class GCSStorageService:
         filename = secure_filename(file.filename)
         
         # GCS 경로: storage/students/{student_id}/{course_id}/week_{week}/{filename}
-        gcs_path = f"storage/students/{student_id}/{course_id}/week_{week}/{filename}"
+        gcs_path = self.material_path('student', course_id, week, student_id, filename)
         
         # GCS에 업로드
         blob = self.bucket.blob(gcs_path)
         blob.upload_from_file(file, content_type='application/pdf')
+        self._invalidate_path(gcs_path)
         
         return (gcs_path, filename)
     
+    def material_path(self, mat_type: str, course_id: str, week: int,
+                      uploader_id: str, filename: str) -> str:
+        """자료 GCS 경로 (교수: storage/professor/..., 학생: storage/students/...)"""
+        if mat_type == 'professor':
+            return f"storage/professor/{course_id}/week_{week}/{filename}"
+        return f"storage/students/{uploader_id}/{course_id}/week_{week}/{filename}"
+    
+    def upload_bytes(self, gcs_path: str, data: bytes,
+                     content_type: str = 'application/pdf') -> bool:
+        """
+        메모리의 바이트를 GCS에 저장
+        
+        Returns:
+            성공 여부
+        """
+        try:
+            blob = self.bucket.blob(gcs_path)
+            blob.upload_from_string(data, content_type=content_type)
+            self._invalidate_path(gcs_path)
+            return True
+        except Exception as e:
+            print(f"GCS 업로드 오류: {e}")
+            return False
+    
+    def open_upload(self, gcs_path: str, content_type: str = 'application/pdf') -> BinaryIO:
+        """
+        GCS에 나눠 올리는 쓰기용 파일 객체 (resumable upload, close() 시 완료)
+        
+        메모리에는 chunk 하나 분량만 보관합니다.
+        """
+        chunk_size = max(_UPLOAD_CHUNK_MULTIPLE,
+                         Config.INGEST_CHUNK_SIZE // _UPLOAD_CHUNK_MULTIPLE * _UPLOAD_CHUNK_MULTIPLE)
+        self._invalidate_path(gcs_path)
+        return self.bucket.blob(gcs_path).open('wb', chunk_size=chunk_size, content_type=content_type)
+    
+    def cache_file(self, local_path: str, content_hash: str) -> bool:
+        """로컬 파일을 콘텐츠 해시 키로 디스크 캐시에 추가 (업로드 직후 다시 내려받지 않도록)"""
+        if not self.cache:
+            return False
+        return self.cache.put(content_hash, local_path)
+    
     def save_custom_pdf(self, pdf_bytes: bytes, student_id: str, 
                        custom_pdf_id: str) -> Optional[str]:
         """
@@ -96,6 +157,7 @@ class GCSStorageService:
         try:
             blob = self.bucket.blob(gcs_path)
             blob.upload_from_string(pdf_bytes, content_type='application/pdf')
+            self._invalidate_path(gcs_path)
             return gcs_path
         except Exception as e:
             print(f"GCS 업로드 오류: {e}")
@@ -123,38 +185,144 @@ class GCSStorageService:
             traceback.print_exc()
             return None
     
-    def download_file(self, gcs_path: str, destination_path: str) -> bool:
+    def _invalidate_path(self, gcs_path: str):
+        """경로 키로 캐시된 객체 무효화 (덮어쓰기/삭제 시, 콘텐츠 해시 키는 내용이 바뀌지 않으므로 유지)"""
+        if self.cache:
+            self.cache.invalidate(BlobCache.path_key(gcs_path))
+    
+    def _fetch_to(self, gcs_path: str, destination_path: str) -> bool:
+        """GCS에서 로컬 파일로 직접 다운로드 (캐시 채우기용)"""
+        try:
+            blob = self.bucket.blob(gcs_path)
+            blob.download_to_filename(destination_path)
+            return True
+        except Exception as e:
+            print(f"GCS 다운로드 오류: {e}")
+            return False
+    
+    def open_file(self, gcs_path: str, content_hash: str = None) -> Optional[BinaryIO]:
         """
-        GCS에서 로컬로 파일 다운로드
+        읽기용 파일 객체 반환 (로컬 디스크 캐시 경유, 호출자가 닫음)
         
         Args:
             gcs_path: GCS 경로
-            destination_path: 로컬 저장 경로
+            content_hash: 알고 있으면 콘텐츠 SHA-256 (materials.content_hash) - 캐시 키로 사용
         
         Returns:
-            성공 여부
+            파일 객체 또는 None (다운로드 실패)
         """
+        if not self.cache:
+            buffer = BytesIO()
+            try:
+                self.bucket.blob(gcs_path).download_to_file(buffer)
+            except Exception as e:
+                print(f"GCS 다운로드 오류: {e}")
+                return None
+            buffer.seek(0)
+            return buffer
+        key = content_hash or BlobCache.path_key(gcs_path)
+        return self.cache.open(key, lambda temp_path: self._fetch_to(gcs_path, temp_path))
+    
+    def open_cached(self, gcs_path: str, content_hash: str = None) -> Optional[BinaryIO]:
+        """디스크 캐시에 이미 있으면 파일 객체 반환, 없으면 None (다운로드하지 않음)"""
+        if not self.cache:
+            return None
+        return self.cache.peek(content_hash or BlobCache.path_key(gcs_path))
+    
+    def get_blob_info(self, gcs_path: str) -> Optional[Tuple[int, int]]:
+        """객체 메타데이터 조회 → (크기, generation), 없거나 실패하면 None"""
         try:
-            blob = self.bucket.blob(gcs_path)
-            blob.download_to_filename(destination_path)
-            return True
+            blob = self.bucket.get_blob(gcs_path)
         except Exception as e:
-            print(f"GCS 다운로드 오류: {e}")
+            print(f"GCS 메타데이터 조회 오류: {e}")
+            return None
+        if blob is None:
+            return None
+        return blob.size, blob.generation
+    
+    def iter_range(self, gcs_path: str, start: int, stop: int,
+                   generation: int = None, chunk_size: int = None) -> Iterator[bytes]:
+        """
+        GCS 객체의 [start, stop) 구간을 범위 읽기로 나눠 반환 (메모리는 chunk_size만 사용)
+        
+        Args:
+            generation: 지정하면 해당 버전만 읽음 (전송 중 덮어쓰기 대비)
+        """
+        chunk_size = chunk_size or Config.STORAGE_STREAM_CHUNK_SIZE
+        blob = self.bucket.blob(gcs_path, generation=generation)
+        position = start
+        while position < stop:
+            end = min(position + chunk_size, stop)
+            # download_as_bytes의 end는 마지막 바이트 위치(포함)
+            chunk = blob.download_as_bytes(start=position, end=end - 1)
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+    
+    def iter_and_cache(self, gcs_path: str, size: int, generation: int = None,
+                       content_hash: str = None) -> Iterator[bytes]:
+        """
+        GCS 객체 전체를 iter_range로 나눠 반환하면서 같은 바이트로 디스크 캐시를 채움
+        
+        응답과 캐시 채우기가 GCS에서 한 번만 읽습니다. 전송이 중간에 끊기면 캐시하지 않습니다.
+        """
+        if not self.cache or size > self.cache.max_bytes:
+            yield from self.iter_range(gcs_path, 0, size, generation=generation)
+            return
+        fd, temp_path = tempfile.mkstemp(prefix='.tmp-', dir=self.cache.root)
+        try:
+            written = 0
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in self.iter_range(gcs_path, 0, size, generation=generation):
+                    f.write(chunk)
+                    written += len(chunk)
+                    yield chunk
+            if written == size:
+                self.cache.put(content_hash or BlobCache.path_key(gcs_path), temp_path)
+        finally:
+            os.unlink(temp_path)
+    
+    def download_file(self, gcs_path: str, destination_path: str,
+                      content_hash: str = None) -> bool:
+        """
+        GCS에서 로컬로 파일 다운로드 (캐시 경유)
+        
+        Args:
+            gcs_path: GCS 경로
+            destination_path: 로컬 저장 경로
+            content_hash: 알고 있으면 콘텐츠 SHA-256
+        
+        Returns:
+            성공 여부
+        """
+        if not self.cache:
+            return self._fetch_to(gcs_path, destination_path)
+        f = self.open_file(gcs_path, content_hash)
+        if f is None:
             return False
+        with f, open(destination_path, 'wb') as out:
+            shutil.copyfileobj(f, out)
+        return True
     
-    def download_to_memory(self, gcs_path: str) -> Optional[bytes]:
+    def download_to_memory(self, gcs_path: str, content_hash: str = None) -> Optional[bytes]:
         """
-        GCS에서 메모리로 파일 다운로드
+        GCS에서 메모리로 파일 다운로드 (캐시 경유)
         
         Returns:
             파일 바이트 데이터 또는 None
         """
-        try:
-            blob = self.bucket.blob(gcs_path)
-            return blob.download_as_bytes()
-        except Exception as e:
-            print(f"GCS 다운로드 오류: {e}")
+        f = self.open_file(gcs_path, content_hash)
+        if f is None:
             return None
+        with f:
+            return f.read()
+    
+    def get_cache_stats(self) -> dict:
+        """로컬 디스크 캐시 통계 (비활성화 시 enabled=False)"""
+        if not self.cache:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.get_stats()}
     
     def get_file_size(self, gcs_path: str) -> int:
         """파일 크기 조회 (바이트)"""
@@ -170,6 +338,7 @@ class GCSStorageService:
         try:
             blob = self.bucket.blob(gcs_path)
             blob.delete()
+            self._invalidate_path(gcs_path)
             return True
         except Exception as e:
             print(f"GCS 삭제 오류: {e}")
@@ -183,28 +352,84 @@ class GCSStorageService:
         except:
             return False
     
-    def get_signed_url(self, gcs_path: str, expiration=3600) -> Optional[str]:
+    def _sign_url(self, gcs_path: str, expires_at: datetime,
+                  response_disposition: str = None, response_type: str = None) -> Optional[str]:
+        """V4 서명 URL 생성 (캐시 없이, 실패 시 None)"""
+        try:
+            blob = self.bucket.blob(gcs_path)
+            return blob.generate_signed_url(
+                version="v4",
+                expiration=expires_at,
+                method="GET",
+                response_disposition=response_disposition,
+                response_type=response_type
+            )
+        except Exception as e:
+            print(f"서명된 URL 생성 오류: {e}")
+            return None
+    
+    def get_signed_url(self, gcs_path: str, expiration=3600,
+                       response_disposition: str = None,
+                       response_type: str = None) -> Optional[str]:
         """
-        서명된 URL 생성 (다운로드용)
+        서명된 URL 생성 (다운로드용, 만료 구간별 캐시 - get_signed_urls 참고)
         
         Args:
             gcs_path: GCS 경로
             expiration: 유효 기간 (초)
+            response_disposition: GCS가 응답에 넣을 Content-Disposition (다운로드 파일명 지정)
+            response_type: GCS가 응답에 넣을 Content-Type
         
         Returns:
             서명된 URL 또는 None
         """
-        try:
-            blob = self.bucket.blob(gcs_path)
-            url = blob.generate_signed_url(
-                version="v4",
-                expiration=expiration,
-                method="GET"
-            )
-            return url
-        except Exception as e:
-            print(f"서명된 URL 생성 오류: {e}")
-            return None
+        return self.get_signed_urls([gcs_path], expiration, response_disposition,
+                                    response_type).get(gcs_path)
+    
+    @staticmethod
+    def signed_url_slot(expiration=3600, now: float = None) -> Tuple[int, int]:
+        """
+        서명 URL 재사용 구간 (구간 번호, 구간 길이 초)
+        
+        같은 구간 번호 동안 get_signed_urls는 같은 URL을 반환하므로,
+        서명 URL을 담은 응답의 검증값(ETag)도 이 구간 번호로 갱신해야 URL보다 오래 재사용되지 않습니다.
+        """
+        window = max(int(expiration) // 2, 1)
+        return int((time.time() if now is None else now) // window), window
+    
+    def get_signed_urls(self, gcs_paths: List[str], expiration=3600,
+                        response_disposition: str = None,
+                        response_type: str = None) -> Dict[str, str]:
+        """
+        여러 경로의 서명 URL 일괄 생성
+        
+        시간을 유효 기간의 절반 길이 구간으로 나누고, 같은 구간 안에서는 같은 URL을 재사용합니다.
+        구간 i에서 서명한 URL은 (i × 구간 길이 + expiration)에 만료되므로
+        재사용 중에도 남은 유효 시간이 항상 expiration의 절반 이상입니다.
+        
+        Returns:
+            {경로: URL} (입력 순서 유지, 서명 실패한 경로는 제외)
+        """
+        now = time.time()
+        slot, window = self.signed_url_slot(expiration, now)
+        expires_at = datetime.fromtimestamp(slot * window + expiration, tz=timezone.utc)
+        ttl = (slot + 1) * window - now
+        
+        urls = {}
+        for gcs_path in gcs_paths:
+            key = (self.bucket_name, gcs_path, expiration, response_disposition, response_type, slot)
+            url = _signed_urls.get(key, None)
+            if url is None:
+                url = self._sign_url(gcs_path, expires_at, response_disposition, response_type)
+                if url is None:
+                    continue
+                _signed_urls.set(key, url, ttl=ttl)
+            urls[gcs_path] = url
+        return urls
+    
+    def get_signed_url_stats(self) -> dict:
+        """서명 URL 캐시 통계"""
+        return _signed_urls.stats()
     
     def list_files(self, prefix: str) -> list:
         """특정 경로의 파일 목록 조회"""
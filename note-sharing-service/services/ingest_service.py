@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+업로드 수집(ingest) 파이프라인
+
+업로드 스트림을 한 번만 읽으며 해시를 계산하고, 읽은 chunk는 바로 GCS에 나눠 올리면서
+검증/렌더링용 임시 파일에 기록합니다. 업로드 파일 전체를 메모리에 올리지 않으며,
+업로드 직후 GCS에서 다시 내려받지 않도록 임시 파일을 디스크 캐시에 넣습니다.
+"""
+import hashlib
+import os
+import queue
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Tuple
+from config import Config
+
+class IngestService:
+    """자료 업로드 수집 서비스"""
+
+    def __init__(self, storage, pdf_service, max_workers: int = None):
+        self.storage = storage
+        self.pdf_service = pdf_service
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or Config.INGEST_WORKERS,
+                                           thread_name_prefix='ingest')
+        # 렌더링이 워커를 차지해도 업로드 전송이 밀리지 않도록 별도 풀 사용
+        self.upload_executor = ThreadPoolExecutor(max_workers=max_workers or Config.INGEST_WORKERS,
+                                                  thread_name_prefix='ingest-upload')
+
+    def _upload_chunks(self, gcs_path: str, chunks: queue.Queue) -> bool:
+        """큐로 받은 chunk를 도착하는 대로 GCS에 업로드 (실패해도 읽는 쪽이 막히지 않도록 끝까지 비움)"""
+        try:
+            writer = self.storage.open_upload(gcs_path)
+        except Exception as e:
+            print(f"GCS 업로드 오류: {e}")
+            writer = None
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            if writer is None:
+                continue
+            try:
+                writer.write(chunk)
+            except Exception as e:
+                print(f"GCS 업로드 오류: {e}")
+                writer = None
+        if writer is None:
+            return False
+        try:
+            writer.close()
+            return True
+        except Exception as e:
+            print(f"GCS 업로드 오류: {e}")
+            return False
+
+    def spool_stream(self, stream, gcs_path: str, chunk_size: int = None) -> Tuple[str, str, int, Future]:
+        """
+        업로드 스트림을 한 번 읽으며 SHA-256 계산, GCS 업로드, 임시 파일 기록을 함께 진행
+
+        메모리에는 GCS 전송을 기다리는 chunk(최대 INGEST_UPLOAD_QUEUE_CHUNKS개)만 보관합니다.
+
+        Returns:
+            (임시 파일 경로, 16진수 해시, 크기, 업로드 Future) - 임시 파일은 호출자가 삭제
+
+        Raises:
+            ValueError: PDF가 아닌 경우 (업로드 시작 전에 거부)
+        """
+        chunk_size = chunk_size or Config.INGEST_CHUNK_SIZE
+        chunk = stream.read(chunk_size)
+        if not chunk.startswith(b'%PDF-'):
+            raise ValueError('올바른 PDF 파일이 아닙니다.')
+
+        fd, spool_path = tempfile.mkstemp(prefix='ingest-', suffix='.pdf', dir=Config.INGEST_SPOOL_DIR)
+        chunks = queue.Queue(maxsize=Config.INGEST_UPLOAD_QUEUE_CHUNKS)
+        upload = self.upload_executor.submit(self._upload_chunks, gcs_path, chunks)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as spool:
+                while chunk:
+                    digest.update(chunk)
+                    spool.write(chunk)
+                    chunks.put(chunk)
+                    size += len(chunk)
+                    chunk = stream.read(chunk_size)
+        except BaseException:
+            # 읽기 도중 실패 (연결 끊김 등) - 일부만 올라간 파일은 삭제
+            chunks.put(None)
+            if upload.result():
+                self.storage.delete_file(gcs_path)
+            os.unlink(spool_path)
+            raise
+        chunks.put(None)
+        return spool_path, digest.hexdigest(), size, upload
+
+    @staticmethod
+    def _remove_spool(spool_path: str, thumbnails: Future = None):
+        """임시 파일 삭제 (렌더링 중이면 렌더링이 끝난 뒤)"""
+        def remove(_=None):
+            try:
+                os.unlink(spool_path)
+            except FileNotFoundError:
+                pass
+
+        if thumbnails is None:
+            remove()
+        else:
+            thumbnails.add_done_callback(remove)
+
+    def ingest(self, stream, gcs_path: str, render: bool = True) -> Dict:
+        """
+        업로드 파일 수집
+
+        Args:
+            stream: 업로드 파일 스트림 (FileStorage 등 read() 지원 객체)
+            gcs_path: 저장할 GCS 경로
+            render: 썸네일 렌더링 여부
+
+        Returns:
+            {'content_hash', 'size', 'page_count', 'thumbnails'(렌더링 Future 또는 None)}
+            (본문은 디스크 캐시에 있으므로 storage.open_file(gcs_path, content_hash)로 다시 읽음)
+
+        Raises:
+            ValueError: PDF가 아닌 경우 (저장된 파일은 삭제)
+            IOError: GCS 저장 실패
+        """
+        spool_path, content_hash, size, upload = self.spool_stream(stream, gcs_path)
+
+        # 썸네일 렌더링은 백그라운드, 검증은 (남은 업로드 전송과 병렬로) 현재 스레드에서
+        thumbnails = None
+        if render:
+            thumbnails = self.executor.submit(self.pdf_service.render_thumbnails, spool_path,
+                                              Config.PDF_IMAGE_DPI, Config.PDF_IMAGE_QUALITY)
+
+        try:
+            page_count = self.pdf_service.validate_pdf(spool_path)
+        except ValueError:
+            if thumbnails is not None:
+                thumbnails.cancel()
+            if upload.result():
+                self.storage.delete_file(gcs_path)
+            self._remove_spool(spool_path, thumbnails)
+            raise
+
+        if not upload.result():
+            if thumbnails is not None:
+                thumbnails.cancel()
+            self._remove_spool(spool_path, thumbnails)
+            raise IOError('GCS 저장 실패')
+
+        # 색인/썸네일 재시도가 GCS에서 다시 받지 않도록 콘텐츠 해시 키로 캐시
+        self.storage.cache_file(spool_path, content_hash)
+        self._remove_spool(spool_path, thumbnails)
+
+        return {
+            'content_hash': content_hash,
+            'size': size,
+            'page_count': page_count,
+            'thumbnails': thumbnails
+        }
+
+    def save_thumbnails(self, thumbnails: Future, material_id: str) -> List[Dict]:
+        """
+        렌더링이 끝난 썸네일을 GCS에 병렬 업로드
+
+        Returns:
+            페이지 순서대로의 썸네일 항목 리스트 (material_pages 기록용, 렌더링 실패 시 빈 리스트)
+        """
+        if thumbnails is None:
+            return []
+        try:
+            images = thumbnails.result()
+        except Exception as e:
+            print(f"  ⚠️  썸네일 렌더링 실패: {e}")
+            return []
+
+        return list(self.executor.map(
+            lambda item: self.pdf_service.save_thumbnail_page(self.storage, material_id, item[0] + 1, item[1]),
+            enumerate(images)))
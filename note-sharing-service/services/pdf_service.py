@@ -3,11 +3,10 @@
 PDF 처리 서비스 (GCS 버전)
 """
 from PyPDF2 import PdfReader, PdfWriter
-from pdf2image import convert_from_path
+from pdf2image import convert_from_bytes, convert_from_path
 from PIL import Image
 import os
-import tempfile
-from typing import List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 from io import BytesIO
 
 class PDFService:
@@ -42,8 +41,97 @@ class PDFService:
             print(f"PDF 페이지 수 조회 오류: {e}")
             return 0
     
+    def validate_pdf(self, pdf: Union[bytes, str]) -> int:
+        """
+        PDF 구조 확인 후 페이지 수 반환
+        
+        Args:
+            pdf: PDF 바이트 또는 로컬 파일 경로 (업로드 임시 파일)
+        
+        Raises:
+            ValueError: PDF로 읽을 수 없는 경우
+        """
+        if isinstance(pdf, bytes):
+            header = pdf[:5]
+        else:
+            with open(pdf, 'rb') as f:
+                header = f.read(5)
+        if header != b'%PDF-':
+            raise ValueError('올바른 PDF 파일이 아닙니다.')
+        try:
+            return len(PdfReader(BytesIO(pdf) if isinstance(pdf, bytes) else pdf).pages)
+        except Exception as e:
+            raise ValueError(f'PDF 파일을 읽을 수 없습니다: {e}')
+    
+    def render_thumbnails(self, pdf: Union[bytes, str], dpi=150, quality=85,
+                          first_page: int = None, last_page: int = None) -> List[Tuple[bytes, int, int]]:
+        """
+        PDF를 페이지별 JPEG 바이트로 변환 (이미지 파일은 만들지 않음)
+        
+        Args:
+            pdf: PDF 바이트 또는 로컬 파일 경로
+            first_page, last_page: 지정하면 해당 범위의 페이지만 변환 (1부터)
+        
+        Returns:
+            페이지 순서대로의 (JPEG 바이트, 너비, 높이) 리스트
+        """
+        poppler_kwargs = {}
+        if self.poppler_path:
+            poppler_kwargs['poppler_path'] = self.poppler_path
+        
+        convert = convert_from_bytes if isinstance(pdf, bytes) else convert_from_path
+        images = convert(pdf, dpi=dpi, first_page=first_page, last_page=last_page, **poppler_kwargs)
+        thumbnails = []
+        for image in images:
+            img_buffer = BytesIO()
+            image.save(img_buffer, 'JPEG', quality=quality, optimize=True)
+            thumbnails.append((img_buffer.getvalue(), image.width, image.height))
+        return thumbnails
+    
+    @staticmethod
+    def save_thumbnail_page(storage, material_id: str, page_number: int,
+                            thumbnail: Tuple[bytes, int, int]) -> Dict:
+        """
+        렌더링된 페이지 하나를 GCS에 저장하고 material_pages 기록용 항목 반환
+        
+        Returns:
+            {'page_number', 'gcs_path', 'width', 'height', 'byte_size', 'render_status'}
+            (업로드 실패 시 gcs_path None, render_status 'failed')
+        """
+        img_bytes, width, height = thumbnail
+        gcs_path = storage.save_thumbnail(img_bytes, material_id, page_number)
+        return {
+            'page_number': page_number,
+            'gcs_path': gcs_path,
+            'width': width,
+            'height': height,
+            'byte_size': len(img_bytes),
+            'render_status': 'rendered' if gcs_path else 'failed'
+        }
+    
+    def extract_page_texts(self, pdf: Union[bytes, BinaryIO]) -> List[str]:
+        """
+        페이지별 텍스트 추출 (검색 색인용)
+        
+        Args:
+            pdf: PDF 바이트 또는 읽기용 파일 객체 (디스크 캐시 파일)
+        
+        Returns:
+            페이지 순서대로의 텍스트 리스트 (추출 실패한 페이지는 빈 문자열)
+        """
+        reader = PdfReader(BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+        texts = []
+        for page in reader.pages:
+            try:
+                texts.append(page.extract_text() or '')
+            except Exception as e:
+                print(f"PDF 텍스트 추출 오류: {e}")
+                texts.append('')
+        return texts
+    
     def convert_pdf_to_images_from_gcs(self, gcs_path: str, material_id: str, 
-                                      storage, dpi=150) -> List[str]:
+                                      storage, dpi=150, content_hash: str = None,
+                                      page_numbers: List[int] = None) -> List[Dict]:
         """
         GCS의 PDF를 페이지별 이미지로 변환하여 GCS에 저장
         
@@ -52,46 +140,49 @@ class PDFService:
             material_id: 자료 ID
             storage: GCSStorageService 인스턴스
             dpi: 이미지 해상도
+            content_hash: 알고 있으면 PDF의 SHA-256 (로컬 디스크 캐시 키)
+            page_numbers: 지정하면 해당 페이지만 다시 변환 (실패한 페이지 재시도,
+                          페이지별 변환 오류는 예외 대신 'failed' 항목으로 반환)
             
         Returns:
-            썸네일 GCS 경로 리스트
+            페이지 순서대로의 썸네일 항목 리스트 (save_thumbnail_page 형식, material_pages 기록용)
         """
-        print(f"  [PDF→IMG] GCS에서 다운로드 중: {gcs_path}")
-        
-        # GCS에서 임시 다운로드
-        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        print(f"  [PDF→IMG] PDF 읽는 중 (디스크 캐시 경유): {gcs_path}")
         
         try:
-            if not storage.download_file(gcs_path, temp_pdf.name):
+            pdf_bytes = storage.download_to_memory(gcs_path, content_hash)
+            if not pdf_bytes:
                 raise Exception("GCS 다운로드 실패")
             
-            # PDF → 이미지 변환
-            poppler_kwargs = {}
-            if self.poppler_path:
-                poppler_kwargs['poppler_path'] = self.poppler_path
+            if page_numbers:
+                return [self._retry_thumbnail_page(pdf_bytes, material_id, storage, dpi, page_number)
+                        for page_number in sorted(page_numbers)]
             
-            images = convert_from_path(temp_pdf.name, dpi=dpi, **poppler_kwargs)
-            print(f"  [PDF→IMG] {len(images)}페이지 변환 완료")
+            # PDF → 이미지 변환
+            thumbnails = self.render_thumbnails(pdf_bytes, dpi=dpi)
+            print(f"  [PDF→IMG] {len(thumbnails)}페이지 변환 완료")
             
             # 각 이미지를 GCS에 업로드
-            thumbnail_paths = []
-            for i, image in enumerate(images):
-                # 이미지를 바이트로 변환
-                img_buffer = BytesIO()
-                image.save(img_buffer, 'JPEG', quality=85, optimize=True)
-                img_bytes = img_buffer.getvalue()
-                
-                # GCS에 업로드
-                gcs_thumb_path = storage.save_thumbnail(img_bytes, material_id, i + 1)
-                if gcs_thumb_path:
-                    thumbnail_paths.append(gcs_thumb_path)
+            pages = []
+            for i, thumbnail in enumerate(thumbnails):
+                page = self.save_thumbnail_page(storage, material_id, i + 1, thumbnail)
+                if page['gcs_path']:
                     print(f"  [GCS] 썸네일 업로드: page_{i+1}.jpg")
+                pages.append(page)
             
-            return thumbnail_paths
+            return pages
             
         except Exception as e:
             print(f"  [ERROR] 썸네일 생성 실패: {e}")
             raise e
-        finally:
-            if os.path.exists(temp_pdf.name):
-                os.unlink(temp_pdf.name)
+    
+    def _retry_thumbnail_page(self, pdf_bytes: bytes, material_id: str, storage, dpi, page_number: int) -> Dict:
+        """한 페이지만 다시 변환/업로드 (실패 시 'failed' 항목)"""
+        try:
+            thumbnails = self.render_thumbnails(pdf_bytes, dpi=dpi, first_page=page_number, last_page=page_number)
+            if thumbnails:
+                return self.save_thumbnail_page(storage, material_id, page_number, thumbnails[0])
+        except Exception as e:
+            print(f"  [ERROR] {page_number}페이지 썸네일 재생성 실패: {e}")
+        return {'page_number': page_number, 'gcs_path': None, 'width': None, 'height': None,
+                'byte_size': None, 'render_status': 'failed'}
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+DB 쿼리 계측 (요청별 쿼리 수/DB 시간, 메서드별 통계, 느린 쿼리 로그)
+"""
+import functools
+import inspect
+import sqlite3
+import threading
+import time
+from collections import deque
+from flask import g, has_request_context, request
+from config import Config
+
+class QueryStats:
+    """프로세스 전체 쿼리 통계 집계 (스레드 안전)"""
+
+    def __init__(self, slow_log_size: int = 100):
+        self._lock = threading.Lock()
+        self._endpoints = {}  # endpoint -> 집계
+        self._methods = {}    # DatabaseService 메서드 -> 집계
+        self._slow_queries = deque(maxlen=slow_log_size)
+        self.total_queries = 0
+        self.total_time = 0.0
+
+    # ===== 기록 =====
+    def record_query(self, conn, sql: str, parameters, elapsed: float, many: bool = False):
+        """쿼리 1건 기록 (요청 컨텍스트가 있으면 요청별 합계에도 반영)"""
+        with self._lock:
+            self.total_queries += 1
+            self.total_time += elapsed
+
+        if has_request_context():
+            g.db_query_count = g.get('db_query_count', 0) + 1
+            g.db_query_time = g.get('db_query_time', 0.0) + elapsed
+
+        if elapsed * 1000 >= Config.DB_SLOW_QUERY_MS:
+            self._record_slow_query(conn, sql, parameters, elapsed, many)
+
+    def _record_slow_query(self, conn, sql, parameters, elapsed, many):
+        plan = self._explain(conn, sql, None if many else parameters)
+        entry = {
+            'sql': ' '.join(sql.split()),
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'endpoint': request.endpoint if has_request_context() else None,
+            'executemany': many,
+            'query_plan': plan,
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+        print(f"[SLOW QUERY] {entry['elapsed_ms']}ms {entry['sql'][:200]}")
+        for line in plan:
+            print(f"    {line}")
+
+    def _explain(self, conn, sql, parameters) -> list:
+        """EXPLAIN QUERY PLAN 결과 (계측되지 않는 기본 커서 사용)"""
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')):
+            return []
+        try:
+            cursor = sqlite3.Cursor(conn)
+            sqlite3.Cursor.execute(cursor, 'EXPLAIN QUERY PLAN ' + sql, parameters or ())
+            return [row[3] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return [f'(EXPLAIN 실패: {e})']
+
+    def record_method(self, name: str, elapsed: float):
+        """DatabaseService 메서드 호출 1건 기록"""
+        with self._lock:
+            stats = self._methods.setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['calls'] += 1
+            stats['total_ms'] += elapsed * 1000
+            stats['max_ms'] = max(stats['max_ms'], elapsed * 1000)
+
+    def record_request(self, endpoint: str, query_count: int, query_time: float):
+        """요청 1건의 쿼리 수/DB 시간 기록"""
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'max_db_ms': 0.0
+            })
+            stats['requests'] += 1
+            stats['queries'] += query_count
+            stats['max_queries'] = max(stats['max_queries'], query_count)
+            stats['db_ms'] += query_time * 1000
+            stats['max_db_ms'] = max(stats['max_db_ms'], query_time * 1000)
+
+    # ===== 조회 =====
+    def snapshot(self) -> dict:
+        """집계 결과 (평균값 포함)"""
+        with self._lock:
+            endpoints = {}
+            for endpoint, s in self._endpoints.items():
+                endpoints[endpoint] = dict(s,
+                                           avg_queries=round(s['queries'] / s['requests'], 2),
+                                           avg_db_ms=round(s['db_ms'] / s['requests'], 2),
+                                           db_ms=round(s['db_ms'], 2),
+                                           max_db_ms=round(s['max_db_ms'], 2))
+            methods = {name: dict(s,
+                                  avg_ms=round(s['total_ms'] / s['calls'], 3),
+                                  total_ms=round(s['total_ms'], 2),
+                                  max_ms=round(s['max_ms'], 2))
+                       for name, s in self._methods.items()}
+            return {
+                'total_queries': self.total_queries,
+                'total_db_ms': round(self.total_time * 1000, 2),
+                'slow_query_threshold_ms': Config.DB_SLOW_QUERY_MS,
+                'endpoints': endpoints,
+                'methods': methods,
+                'slow_queries': list(self._slow_queries)
+            }
+
+    def reset(self):
+        """집계 초기화"""
+        with self._lock:
+            self._endpoints.clear()
+            self._methods.clear()
+            self._slow_queries.clear()
+            self.total_queries = 0
+            self.total_time = 0.0
+
+# 프로세스 전역 집계
+query_stats = QueryStats()
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """execute/executemany 시간을 기록하는 커서 (실행 시점에 DB_QUERY_STATS=True 인 경우)"""
+
+    def execute(self, sql, parameters=()):
+        if not Config.DB_QUERY_STATS:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            query_stats.record_query(self.connection, sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not Config.DB_QUERY_STATS:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            query_stats.record_query(self.connection, sql, None, time.perf_counter() - start, many=True)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """모든 쿼리가 InstrumentedCursor를 거치도록 하는 연결 (conn.execute 단축 호출 포함)"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def instrument_methods(cls):
+    """클래스 데코레이터: 공개 메서드의 호출 수/소요 시간 기록 (호출 시점에 DB_QUERY_STATS=True 인 경우)"""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(attr) or name in ('get_connection', 'unit_of_work', 'init_app'):
+            continue
+
+        def wrap(func, qualified_name):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not Config.DB_QUERY_STATS:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    query_stats.record_method(qualified_name, time.perf_counter() - start)
+            return wrapper
+
+        setattr(cls, name, wrap(attr, f'{cls.__name__}.{name}'))
+    return cls
+
+def init_app(app):
+    """요청별 쿼리 수/DB 시간 집계 훅 등록 (DB_QUERY_STATS=True 인 경우)"""
+    if not app.config.get('DB_QUERY_STATS'):
+        return
+
+    @app.before_request
+    def _reset_request_query_stats():
+        g.db_query_count = 0
+        g.db_query_time = 0.0
+
+    @app.after_request
+    def _record_request_query_stats(response):
+        query_count = g.get('db_query_count', 0)
+        query_time = g.get('db_query_time', 0.0)
+        endpoint = request.endpoint or request.path
+        query_stats.record_request(endpoint, query_count, query_time)
+        if query_count >= Config.DB_QUERY_WARN_COUNT:
+            print(f"[N+1 의심] {request.method} {request.path}: 쿼리 {query_count}회, DB {query_time * 1000:.1f}ms")
+        return response
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+자료 썸네일 목록 서비스
+
+썸네일 목록은 렌더링 시 material_pages에 기록하고, 조회는 DB 기본 키 범위 조회 한 번으로 처리합니다.
+(요청마다 GCS 목록 API를 호출하지 않으며, page_10이 page_2보다 앞에 오는 사전순 정렬 문제도 없음)
+기록이 없는 기존 자료만 GCS 목록을 한 번 읽어 채워 넣습니다.
+실패한 페이지는 그 페이지만, 실패할 때마다 두 배로 늘어나는 간격을 두고 다시 렌더링합니다.
+"""
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+from config import Config
+
+_PAGE_FILE = re.compile(r'/page_(\d+)\.jpg$')
+
+class ThumbnailService:
+    """자료 썸네일 목록 관리"""
+
+    def __init__(self, db, storage, pdf_service):
+        self.db = db
+        self.storage = storage
+        self.pdf_service = pdf_service
+
+    def record_pages(self, material_id: str, pages: List[Dict]) -> List[str]:
+        """
+        렌더링 결과를 material_pages에 기록
+
+        Returns:
+            저장에 성공한 썸네일 GCS 경로 (페이지 순)
+        """
+        self.db.save_material_pages(material_id, pages)
+        return [page['gcs_path'] for page in sorted(pages, key=lambda p: p['page_number'])
+                if page['render_status'] == 'rendered']
+
+    def _backfill_from_storage(self, material_id: str) -> List[str]:
+        """기록 이전에 만들어진 썸네일을 GCS 목록에서 찾아 material_pages에 채움 (자료당 한 번)"""
+        pages = []
+        for gcs_path in self.storage.list_files(f"storage/thumbnails/{material_id}/"):
+            match = _PAGE_FILE.search(gcs_path)
+            if match:
+                pages.append({
+                    'page_number': int(match.group(1)),
+                    'gcs_path': gcs_path,
+                    'render_status': 'rendered'
+                })
+        if not pages:
+            return []
+        print(f"  [THUMBNAIL] 기존 썸네일 {len(pages)}개 목록 기록: {material_id}")
+        return self.record_pages(material_id, pages)
+
+    @staticmethod
+    def _retry_due(page: Dict, now: float) -> bool:
+        """실패한 페이지의 재시도 시각이 되었는지 (간격은 연속 실패마다 2배, 최대 THUMBNAIL_RETRY_MAX_INTERVAL)"""
+        try:
+            failed_at = datetime.fromisoformat(page['rendered_at']).replace(tzinfo=timezone.utc).timestamp()
+        except (TypeError, ValueError):
+            return True
+        attempts = max(page.get('attempts') or 1, 1)
+        delay = min(Config.THUMBNAIL_RETRY_INTERVAL * 2 ** (attempts - 1), Config.THUMBNAIL_RETRY_MAX_INTERVAL)
+        return now >= failed_at + delay
+
+    def _retry_failed_pages(self, material: Dict, failed: List[Dict]):
+        """재시도 시각이 된 실패 페이지만 다시 렌더링해 기록"""
+        now = time.time()
+        due = [page['page_number'] for page in failed if self._retry_due(page, now)]
+        if not due:
+            return
+        material_id = material['material_id']
+        print(f"  [THUMBNAIL] 실패한 페이지 재시도: {material_id} {due}")
+        try:
+            retried = self.pdf_service.convert_pdf_to_images_from_gcs(
+                material['gcs_path'],
+                material_id,
+                self.storage,
+                content_hash=material.get('content_hash'),
+                page_numbers=due
+            )
+        except Exception as e:
+            # PDF를 읽지 못해도 실패 횟수를 올려 다음 재시도를 미룸
+            print(f"  [THUMBNAIL] 재시도 실패: {e}")
+            retried = [{'page_number': page_number, 'render_status': 'failed'} for page_number in due]
+        self.db.save_material_pages(material_id, retried)
+
+    def get_thumbnail_paths(self, material: Dict, render_missing: bool = True) -> List[str]:
+        """
+        자료의 썸네일 GCS 경로 목록 (페이지 순)
+
+        Args:
+            material: 자료 정보 (material_id, gcs_path, content_hash)
+            render_missing: 기록/썸네일이 없으면 렌더링, 실패한 페이지는 재시도 시각이 된 것만 다시 렌더링
+
+        Returns:
+            썸네일 GCS 경로 리스트 (아직 실패 상태인 페이지는 제외)
+
+        Raises:
+            전체 렌더링 실패 시 PDFService 예외를 그대로 전달
+        """
+        material_id = material['material_id']
+        pages = self.db.get_material_pages(material_id)
+        if not pages:
+            paths = self._backfill_from_storage(material_id)
+            if paths or not render_missing:
+                return paths
+            rendered = self.pdf_service.convert_pdf_to_images_from_gcs(
+                material['gcs_path'],
+                material_id,
+                self.storage,
+                content_hash=material.get('content_hash')
+            )
+            return self.record_pages(material_id, rendered)
+
+        failed = [page for page in pages if page['render_status'] != 'rendered']
+        if failed and render_missing:
+            self._retry_failed_pages(material, failed)
+            pages = self.db.get_material_pages(material_id)
+        return [page['gcs_path'] for page in pages if page['render_status'] == 'rendered']
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+프로세스 내 LRU + TTL 캐시
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# 캐시에 값이 없음을 나타내는 표식 (None도 캐시할 수 있도록)
+MISSING = object()
+
+class TTLCache:
+    """스레드 안전한 크기 제한 LRU 캐시 (항목별 만료 시간, 적중/미스 카운터 포함)"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.generation = 0  # 무효화될 때마다 증가
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=MISSING):
+        """캐시 조회 (없거나 만료되면 default 반환)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, generation: int = None, ttl: float = None):
+        """
+        캐시 저장
+
+        Args:
+            generation: 값을 읽기 전에 확인한 generation.
+                        그 사이에 무효화가 있었다면 오래된 값이므로 저장하지 않음
+            ttl: 항목별 만료 시간 (초), 없으면 기본값
+        """
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        """특정 키 무효화"""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        """전체 무효화"""
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """캐시 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,51 @@
+"""
+인증 라우트 테스트
+로그인 응답의 user만 저장하는 클라이언트가 세션 쿠키 없이 인증되는지 확인
+"""
+
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.database_service import DatabaseService
+from utils import auth_middleware
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # 라우트 모듈의 기본 DB가 작업 디렉터리에 생기지 않도록 임시 디렉터리에서 import
+    monkeypatch.chdir(tmp_path)
+    from routes import api_auth
+
+    db = DatabaseService(str(tmp_path / 'database.db'))
+    monkeypatch.setattr(api_auth, 'db', db)
+    monkeypatch.setattr(auth_middleware, '_db', db)
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    app.register_blueprint(api_auth.api_auth_bp, url_prefix='/api/auth')
+    app.db = db
+    yield app
+    db.close_all()
+
+
+def test_login_user_carries_token_for_authenticated_requests(app):
+    """로그인 응답의 user.token만으로 (쿠키 없이) 인증된 API 호출 가능"""
+    app.db.create_user({'email': 'a@b.c', 'password': 'pw', 'name': '홍길동', 'role': 'student'})
+
+    login = app.test_client().post('/api/auth/login', json={'email': 'a@b.c', 'password': 'pw'})
+    assert login.status_code == 200
+    user = login.get_json()['user']
+    assert 'password' not in user
+
+    # AuthContext가 저장하는 user만으로 api.js가 보내는 헤더 구성 (세션 쿠키 없는 새 클라이언트)
+    client = app.test_client(use_cookies=False)
+    response = client.get('/api/auth/me', headers={'Authorization': f"Bearer {user['token']}"})
+    assert response.status_code == 200
+    assert response.get_json()['user']['email'] == 'a@b.c'
+
+    assert client.get('/api/auth/me').status_code == 401
@@ -0,0 +1,108 @@
+"""
+인증 미들웨어 테스트
+서명 토큰/헤더 인증과 요청당 한 번의 사용자 확인을 검증
+"""
+
+import os
+import sys
+
+import pytest
+from flask import Flask, jsonify
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.database_service import DatabaseService
+from utils import auth_middleware
+from utils.auth_middleware import check_auth, get_current_user, issue_token
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    db = DatabaseService(str(tmp_path / 'database.db'))
+    monkeypatch.setattr(auth_middleware, '_db', db)
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    app.db = db
+
+    @app.route('/me')
+    def me():
+        auth_result = check_auth(required_role='student')
+        if auth_result:
+            return auth_result
+        user = get_current_user()
+        get_current_user()
+        return jsonify(user)
+
+    yield app
+    db.close_all()
+
+
+def test_signed_token_identity(app):
+    """서명 토큰의 이름/역할을 그대로 사용 (DB 조회 없음), 위조 토큰은 거부"""
+    with app.test_request_context():
+        token = issue_token({'user_id': '202300001', 'role': 'student', 'email': 'a@b.c', 'name': '홍길동'})
+
+    client = app.test_client()
+    response = client.get('/me', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert response.get_json()['name'] == '홍길동'
+    assert 'Set-Cookie' not in response.headers
+    assert app.db.get_cache_stats()['misses'] == 0
+
+    assert client.get('/me', headers={'Authorization': f'Bearer {token}x'}).status_code == 401
+
+
+def test_spoofed_headers_rejected_by_default(app):
+    """서명 없는 X-User-* 헤더만으로는 인증되지 않음 (AUTH_ALLOW_HEADER_IDENTITY 기본값 False)"""
+    headers = {'X-User-ID': 'P00001', 'X-User-Role': 'student', 'X-User-Email': 'a@b.c'}
+    assert app.test_client().get('/me', headers=headers).status_code == 401
+
+
+def test_header_identity_looks_up_name_once(app, monkeypatch):
+    """(개발 환경) 헤더 인증은 세션에 쓰지 않고, 이름은 요청당 한 번만 조회"""
+    from config import Config
+
+    monkeypatch.setattr(Config, 'AUTH_ALLOW_HEADER_IDENTITY', True)
+    user_id = app.db.create_user({'email': 'a@b.c', 'password': 'pw', 'name': '김철수', 'role': 'student'})
+    headers = {'X-User-ID': user_id, 'X-User-Role': 'student', 'X-User-Email': 'a@b.c'}
+
+    response = app.test_client().get('/me', headers=headers)
+    assert response.get_json()['name'] == '김철수'
+    assert 'Set-Cookie' not in response.headers
+    assert app.db.get_cache_stats()['misses'] == 1
+
+    headers['X-User-Role'] = 'professor'
+    assert app.test_client().get('/me', headers=headers).status_code == 403
+
+
+def test_course_access_requires_enrollment_or_ownership(app):
+    """강의 접근은 담당 교수와 수강 학생만 허용 (course_enrollments 조회)"""
+    from utils.auth_middleware import check_course_access
+
+    db = app.db
+    professor_id = db.create_user({'email': 'p@univ.ac.kr', 'password': 'pw', 'name': 'p', 'role': 'professor'})
+    student_id = db.create_user({'email': 's@b.c', 'password': 'pw', 'name': 's', 'role': 'student'})
+    other_id = db.create_user({'email': 'o@b.c', 'password': 'pw', 'name': 'o', 'role': 'student'})
+    course_id = db.add_course({'course_name': 'c', 'professor_id': professor_id, 'professor_name': 'p',
+                               'enrolled_students': [student_id]})
+
+    @app.route('/course')
+    def course():
+        auth_result = check_auth()
+        if auth_result:
+            return auth_result
+        access_result = check_course_access(db.get_course_by_id(course_id))
+        if access_result:
+            return access_result
+        return jsonify({'success': True})
+
+    def status(user_id, role):
+        with app.test_request_context():
+            token = issue_token({'user_id': user_id, 'role': role, 'email': 'x', 'name': 'x'})
+        return app.test_client().get('/course', headers={'Authorization': f'Bearer {token}'}).status_code
+
+    assert status(professor_id, 'professor') == 200
+    assert status(student_id, 'student') == 200
+    assert status(other_id, 'student') == 403
+    assert status('P99999', 'professor') == 403
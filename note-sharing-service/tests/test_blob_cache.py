@@ -0,0 +1,141 @@
+"""
+스토리지 로컬 디스크 캐시 테스트
+적중/미스, 동시 miss 합치기, 예산 초과 시 삭제 확인
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.blob_cache import BlobCache
+
+
+def _fetcher(data, calls, delay=0.0):
+    def fetch(temp_path):
+        calls.append(temp_path)
+        time.sleep(delay)
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        return True
+    return fetch
+
+
+def test_hit_after_fill(tmp_path):
+    """처음엔 fetch, 이후엔 디스크에서 읽음"""
+    cache = BlobCache(str(tmp_path), max_bytes=1024)
+    calls = []
+
+    assert cache.read_bytes('abc123', _fetcher(b'pdf', calls)) == b'pdf'
+    assert cache.read_bytes('abc123', _fetcher(b'other', calls)) == b'pdf'
+    assert len(calls) == 1
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries'], stats['bytes']) == (1, 1, 1, 3)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_concurrent_misses_fetch_once(tmp_path):
+    """같은 키의 동시 miss는 fetch 한 번으로 합쳐짐"""
+    cache = BlobCache(str(tmp_path), max_bytes=1024)
+    calls = []
+    fetch = _fetcher(b'x' * 100, calls, delay=0.05)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.read_bytes('k1', fetch)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [b'x' * 100] * 8
+    assert cache.get_stats()['collapsed'] >= 1
+
+
+def test_lru_eviction_and_reload(tmp_path):
+    """예산을 넘으면 가장 오래 사용하지 않은 항목부터 삭제, 재시작 시 디스크에서 색인"""
+    cache = BlobCache(str(tmp_path), max_bytes=250)
+    calls = []
+    cache.read_bytes('aa', _fetcher(b'a' * 100, calls))
+    cache.read_bytes('bb', _fetcher(b'b' * 100, calls))
+    cache.read_bytes('aa', _fetcher(b'a' * 100, calls))  # aa를 최근 사용으로
+    cache.read_bytes('cc', _fetcher(b'c' * 100, calls))  # bb 삭제
+
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] == 200
+    assert not os.path.exists(cache._path('bb'))
+
+    reloaded = BlobCache(str(tmp_path), max_bytes=250)
+    assert reloaded.get_stats()['entries'] == 2
+    assert reloaded.read_bytes('cc', _fetcher(b'z', calls)) == b'c' * 100
+
+
+def test_failed_fetch_and_invalidate(tmp_path):
+    """fetch 실패 시 파일이 남지 않고, 무효화하면 다시 받음"""
+    cache = BlobCache(str(tmp_path), max_bytes=1024)
+    assert cache.read_bytes('k', lambda temp_path: False) is None
+    assert cache.get_stats()['entries'] == 0
+    assert [n for _, _, files in os.walk(tmp_path) for n in files] == []
+
+    key = BlobCache.path_key('storage/custom/S1/C1.pdf')
+    calls = []
+    cache.read_bytes(key, _fetcher(b'old', calls))
+    cache.invalidate(key)
+    assert cache.read_bytes(key, _fetcher(b'new', calls)) == b'new'
+    assert len(calls) == 2
+
+
+def test_put_local_file_without_fetch(tmp_path):
+    """업로드한 로컬 파일을 넣으면 fetch 없이 적중, 원본 파일은 그대로 남음"""
+    cache = BlobCache(str(tmp_path / 'cache'), max_bytes=1024)
+    source = tmp_path / 'upload.pdf'
+    source.write_bytes(b'uploaded')
+
+    assert cache.put('hash1', str(source))
+    os.unlink(source)
+    assert cache.read_bytes('hash1', lambda temp_path: False) == b'uploaded'
+    assert cache.get_stats()['bytes'] == 8
+
+    big = tmp_path / 'big.pdf'
+    big.write_bytes(b'x' * 2048)
+    assert not cache.put('hash2', str(big))
+    assert big.exists()
+
+
+def test_storage_stream_fills_cache_from_same_reads(tmp_path):
+    """전체 전송은 GCS 범위 읽기 한 번으로 응답과 캐시를 함께 채우고, 중간에 끊긴 전송은 캐시하지 않음"""
+    from services.gcs_storage_service import GCSStorageService
+
+    data = b'%PDF-1.4 ' + bytes(range(256)) * 4
+    reads = []
+
+    class FakeBlob:
+        def download_as_bytes(self, start, end):
+            reads.append((start, end))
+            return data[start:end + 1]
+
+    class FakeBucket:
+        def blob(self, name, generation=None):
+            return FakeBlob()
+
+    storage = GCSStorageService.__new__(GCSStorageService)  # GCS 클라이언트 없이 생성
+    storage.bucket = FakeBucket()
+    storage.cache = BlobCache(str(tmp_path), max_bytes=4096)
+
+    aborted = storage.iter_and_cache('storage/a.pdf', len(data), content_hash='h1')
+    next(aborted)
+    aborted.close()
+    assert storage.open_cached('storage/a.pdf', 'h1') is None
+
+    reads.clear()
+    assert b''.join(storage.iter_and_cache('storage/a.pdf', len(data), content_hash='h1')) == data
+    assert sum(end + 1 - start for start, end in reads) == len(data)
+    with storage.open_cached('storage/a.pdf', 'h1') as f:
+        assert f.read() == data
+    assert [n for _, _, files in os.walk(tmp_path) for n in files] == ['h1']
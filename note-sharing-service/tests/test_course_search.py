@@ -0,0 +1,64 @@
+"""
+강의 검색 라우트 테스트
+수강하지 않은 학생과 마감 전 다른 학생 자료가 검색 결과에 드러나지 않는지 확인
+"""
+
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.database_service import DatabaseService
+from utils import auth_middleware
+from utils.auth_middleware import issue_token
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # 라우트 모듈의 기본 DB가 작업 디렉터리에 생기지 않도록 임시 디렉터리에서 import
+    monkeypatch.chdir(tmp_path)
+    from routes import api_course
+
+    db = DatabaseService(str(tmp_path / 'database.db'))
+    monkeypatch.setattr(api_course, 'db', db)
+    monkeypatch.setattr(auth_middleware, '_db', db)
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    app.register_blueprint(api_course.api_course_bp, url_prefix='/api/courses')
+    app.db = db
+    yield app
+    db.close_all()
+
+
+def _search(app, user_id, role, course_id):
+    with app.test_request_context():
+        token = issue_token({'user_id': user_id, 'role': role, 'email': 'x', 'name': 'x'})
+    return app.test_client().get(f'/api/courses/{course_id}/search?q=lecture',
+                                 headers={'Authorization': f'Bearer {token}'})
+
+
+def test_search_hides_materials_from_outsiders_and_before_deadline(app):
+    """수강하지 않은 학생은 403, 마감 전에는 다른 학생 자료가 검색되지 않음 (본인/교수는 검색됨)"""
+    db = app.db
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p',
+                               'enrolled_students': ['202300001', '202300002']})
+    db.set_week_deadline(course_id, 1, '2999-01-01T00:00:00')
+    material_id = db.add_material({
+        'course_id': course_id, 'week': 1, 'type': 'student', 'uploader_id': '202300001',
+        'uploader_name': 'a', 'filename': 'lecture.pdf', 'gcs_path': 'p/lecture.pdf', 'page_count': 1
+    })
+
+    outsider = _search(app, '202300009', 'student', course_id)
+    assert outsider.status_code == 403
+    assert 'results' not in outsider.get_json()
+
+    assert _search(app, '202300002', 'student', course_id).get_json()['results'] == []
+    assert [h['material_id'] for h in _search(app, '202300001', 'student', course_id).get_json()['results']] == [material_id]
+    assert [h['material_id'] for h in _search(app, 'P00001', 'professor', course_id).get_json()['results']] == [material_id]
+
+    db.set_week_deadline(course_id, 1, '2020-01-01T00:00:00')
+    assert [h['material_id'] for h in _search(app, '202300002', 'student', course_id).get_json()['results']] == [material_id]
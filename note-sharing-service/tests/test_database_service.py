@@ -0,0 +1,589 @@
+"""
+DatabaseService 테스트
+임시 SQLite 파일로 실제 쿼리 동작을 검증
+"""
+
+import os
+import sys
+
+import pytest
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.database_service import DatabaseService
+
+
+@pytest.fixture
+def db(tmp_path):
+    service = DatabaseService(str(tmp_path / 'database.db'))
+    yield service
+    service.close_all()
+
+
+def _create_student(db, email):
+    return db.create_user({'email': email, 'password': 'pw', 'name': email.split('@')[0], 'role': 'student'})
+
+
+def test_wal_mode_enabled(db):
+    """쓰기/읽기 연결 모두 WAL 모드"""
+    with db.get_connection() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    with db.get_connection(readonly=True) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_readonly_connection_rejects_writes(db):
+    """읽기 전용 연결에서는 쓰기 불가"""
+    import sqlite3
+    with pytest.raises(sqlite3.OperationalError):
+        with db.get_connection(readonly=True) as conn:
+            conn.execute("INSERT INTO users (user_id, email, password, name, role) VALUES ('x', 'x', 'x', 'x', 'student')")
+
+
+def test_connections_are_reused(db):
+    """풀에서 같은 연결을 재사용"""
+    with db.get_connection() as first:
+        pass
+    with db.get_connection() as second:
+        pass
+    assert first is second
+
+
+def test_unit_of_work_shares_connection_and_rolls_back(db):
+    """unit of work 안의 호출은 하나의 트랜잭션으로 묶임"""
+    with pytest.raises(RuntimeError):
+        with db.unit_of_work() as conn:
+            _create_student(db, 'a@student.ac.kr')
+            with db.get_connection(readonly=True) as inner:
+                assert inner is conn
+            assert db.get_user_by_email('a@student.ac.kr') is not None
+            raise RuntimeError('rollback')
+
+    assert db.get_user_by_email('a@student.ac.kr') is None
+
+
+def test_unit_of_work_commits_once(db):
+    """unit of work 정상 종료 시 commit"""
+    with db.unit_of_work():
+        _create_student(db, 'a@student.ac.kr')
+        _create_student(db, 'b@student.ac.kr')
+
+    assert len(db.get_all_users()) == 2
+
+
+def test_ids_keep_existing_format(db):
+    """시퀀스 기반 ID도 기존 형식 유지"""
+    assert _create_student(db, 'a@student.ac.kr') == '202300001'
+    assert db.create_user({'email': 'p@univ.ac.kr', 'password': 'pw', 'name': 'p', 'role': 'professor'}) == 'P00001'
+    assert db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'}) == 'C001'
+    assert db.allocate_id('custom_pdf') == 'CP001'
+    assert db.allocate_id('custom_pdf') == 'CP002'
+
+
+def test_concurrent_id_allocation_is_unique(db):
+    """여러 스레드가 동시에 발급해도 ID 중복 없음"""
+    import threading
+
+    ids = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(20):
+            new_id = db.allocate_id('notification')
+            with lock:
+                ids.append(new_id)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(ids) == 160
+    assert len(set(ids)) == 160
+
+
+def test_sequences_resync_after_manual_insert(tmp_path):
+    """직접 ID를 넣은 데이터가 있어도 이후 ID가 충돌하지 않음"""
+    db = DatabaseService(str(tmp_path / 'database.db'))
+    with db.get_connection() as conn:
+        conn.execute("""
+            INSERT INTO materials (material_id, course_id, week, type, uploader_id, uploader_name, filename, gcs_path)
+            VALUES ('M007', 'C001', 1, 'student', 'u', 'u', 'f.pdf', 'p')
+        """)
+    db.sync_id_sequences()
+    assert db.allocate_id('material') == 'M008'
+
+    # 새 인스턴스(재시작)에서도 시퀀스 유지
+    db.close_all()
+    assert DatabaseService(str(tmp_path / 'database.db')).allocate_id('material') == 'M009'
+
+
+def test_enrollment_lookup_is_exact(db):
+    """수강 강의 조회가 다른 학생 ID의 부분 문자열과 섞이지 않음"""
+    course_a = db.add_course({'course_name': 'A', 'professor_id': 'P00001', 'professor_name': 'p',
+                              'enrolled_students': ['2023000011']})
+    course_b = db.add_course({'course_name': 'B', 'professor_id': 'P00001', 'professor_name': 'p',
+                              'enrolled_students': ['202300001']})
+
+    assert [c['course_id'] for c in db.get_courses_by_student('202300001')] == [course_b]
+    assert db.is_enrolled(course_a, '2023000011')
+    assert not db.is_enrolled(course_a, '202300001')
+    assert db.get_course_by_id(course_b)['enrolled_students'] == ['202300001']
+
+
+def test_legacy_enrolled_students_are_migrated(tmp_path):
+    """기존 쉼표 문자열 수강생 데이터가 course_enrollments로 이전됨"""
+    path = str(tmp_path / 'database.db')
+    db = DatabaseService(path)
+    with db.get_connection() as conn:
+        conn.execute("""
+            INSERT INTO courses (course_id, course_name, professor_id, professor_name, enrolled_students)
+            VALUES ('C001', 'legacy', 'P00001', 'p', '202300001,202300002')
+        """)
+    db.close_all()
+
+    db = DatabaseService(path)
+    assert db.get_enrolled_students('C001') == ['202300001', '202300002']
+    assert [c['course_id'] for c in db.get_courses_by_student('202300002')] == ['C001']
+
+
+def _add_material(db, course_id, week, mat_type, uploader_id='202300001'):
+    return db.add_material({
+        'course_id': course_id, 'week': week, 'type': mat_type,
+        'uploader_id': uploader_id, 'uploader_name': uploader_id,
+        'filename': 'note.pdf', 'gcs_path': f'storage/{course_id}/{week}/note.pdf', 'page_count': 3
+    })
+
+
+def test_week_stats_aggregates_by_week_and_type(db):
+    """주차별 통계를 한 번에 집계하고 설정된 주차만 반환"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    for week in (1, 2, 3):
+        db.set_week_deadline(course_id, week, '2024-12-16T23:59:59')
+    _add_material(db, course_id, 1, 'professor')
+    material_id = _add_material(db, course_id, 1, 'student')
+    _add_material(db, course_id, 1, 'student')
+    db.increment_view_count(material_id)
+    db.increment_download_count(material_id)
+
+    stats = db.get_week_stats(course_id)
+
+    assert [s['week'] for s in stats] == [1, 2, 3]
+    assert stats[0] == {'week': 1, 'professor_count': 1, 'student_count': 2,
+                        'total_downloads': 1, 'total_views': 1,
+                        'evaluated_count': 0, 'average_score': None}
+    assert stats[1]['student_count'] == 0
+
+
+def test_week_stats_defaults_to_16_weeks(db):
+    """주차 설정이 없으면 기본 16주차"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    assert [s['week'] for s in db.get_week_stats(course_id)] == list(range(1, 17))
+
+
+def test_read_cache_hits_and_invalidation(db):
+    """사용자/강의/마감일 조회는 캐시되고 쓰기 시 무효화됨"""
+    user_id = _create_student(db, 'a@student.ac.kr')
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+
+    db.get_user_by_id(user_id)
+    db.get_course_by_id(course_id)
+    db.get_week_deadline(course_id, 1)
+    misses = db.get_cache_stats()['misses']
+
+    assert db.get_user_by_id(user_id)['email'] == 'a@student.ac.kr'
+    assert db.get_week_deadline(course_id, 1) is None
+    stats = db.get_cache_stats()
+    assert stats['misses'] == misses
+    assert stats['hits'] >= 2
+
+    db.set_week_deadline(course_id, 1, '2024-12-16T23:59:59')
+    assert db.get_week_deadline(course_id, 1) == '2024-12-16T23:59:59'
+    assert db.get_course_by_id(course_id)['weeks']['1']['upload_deadline'] == '2024-12-16T23:59:59'
+
+
+def test_cached_values_are_copies(db):
+    """반환값을 수정해도 캐시는 변하지 않음"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    db.get_course_by_id(course_id)['enrolled_students'].append('x')
+    assert db.get_course_by_id(course_id)['enrolled_students'] == []
+
+
+def test_evaluation_completed_keeps_deadline(db):
+    """평가 완료 처리 후에도 업로드 마감일 유지"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    db.set_week_deadline(course_id, 1, '2024-12-16T23:59:59')
+    db.mark_week_evaluation_completed(course_id, 1)
+
+    week = db.get_course_by_id(course_id)['weeks']['1']
+    assert week == {'upload_deadline': '2024-12-16T23:59:59', 'evaluation_status': 'completed'}
+    assert db.get_week_deadline(course_id, 1) == '2024-12-16T23:59:59'
+
+
+def test_deadline_calendar_gating_and_due_weeks(db):
+    """마감일은 epoch 컬럼으로 저장되고 업로드/열람 판정과 마감 주차 조회에 사용됨"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    db.set_week_deadline(course_id, 1, '2000-01-01T00:00:00Z')
+    db.set_week_deadline(course_id, 2, '2999-01-01T00:00:00')
+    db.set_week_deadline(course_id, 3, 'not-a-date')
+
+    assert not db.is_upload_period_open(course_id, 1)
+    assert db.can_view_materials(course_id, 1)
+    assert db.is_upload_period_open(course_id, 2)
+    assert not db.can_view_materials(course_id, 2)
+    assert db.is_upload_period_open(course_id, 3) and db.can_view_materials(course_id, 3)
+    assert db.is_upload_period_open(course_id, 4) and db.can_view_materials(course_id, 4)
+
+    # 판정은 메모리 캘린더에서 (추가 DB 조회 없음)
+    misses = db.get_cache_stats()['misses']
+    for week in range(1, 17):
+        db.is_upload_period_open(course_id, week)
+    assert db.get_cache_stats()['misses'] == misses
+
+    assert [(r['course_id'], r['week']) for r in db.get_due_weeks()] == [(course_id, 1)]
+    db.mark_week_evaluation_completed(course_id, 1)
+    assert db.get_due_weeks() == []
+
+    # 마감일 변경 시 캘린더 무효화
+    db.set_week_deadline(course_id, 2, '2000-01-01T00:00:00')
+    assert not db.is_upload_period_open(course_id, 2)
+    assert [r['week'] for r in db.get_due_weeks()] == [2]
+
+
+def test_add_notifications_bulk(db):
+    """알림 일괄 추가 시 ID가 연속 발급되고 개별 추가와 섞여도 중복 없음"""
+    db.add_notification({'user_id': 'u0', 'type': 't', 'message': 'single'})
+    count = db.add_notifications_bulk([
+        {'user_id': f'u{i}', 'type': 'material_upload', 'related_id': 'M001', 'message': 'bulk'}
+        for i in range(1, 4)
+    ])
+    db.add_notification({'user_id': 'u0', 'type': 't', 'message': 'single'})
+
+    assert count == 3
+    assert [n['notification_id'] for n in db.get_notifications_by_user('u2')] == ['N003']
+    assert sorted(n['notification_id'] for n in db.get_notifications_by_user('u0')) == ['N001', 'N005']
+    assert db.add_notifications_bulk([]) == 0
+
+
+def test_counters_are_buffered_and_merged(db):
+    """조회/다운로드 수는 버퍼에 모였다가 flush 시 한 번에 반영되고, 읽기 결과에는 즉시 합산됨"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    material_id = _add_material(db, course_id, 1, 'student')
+    for _ in range(3):
+        db.increment_view_count(material_id)
+    db.increment_download_count(material_id)
+
+    with db.get_connection(readonly=True) as conn:
+        stored = conn.execute('SELECT view_count FROM materials WHERE material_id = ?', (material_id,)).fetchone()
+    assert stored['view_count'] == 0
+    assert db.get_material_by_id(material_id)['view_count'] == 3
+    assert db.get_materials_by_course_week(course_id, 1)[0]['download_count'] == 1
+
+    db.flush_counters()
+    with db.get_connection(readonly=True) as conn:
+        stored = conn.execute('SELECT view_count, download_count FROM materials WHERE material_id = ?',
+                              (material_id,)).fetchone()
+    assert (stored['view_count'], stored['download_count']) == (3, 1)
+    assert db.get_material_by_id(material_id)['view_count'] == 3
+
+
+def test_counters_not_double_counted_after_commit(db, monkeypatch):
+    """flush가 commit한 직후부터는 증가분이 pending()에 다시 합산되지 않음"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    material_id = _add_material(db, course_id, 1, 'student')
+    db.increment_view_count(material_id)
+    db.increment_view_count(material_id)
+
+    apply_deltas = db.counters._flush_func
+    seen = []
+
+    def flush_and_read(deltas, committed):
+        apply_deltas(deltas, committed)
+        seen.append((db.counters.pending([material_id]), db.get_material_by_id(material_id)['view_count']))
+
+    monkeypatch.setattr(db.counters, '_flush_func', flush_and_read)
+    db.flush_counters()
+    assert seen == [({}, 2)]
+
+
+def test_notification_keyset_pagination(db):
+    """같은 시각에 생성된 알림도 (created_at, id) 커서로 빠짐없이 페이지 이동"""
+    from utils.pagination import encode_cursor, decode_cursor
+
+    db.add_notifications_bulk([{'user_id': 'u', 'type': 't', 'message': str(i)} for i in range(7)])
+
+    seen = []
+    after = None
+    while True:
+        page = db.get_notifications_by_user('u', limit=3, after=after)
+        seen.extend(n['notification_id'] for n in page)
+        if len(page) < 3:
+            break
+        cursor = encode_cursor(page[-1]['created_at'], page[-1]['notification_id'])
+        after = decode_cursor(cursor, 2)
+
+    assert sorted(seen) == sorted(n['notification_id'] for n in db.get_notifications_by_user('u'))
+    assert len(seen) == 7
+
+
+def test_materials_by_course_keyset_pagination(db):
+    """강의 전체 자료도 (week, upload_date, id) 커서로 순서대로 페이지 이동"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    for week in (2, 1, 2, 1, 3):
+        _add_material(db, course_id, week, 'student')
+
+    full = [m['material_id'] for m in db.get_materials_by_course(course_id)]
+    first = db.get_materials_by_course(course_id, limit=2)
+    last = first[-1]
+    rest = db.get_materials_by_course(course_id, after=(last['week'], last['upload_date'], last['material_id']))
+
+    assert [m['material_id'] for m in first + rest] == full
+    assert [m['week'] for m in first + rest] == [1, 1, 2, 2, 3]
+
+
+def test_week_materials_uploader_filter_pages_own_materials(db):
+    """열람 전 학생 본인 자료만 SQL에서 걸러 페이지가 다른 학생 자료로 비지 않음"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    for uploader in ('me', 'other', 'other', 'me', 'other', 'me'):
+        _add_material(db, course_id, 1, 'student', uploader_id=uploader)
+
+    first = db.get_materials_by_course_week(course_id, 1, material_type='student', limit=2, uploader_id='me')
+    last = first[-1]
+    rest = db.get_materials_by_course_week(course_id, 1, material_type='student', limit=2,
+                                           after=(last['upload_date'], last['material_id']), uploader_id='me')
+
+    assert len(first) == 2 and len(rest) == 1
+    assert {m['uploader_id'] for m in first + rest} == {'me'}
+
+
+def test_query_stats_records_methods_and_slow_queries(tmp_path, monkeypatch):
+    """메서드별 호출 통계와 느린 쿼리(실행 계획 포함) 기록 (DB_QUERY_STATS를 켠 경우만)"""
+    from config import Config
+    from services.query_stats import query_stats
+
+    query_stats.reset()
+    db = DatabaseService(str(tmp_path / 'database.db'))
+    db.get_all_courses()
+    assert query_stats.snapshot()['total_queries'] == 0
+
+    # 이미 풀에 있는 연결도 설정을 켠 뒤부터 계측
+    monkeypatch.setattr(Config, 'DB_QUERY_STATS', True)
+    monkeypatch.setattr(Config, 'DB_SLOW_QUERY_MS', 0)
+    _create_student(db, 'stats@test.com')
+    db.get_all_courses()
+
+    snapshot = query_stats.snapshot()
+    assert snapshot['total_queries'] > 0
+    assert snapshot['methods']['DatabaseService.get_all_courses']['calls'] == 1
+    select = next(q for q in snapshot['slow_queries'] if q['sql'].startswith('SELECT'))
+    assert select['query_plan']
+    query_stats.reset()
+    db.close_all()
+
+
+def test_seed_users_bulk_with_row_errors(db):
+    """대량 사용자 생성: 연속 ID 발급, 행별 오류는 입력 순서대로"""
+    _create_student(db, 'old@test.com')
+    created, errors = db.seed_users([
+        {'email': 'p@test.com', 'password': 'pw', 'name': 'p', 'role': 'professor'},
+        {'email': 'old@test.com', 'password': 'pw', 'name': 'o', 'role': 'student'},
+        {'email': 's1@test.com', 'password': 'pw', 'name': 's1', 'role': 'student'},
+        {'email': 's1@test.com', 'password': 'pw', 'name': 'dup', 'role': 'student'},
+        {'email': 'x@test.com', 'name': 'x', 'role': 'student'},
+        {'email': 's2@test.com', 'password': 'pw', 'name': 's2', 'role': 'student'},
+    ])
+
+    assert [c['email'] for c in created] == ['p@test.com', 's1@test.com', 's2@test.com']
+    assert [c['user_id'] for c in created] == ['P00001', '202300002', '202300003']
+    assert [e['email'] for e in errors] == ['old@test.com', 's1@test.com', 'x@test.com']
+    assert db.get_user_by_id('202300003')['name'] == 's2'
+
+
+def test_seed_courses_bulk(db):
+    """대량 강의 생성: 주차 마감일과 초대 코드까지 함께 생성"""
+    db.seed_users([{'email': 'p@test.com', 'password': 'pw', 'name': '김교수', 'role': 'professor'}])
+    created, errors = db.seed_courses([
+        {'course_name': 'A', 'professor_email': 'p@test.com', 'deadline': '2030-01-01T00:00:00',
+         'weeks': 3, 'create_invitation': True},
+        {'course_name': 'B', 'professor_email': 'nobody@test.com'},
+        {'course_name': 'C', 'professor_email': 'p@test.com'},
+    ])
+
+    assert [c['course_id'] for c in created] == ['C001', 'C002']
+    assert errors == [{'course': 'B', 'error': '교수를 찾을 수 없음'}]
+    course = db.get_course_by_id('C001')
+    assert course['professor_name'] == '김교수'
+    assert sorted(course['weeks']) == ['1', '2', '3']
+    assert db.get_invitation(created[0]['invitation_code'])['course_id'] == 'C001'
+    assert created[1]['invitation_code'] is None
+
+
+def test_use_invitation_concurrent_respects_max_uses(db):
+    """동시 참가에도 max_uses만큼만 등록되고, 재참가는 사용 횟수를 소모하지 않음"""
+    import threading
+
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    code = db.create_invitation(course_id, 'P00001', max_uses=5)
+    students = [f'2023{i:05d}' for i in range(20)]
+    results = {}
+
+    def join(student_id):
+        results[student_id] = db.use_invitation(code, student_id)
+
+    threads = [threading.Thread(target=join, args=(s,)) for s in students]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    joined = [s for s, course in results.items() if course]
+    assert len(joined) == 5
+    assert sorted(db.get_enrolled_students(course_id)) == sorted(joined)
+    assert db.get_invitation(code)['current_uses'] == 5
+    # 한도를 다 쓴 초대는 이미 수강 중인 학생에게도 실패
+    assert db.use_invitation(code, joined[0]) is None
+    assert db.get_invitation(code)['current_uses'] == 5
+    assert db.use_invitation('nope', students[0]) is None
+
+    # 유효한 초대로 재참가하면 사용 횟수를 소모하지 않음
+    other = db.create_invitation(course_id, 'P00001', max_uses=2)
+    assert db.use_invitation(other, joined[0]) == {'course_id': course_id, 'course_name': 'c'}
+    assert db.get_invitation(other)['current_uses'] == 0
+
+
+def test_use_invitation_rejects_inactive_and_expired(db):
+    """비활성/만료된 초대는 신규 참가와 이미 수강 중인 학생 모두 실패"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    enrolled = '202300001'
+    db.use_invitation(db.create_invitation(course_id, 'P00001'), enrolled)
+
+    inactive = db.create_invitation(course_id, 'P00001')
+    with db.get_connection() as conn:
+        conn.execute('UPDATE course_invitations SET is_active = 0 WHERE invitation_code = ?', (inactive,))
+    expired = db.create_invitation(course_id, 'P00001', expires_at='2020-01-01T00:00:00')
+    future = db.create_invitation(course_id, 'P00001', expires_at='2999-01-01T00:00:00')
+
+    for code in (inactive, expired):
+        assert db.use_invitation(code, '202300002') is None
+        assert db.use_invitation(code, enrolled) is None
+        assert db.get_invitation(code)['current_uses'] == 0
+    assert db.get_enrolled_students(course_id) == [enrolled]
+
+    assert db.use_invitation(future, '202300002') == {'course_id': course_id, 'course_name': 'c'}
+
+
+def test_week_summary_maintained_by_triggers(db):
+    """자료 추가/카운터/점수/삭제가 week_summary에 증분 반영되고 재집계 결과와 일치"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    first = _add_material(db, course_id, 1, 'student')
+    second = _add_material(db, course_id, 1, 'student')
+    moved = _add_material(db, course_id, 1, 'professor')
+    db.increment_view_count(first)
+    db.flush_counters()
+    with db.get_connection() as conn:
+        conn.execute('UPDATE materials SET evaluation_score = 80 WHERE material_id = ?', (first,))
+        conn.execute('UPDATE materials SET evaluation_score = 90 WHERE material_id = ?', (second,))
+        conn.execute('UPDATE materials SET week = 2 WHERE material_id = ?', (moved,))
+
+    def summary():
+        with db.get_connection(readonly=True) as conn:
+            return [tuple(row) for row in conn.execute('SELECT * FROM week_summary ORDER BY course_id, week')]
+
+    week1 = next(s for s in db.get_week_stats(course_id) if s['week'] == 1)
+    assert (week1['student_count'], week1['professor_count'], week1['total_views']) == (2, 0, 1)
+    assert (week1['evaluated_count'], week1['average_score']) == (2, 85.0)
+
+    incremental = summary()
+    db.rebuild_week_summary()
+    assert summary() == incremental
+
+
+def test_search_materials_ranks_pages_within_course(db):
+    """파일명/본문 검색은 강의로 한정되고 페이지 번호와 함께 반환, 자료 삭제 시 색인도 제거"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    other_id = db.add_course({'course_name': 'o', 'professor_id': 'P00001', 'professor_name': 'p'})
+    first = _add_material(db, course_id, 1, 'student')
+    second = _add_material(db, course_id, 2, 'student')
+    other = _add_material(db, other_id, 1, 'student')
+    db.index_material_pages(first, ['정규화 개요', '', '트랜잭션과 인덱스를 배웁니다'])
+    db.index_material_pages(second, ['인덱스 인덱스 B-tree 인덱스'])
+    db.index_material_pages(other, ['인덱스'])
+
+    hits = db.search_materials(course_id, '인덱스')
+    assert [(h['material_id'], h['page_number']) for h in hits] == [(second, 1), (first, 3)]
+    assert '<b>' in hits[0]['snippet']
+    assert db.search_materials(course_id, '"  ') == []
+
+    # 재색인은 기존 본문 행을 교체
+    db.index_material_pages(first, ['다른 내용'])
+    assert [h['material_id'] for h in db.search_materials(course_id, '인덱스')] == [second]
+    assert db.get_unindexed_materials() == []
+
+    with db.get_connection() as conn:
+        conn.execute('DELETE FROM materials WHERE material_id = ?', (second,))
+    assert db.search_materials(course_id, '인덱스') == []
+
+
+def test_record_unique_access_counts_each_user_once(db):
+    """같은 사용자의 반복 조회는 한 번만 집계하고 고유 사용자 수를 보고"""
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+    material_id = _add_material(db, course_id, 1, 'student')
+
+    assert db.record_unique_access(material_id, 'u1', 'view') is True
+    assert db.record_unique_access(material_id, 'u1', 'view') is False
+    db.seen.clear()
+    assert db.record_unique_access(material_id, 'u1', 'view') is False
+    assert db.record_unique_access(material_id, 'u2', 'view') is True
+    assert db.record_unique_access(material_id, 'u1', 'download') is True
+
+    material = db.get_material_by_id(material_id)
+    assert (material['view_count'], material['download_count']) == (2, 1)
+    assert db.get_unique_access_counts(material_id) == {'unique_viewers': 2, 'unique_downloaders': 1}
+
+
+def test_conditional_get_validators_change_on_writes(db):
+    """강의 목록/주차/알림 검증값은 관련 데이터가 바뀔 때만 달라짐"""
+    student_id = _create_student(db, 'v@student.ac.kr')
+    course_id = db.add_course({'course_name': 'c', 'professor_id': 'P00001', 'professor_name': 'p'})
+
+    courses_before = db.get_course_list_validator(student_id, 'student')
+    week_before = db.get_week_validator(course_id, 1)
+    assert db.get_course_list_validator(student_id, 'student') == courses_before
+    assert db.get_week_validator(course_id, 1) == week_before
+
+    db.use_invitation(db.create_invitation(course_id, 'P00001'), student_id)
+    assert db.get_course_list_validator(student_id, 'student') != courses_before
+    assert db.get_course_list_validator('P00001', 'professor') != ()
+
+    week_enrolled = db.get_week_validator(course_id, 1)
+    assert week_enrolled != week_before
+    db.add_material({'course_id': course_id, 'week': 1, 'type': 'student', 'uploader_id': student_id,
+                     'uploader_name': 's', 'filename': 'a.pdf', 'gcs_path': 'p/a.pdf'})
+    week_uploaded = db.get_week_validator(course_id, 1)
+    assert week_uploaded != week_enrolled
+    assert db.get_week_validator(course_id, 2) != week_uploaded
+    db.set_week_deadline(course_id, 1, '2024-12-16T23:59:59')
+    assert db.get_week_validator(course_id, 1) != week_uploaded
+
+    notifications_before = db.get_notification_watermark(student_id)
+    db.add_notification({'user_id': student_id, 'type': 't', 'message': 'm'})
+    assert db.get_notification_watermark(student_id) != notifications_before
+
+
+def test_after_commit_callback_failure_keeps_commit(db):
+    """commit 후 콜백이 실패해도 commit된 데이터는 유지되고 나머지 콜백도 실행됨"""
+    ran = []
+
+    def fail():
+        raise RuntimeError('callback')
+
+    with db.unit_of_work():
+        _create_student(db, 'a@student.ac.kr')
+        db.call_after_commit(fail)
+        db.call_after_commit(lambda: ran.append(True))
+        assert ran == []
+
+    assert ran == [True]
+    assert db.get_user_by_email('a@student.ac.kr') is not None
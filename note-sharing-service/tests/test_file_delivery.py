@@ -0,0 +1,191 @@
+"""
+저장소 파일 응답 테스트
+직접 전송 / 서명 URL 리다이렉트 모드 검증
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+import tempfile
+from urllib.parse import unquote
+
+import pytest
+from flask import Flask
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from utils.file_delivery import content_disposition, stream_storage_file
+
+
+class FakeStorage:
+    """메모리 GCS 대용"""
+
+    def __init__(self, blobs, cached=()):
+        self.blobs = blobs
+        self.cached = set(cached)
+        self.signed = []
+        self.range_reads = []
+
+    def open_cached(self, gcs_path, content_hash=None):
+        if gcs_path not in self.cached:
+            return None
+        f = tempfile.TemporaryFile()
+        f.write(self.blobs[gcs_path])
+        f.seek(0)
+        return f
+
+    def get_blob_info(self, gcs_path):
+        data = self.blobs.get(gcs_path)
+        return (len(data), 1) if data is not None else None
+
+    def iter_range(self, gcs_path, start, stop, generation=None, chunk_size=4):
+        for position in range(start, stop, chunk_size):
+            end = min(position + chunk_size, stop)
+            self.range_reads.append((position, end))
+            yield self.blobs[gcs_path][position:end]
+
+    def iter_and_cache(self, gcs_path, size, generation=None, content_hash=None):
+        for chunk in self.iter_range(gcs_path, 0, size, generation):
+            yield chunk
+        self.cached.add(gcs_path)
+
+    def get_signed_url(self, gcs_path, expiration=3600, response_disposition=None, response_type=None):
+        self.signed.append((gcs_path, expiration, response_disposition, response_type))
+        return f'https://storage.example/{gcs_path}?sig=1'
+
+
+@pytest.fixture
+def storage():
+    return FakeStorage({'storage/a.pdf': b'%PDF-1.4 data'})
+
+
+@pytest.fixture
+def app(storage):
+    app = Flask(__name__)
+
+    @app.route('/download/<path:gcs_path>')
+    def download(gcs_path):
+        return stream_storage_file(storage, gcs_path, '자료구조 3주차 김교수.pdf', as_attachment=True)
+
+    @app.route('/view/<path:gcs_path>')
+    def view(gcs_path):
+        return stream_storage_file(storage, gcs_path, 'a.pdf')
+
+    @app.route('/view-hashed/<path:gcs_path>')
+    def view_hashed(gcs_path):
+        return stream_storage_file(storage, gcs_path, 'a.pdf', content_hash='abc123',
+                                   last_modified=datetime(2024, 3, 1, tzinfo=timezone.utc))
+
+    return app
+
+
+def test_content_disposition_keeps_korean_filename():
+    """한글 파일명은 filename*로 보존되고 ASCII 대체 이름도 포함"""
+    value = content_disposition('자료구조 3주차 김교수.pdf')
+    assert value.startswith('attachment; filename="')
+    assert unquote(value.split("filename*=UTF-8''")[1]) == '자료구조 3주차 김교수.pdf'
+    assert content_disposition('a.pdf', as_attachment=False).startswith('inline;')
+
+
+def test_proxy_mode_streams_chunks(app, storage, monkeypatch):
+    """proxy 모드는 서버가 청크 단위로 직접 전송 (첨부 파일명 유지)"""
+    monkeypatch.setattr(Config, 'MATERIAL_DELIVERY_MODE', 'proxy')
+    response = app.test_client().get('/download/storage/a.pdf')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.data == b'%PDF-1.4 data'
+    assert response.headers['Content-Disposition'] == content_disposition('자료구조 3주차 김교수.pdf')
+    assert storage.range_reads == [(0, 4), (4, 8), (8, 12), (12, 13)]
+    assert storage.signed == []
+
+    assert app.test_client().get('/download/storage/missing.pdf').status_code == 500
+
+
+def test_redirect_mode_returns_signed_url(app, storage, monkeypatch):
+    """redirect 모드는 파일명이 담긴 짧은 수명의 서명 URL로 302"""
+    monkeypatch.setattr(Config, 'MATERIAL_DELIVERY_MODE', 'redirect')
+    response = app.test_client().get('/download/storage/a.pdf')
+    assert response.status_code == 302
+    assert response.headers['Location'] == 'https://storage.example/storage/a.pdf?sig=1'
+
+    gcs_path, expiration, disposition, response_type = storage.signed[0]
+    assert gcs_path == 'storage/a.pdf'
+    assert expiration == Config.SIGNED_URL_REDIRECT_TTL
+    assert disposition == content_disposition('자료구조 3주차 김교수.pdf')
+    assert response_type == 'application/pdf'
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_view_supports_range_requests(storage, app, monkeypatch, cached):
+    """Range 요청은 206과 요청 구간만, 없으면 200 전체 (캐시/GCS 범위 읽기 모두)"""
+    monkeypatch.setattr(Config, 'MATERIAL_DELIVERY_MODE', 'proxy')
+    if cached:
+        storage.cached.add('storage/a.pdf')
+    client = app.test_client()
+
+    full = client.get('/view/storage/a.pdf')
+    assert full.status_code == 200
+    assert full.data == b'%PDF-1.4 data'
+    assert full.headers['Accept-Ranges'] == 'bytes'
+    assert full.headers['Content-Disposition'].startswith('inline;')
+
+    partial = client.get('/view/storage/a.pdf', headers={'Range': 'bytes=5-7'})
+    assert partial.status_code == 206
+    assert partial.data == b'1.4'
+    assert partial.headers['Content-Range'] == 'bytes 5-7/13'
+    assert partial.headers['Content-Length'] == '3'
+
+    tail = client.get('/view/storage/a.pdf', headers={'Range': 'bytes=-4'})
+    assert tail.status_code == 206 and tail.data == b'data'
+
+    unsatisfiable = client.get('/view/storage/a.pdf', headers={'Range': 'bytes=100-'})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers['Content-Range'] == 'bytes */13'
+
+    if cached:
+        assert storage.range_reads == []
+    else:
+        # 전체 요청은 보낸 바이트로 캐시를 채우고, 이후 Range 요청은 캐시에서 읽음
+        assert storage.range_reads == [(0, 4), (4, 8), (8, 12), (12, 13)]
+        assert 'storage/a.pdf' in storage.cached
+
+
+def test_range_miss_reads_only_requested_bytes(storage, app, monkeypatch):
+    """캐시에 없을 때 Range 요청은 요청 구간만 GCS에서 읽고 전체 객체를 따로 받지 않음"""
+    monkeypatch.setattr(Config, 'MATERIAL_DELIVERY_MODE', 'proxy')
+    partial = app.test_client().get('/view/storage/a.pdf', headers={'Range': 'bytes=5-7'})
+    assert partial.data == b'1.4'
+    assert storage.range_reads == [(5, 8)]
+    assert 'storage/a.pdf' not in storage.cached
+
+
+def test_view_conditional_get(storage, app, monkeypatch):
+    """내용 해시 ETag가 일치하면 저장소 조회 없이 304, If-Range 불일치면 전체 응답"""
+    monkeypatch.setattr(Config, 'MATERIAL_DELIVERY_MODE', 'proxy')
+    client = app.test_client()
+
+    first = client.get('/view-hashed/storage/a.pdf')
+    assert first.headers['ETag'] == '"abc123"'
+    assert first.headers['Last-Modified'] == 'Fri, 01 Mar 2024 00:00:00 GMT'
+    assert first.headers['Cache-Control'] == f'private, max-age={Config.MATERIAL_MAX_AGE}'
+
+    storage.range_reads.clear()
+    again = client.get('/view-hashed/storage/a.pdf', headers={'If-None-Match': '"abc123"'})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert storage.range_reads == []
+
+    stale = client.get('/view-hashed/storage/a.pdf',
+                       headers={'Range': 'bytes=0-3', 'If-Range': '"old"'})
+    assert stale.status_code == 200 and stale.data == b'%PDF-1.4 data'
+    fresh = client.get('/view-hashed/storage/a.pdf',
+                       headers={'Range': 'bytes=0-3', 'If-Range': '"abc123"'})
+    assert fresh.status_code == 206 and fresh.data == b'%PDF'
+
+    # 내용 해시가 없으면 경로 + generation 기반 ETag, 매번 재검증
+    legacy = client.get('/view/storage/a.pdf')
+    assert legacy.headers['Cache-Control'] == 'private, no-cache'
+    revalidated = client.get('/view/storage/a.pdf', headers={'If-None-Match': legacy.headers['ETag']})
+    assert revalidated.status_code == 304
@@ -0,0 +1,160 @@
+"""
+업로드 수집 파이프라인 테스트
+스트림을 한 번 읽으며 검증/해시/chunk 단위 저장이 이루어지는지 확인
+"""
+
+import hashlib
+import os
+import sys
+from io import BytesIO
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from PyPDF2 import PdfWriter
+
+from services.ingest_service import IngestService
+from services.pdf_service import PDFService
+
+
+class FakeWriter:
+    """chunk 단위 업로드 기록 (close() 시 객체 완성)"""
+
+    def __init__(self, storage, gcs_path):
+        self.storage = storage
+        self.gcs_path = gcs_path
+        self.chunks = []
+
+    def write(self, chunk):
+        self.chunks.append(bytes(chunk))
+
+    def close(self):
+        self.storage.blobs[self.gcs_path] = b''.join(self.chunks)
+
+
+class FakeStorage:
+    """메모리 GCS 대용"""
+
+    def __init__(self):
+        self.blobs = {}
+        self.writers = []
+        self.cached = {}
+
+    def upload_bytes(self, gcs_path, data, content_type='application/pdf'):
+        self.blobs[gcs_path] = data
+        return True
+
+    def open_upload(self, gcs_path, content_type='application/pdf'):
+        writer = FakeWriter(self, gcs_path)
+        self.writers.append(writer)
+        return writer
+
+    def cache_file(self, local_path, content_hash):
+        with open(local_path, 'rb') as f:
+            self.cached[content_hash] = f.read()
+        return True
+
+    def delete_file(self, gcs_path):
+        return self.blobs.pop(gcs_path, None) is not None
+
+    def save_thumbnail(self, image_bytes, material_id, page_number):
+        path = f"storage/thumbnails/{material_id}/page_{page_number}.jpg"
+        self.blobs[path] = image_bytes
+        return path
+
+
+class CountingStream(BytesIO):
+    """read()로 읽은 총 바이트 수 기록"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def _make_pdf(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_ingest_reads_stream_once():
+    """스트림은 한 번만 읽히고 저장/해시/페이지 수가 같은 바이트에서 계산됨"""
+    storage = FakeStorage()
+    service = IngestService(storage, PDFService(), max_workers=2)
+    data = _make_pdf(3)
+    stream = CountingStream(data)
+
+    result = service.ingest(stream, 'storage/professor/C001/week_1/a.pdf', render=False)
+
+    assert stream.bytes_read == len(data)
+    assert storage.blobs['storage/professor/C001/week_1/a.pdf'] == data
+    assert result['page_count'] == 3
+    assert result['size'] == len(data)
+    assert result['content_hash'] == hashlib.sha256(data).hexdigest()
+    assert service.save_thumbnails(result['thumbnails'], 'M001') == []
+
+
+def test_ingest_streams_upload_in_chunks_and_caches_spool(tmp_path, monkeypatch):
+    """업로드는 읽은 chunk 단위로 전송되고, 임시 파일은 디스크 캐시에 넣은 뒤 삭제됨 (결과에 본문 없음)"""
+    from config import Config
+
+    monkeypatch.setattr(Config, 'INGEST_CHUNK_SIZE', 256)
+    monkeypatch.setattr(Config, 'INGEST_UPLOAD_QUEUE_CHUNKS', 2)
+    monkeypatch.setattr(Config, 'INGEST_SPOOL_DIR', str(tmp_path))
+    storage = FakeStorage()
+    service = IngestService(storage, PDFService(), max_workers=2)
+    data = _make_pdf(5)
+
+    result = service.ingest(BytesIO(data), 'storage/a.pdf', render=False)
+
+    assert 'pdf_data' not in result
+    assert len(storage.writers[0].chunks) == -(-len(data) // 256)
+    assert storage.blobs['storage/a.pdf'] == data
+    assert storage.cached[result['content_hash']] == data
+    assert os.listdir(tmp_path) == []
+
+
+def test_ingest_saves_rendered_thumbnails():
+    """렌더링된 썸네일은 자료 ID가 정해진 뒤 페이지 순서대로 저장됨"""
+    class FakePDF(PDFService):
+        def render_thumbnails(self, pdf_bytes, dpi=150, quality=85):
+            return [(b'jpg1', 100, 140), (b'jpg22', 100, 140)]
+
+    storage = FakeStorage()
+    service = IngestService(storage, FakePDF(), max_workers=2)
+    result = service.ingest(BytesIO(_make_pdf(2)), 'storage/x.pdf')
+
+    pages = service.save_thumbnails(result['thumbnails'], 'M001')
+    assert [page['gcs_path'] for page in pages] == ['storage/thumbnails/M001/page_1.jpg',
+                                                    'storage/thumbnails/M001/page_2.jpg']
+    assert [page['page_number'] for page in pages] == [1, 2]
+    assert pages[1]['byte_size'] == 5
+    assert (pages[1]['width'], pages[1]['height']) == (100, 140)
+    assert all(page['render_status'] == 'rendered' for page in pages)
+    assert storage.blobs[pages[1]['gcs_path']] == b'jpg22'
+
+
+def test_ingest_rejects_invalid_pdf(tmp_path, monkeypatch):
+    """PDF가 아니면 업로드 전에, 손상된 PDF는 업로드 후 거부되고 저장된 파일/임시 파일도 남지 않음"""
+    from config import Config
+
+    monkeypatch.setattr(Config, 'INGEST_SPOOL_DIR', str(tmp_path))
+    storage = FakeStorage()
+    service = IngestService(storage, PDFService(), max_workers=2)
+
+    with pytest.raises(ValueError):
+        service.ingest(BytesIO(b'not a pdf'), 'storage/a.pdf', render=False)
+    with pytest.raises(ValueError):
+        service.ingest(BytesIO(b'%PDF-1.4 broken'), 'storage/b.pdf', render=False)
+    assert [writer.gcs_path for writer in storage.writers] == ['storage/b.pdf']
+    assert storage.blobs == {}
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,74 @@
+"""
+JSON → SQLite 마이그레이션 테스트
+스트리밍 읽기와 중단 후 재개 동작을 검증
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import migrate_to_sqlite
+from migrate_to_sqlite import BulkImporter
+from services.database_service import DatabaseService
+from utils.json_stream import iter_json_array
+
+
+def _write_notifications(data_dir, count):
+    notifications = [{'notification_id': f'N{i:03d}', 'user_id': 'u', 'message': f'메시지 {i} ' + 'x' * 50,
+                      'created_at': f'2025-01-01T00:00:{i:02d}'} for i in range(1, count + 1)]
+    with open(os.path.join(data_dir, 'notifications.json'), 'w', encoding='utf-8') as f:
+        json.dump({'notifications': notifications}, f, ensure_ascii=False, indent=2)
+    return notifications
+
+
+def test_iter_json_array_across_chunks(tmp_path):
+    """청크 경계에 걸친 항목도 원본과 동일하게 읽음"""
+    expected = _write_notifications(str(tmp_path), 30)
+    path = str(tmp_path / 'notifications.json')
+
+    assert list(iter_json_array(path, 'notifications', chunk_size=17)) == expected
+    assert list(iter_json_array(path, 'missing')) == []
+
+
+def test_import_resumes_after_interruption(tmp_path, monkeypatch):
+    """중단되면 마지막 커밋 위치부터 재개하고, 끝나면 인덱스와 시퀀스를 복구"""
+    data_dir = str(tmp_path)
+    _write_notifications(data_dir, 25)
+    db = DatabaseService(str(tmp_path / 'database.db'))
+
+    # 세 번째 batch에서 실패하도록 함
+    calls = {'n': 0}
+    original = migrate_to_sqlite._notification_rows
+
+    def failing_rows(notif):
+        calls['n'] += 1
+        if calls['n'] > 20:
+            raise RuntimeError('중단')
+        return original(notif)
+
+    sources = [(name, f, key, [(stmts[0][0], failing_rows)]) if name == 'notifications' else (name, f, key, stmts)
+               for name, f, key, stmts in migrate_to_sqlite.SOURCES]
+    monkeypatch.setattr(migrate_to_sqlite, 'SOURCES', sources)
+
+    importer = BulkImporter(db, data_dir=data_dir, batch_size=10)
+    with pytest.raises(RuntimeError):
+        importer.run()
+    assert importer._get_progress('notifications') == (20, False)
+    importer.close()
+
+    monkeypatch.undo()
+    importer = BulkImporter(db, data_dir=data_dir, batch_size=10)
+    assert importer.run() == 5
+    importer.close()
+
+    assert len(db.get_notifications_by_user('u')) == 25
+    assert db.allocate_id('notification') == 'N026'
+    with db.get_connection(readonly=True) as conn:
+        names = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'idx_notifications_user_created' in names
+    db.close_all()
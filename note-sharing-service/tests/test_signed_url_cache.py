@@ -0,0 +1,95 @@
+"""
+서명 URL 캐시 테스트
+만료 구간 안에서는 재사용하고 구간이 바뀌면 새로 서명하는지 확인
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from services import gcs_storage_service
+from services.gcs_storage_service import GCSStorageService
+from services.ttl_cache import TTLCache
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+
+    def generate_signed_url(self, version, expiration, method, response_disposition=None, response_type=None):
+        self.bucket.signed.append((self.name, expiration))
+        return f'https://storage.example/{self.name}?n={len(self.bucket.signed)}'
+
+
+class FakeBucket:
+    def __init__(self):
+        self.signed = []
+
+    def blob(self, name, generation=None):
+        return FakeBlob(self, name)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setattr(gcs_storage_service, '_signed_urls', TTLCache(max_entries=1000, ttl_seconds=3600))
+    service = GCSStorageService.__new__(GCSStorageService)  # GCS 클라이언트 없이 생성
+    service.bucket_name = 'test-bucket'
+    service.bucket = FakeBucket()
+    return service
+
+
+def test_signed_urls_reused_within_window(storage, monkeypatch):
+    """같은 만료 구간에서는 서명 없이 재사용, 남은 유효 시간은 절반 이상"""
+    now = 1_700_000_000.0
+    monkeypatch.setattr(gcs_storage_service.time, 'time', lambda: now)
+    paths = [f'storage/thumbnails/M001/page_{i}.jpg' for i in range(1, 201)]
+
+    first = storage.get_signed_urls(paths, expiration=3600)
+    assert list(first) == paths
+    assert len(storage.bucket.signed) == 200
+
+    now += 600
+    second = storage.get_signed_urls(paths, expiration=3600)
+    assert second == first
+    assert len(storage.bucket.signed) == 200
+    assert storage.get_signed_url(paths[0], expiration=3600) == first[paths[0]]
+
+    expires_at = storage.bucket.signed[0][1]
+    remaining = expires_at.timestamp() - now
+    assert 1800 <= remaining <= 3600
+    assert expires_at.tzinfo == timezone.utc
+
+
+def test_signed_urls_rotate_on_new_window(storage, monkeypatch):
+    """구간이 바뀌면 새로 서명, 파일명 지정 URL은 별도로 캐시"""
+    now = 1_700_000_000.0
+    monkeypatch.setattr(gcs_storage_service.time, 'time', lambda: now)
+    url = storage.get_signed_url('storage/a.pdf', expiration=3600)
+
+    assert storage.get_signed_url('storage/a.pdf', expiration=3600,
+                                  response_disposition='attachment') != url
+    now += 1800
+    assert storage.get_signed_url('storage/a.pdf', expiration=3600) != url
+    assert len(storage.bucket.signed) == 3
+    assert storage.get_signed_url_stats()['hits'] == 0
+
+
+def test_signed_url_slot_matches_url_reuse(storage, monkeypatch):
+    """응답 ETag용 구간 번호는 URL을 재사용하는 동안 같고, 새로 서명할 때 함께 바뀜"""
+    now = 1_700_000_000.0
+    monkeypatch.setattr(gcs_storage_service.time, 'time', lambda: now)
+    path = 'storage/thumbnails/M001/page_1.jpg'
+
+    slot, window = storage.signed_url_slot(3600)
+    assert window == 1800
+    url = storage.get_signed_urls([path], expiration=3600)[path]
+    while storage.signed_url_slot(3600)[0] == slot:
+        assert storage.get_signed_urls([path], expiration=3600)[path] == url
+        now += 300
+    assert storage.get_signed_urls([path], expiration=3600)[path] != url
@@ -0,0 +1,145 @@
+"""
+ThumbnailService 테스트
+썸네일 목록이 GCS 목록 API 없이 material_pages에서 페이지 순으로 조회되는지 확인
+"""
+
+import os
+import sys
+
+import pytest
+
+# 프로젝트 루트를 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.database_service import DatabaseService
+from services.thumbnail_service import ThumbnailService
+
+
+class FakeStorage:
+    """GCS 목록 호출 횟수 기록"""
+
+    def __init__(self, files=None):
+        self.files = files or []
+        self.list_calls = 0
+
+    def list_files(self, prefix):
+        self.list_calls += 1
+        return [name for name in self.files if name.startswith(prefix)]
+
+
+class FakePDF:
+    """렌더링 호출 횟수 기록, 지정한 페이지는 업로드 실패로 반환"""
+
+    def __init__(self, pages, failed=()):
+        self.pages = pages
+        self.failed = set(failed)
+        self.render_calls = 0
+        self.rendered_pages = []
+
+    def convert_pdf_to_images_from_gcs(self, gcs_path, material_id, storage, dpi=150, content_hash=None,
+                                       page_numbers=None):
+        self.render_calls += 1
+        numbers = page_numbers or range(1, self.pages + 1)
+        self.rendered_pages.append(list(numbers))
+        return [{
+            'page_number': n,
+            'gcs_path': None if n in self.failed else f"storage/thumbnails/{material_id}/page_{n}.jpg",
+            'width': 100,
+            'height': 140,
+            'byte_size': 10 * n,
+            'render_status': 'failed' if n in self.failed else 'rendered'
+        } for n in numbers]
+
+
+MATERIAL = {'material_id': 'M001', 'gcs_path': 'storage/student/C001/week_1/a.pdf', 'content_hash': None}
+
+
+@pytest.fixture
+def db(tmp_path):
+    service = DatabaseService(str(tmp_path / 'database.db'))
+    yield service
+    service.close_all()
+
+
+def test_manifest_lists_pages_in_numeric_order_without_storage_calls(db):
+    """렌더링 후에는 DB 조회만으로 page_10이 page_2 뒤에 오는 순서로 반환"""
+    storage = FakeStorage()
+    pdf = FakePDF(pages=11)
+    service = ThumbnailService(db, storage, pdf)
+
+    first = service.get_thumbnail_paths(MATERIAL)
+    storage.list_calls = 0
+    second = service.get_thumbnail_paths(MATERIAL)
+
+    expected = [f"storage/thumbnails/M001/page_{n}.jpg" for n in range(1, 12)]
+    assert first == expected
+    assert second == expected
+    assert pdf.render_calls == 1
+    assert storage.list_calls == 0
+    pages = db.get_material_pages('M001')
+    assert pages[9]['page_number'] == 10
+    assert (pages[9]['width'], pages[9]['height'], pages[9]['byte_size']) == (100, 140, 100)
+
+
+def test_legacy_thumbnails_backfilled_once(db):
+    """기록 없는 기존 자료는 GCS 목록을 한 번만 읽어 채우고 이후에는 DB만 조회"""
+    storage = FakeStorage([
+        'storage/thumbnails/M001/page_10.jpg',
+        'storage/thumbnails/M001/page_1.jpg',
+        'storage/thumbnails/M001/page_2.jpg',
+    ])
+    pdf = FakePDF(pages=10)
+    service = ThumbnailService(db, storage, pdf)
+
+    assert service.get_thumbnail_paths(MATERIAL) == [
+        'storage/thumbnails/M001/page_1.jpg',
+        'storage/thumbnails/M001/page_2.jpg',
+        'storage/thumbnails/M001/page_10.jpg',
+    ]
+    service.get_thumbnail_paths(MATERIAL)
+    assert storage.list_calls == 1
+    assert pdf.render_calls == 0
+
+
+def _age_pages(db, seconds):
+    """기록된 렌더링 시각을 과거로 옮김 (재시도 간격 경과 흉내)"""
+    with db.get_connection() as conn:
+        conn.execute("UPDATE material_pages SET rendered_at = datetime(rendered_at, ?)", (f'-{seconds} seconds',))
+
+
+def test_failed_pages_retried_alone_with_backoff(db, monkeypatch):
+    """실패한 페이지만 재시도 간격이 지난 뒤 다시 렌더링하고, 다시 실패하면 간격이 2배로 늘어남"""
+    from config import Config
+
+    monkeypatch.setattr(Config, 'THUMBNAIL_RETRY_INTERVAL', 300)
+    storage = FakeStorage()
+    pdf = FakePDF(pages=3, failed={2})
+    service = ThumbnailService(db, storage, pdf)
+    expected = ['storage/thumbnails/M001/page_1.jpg', 'storage/thumbnails/M001/page_3.jpg']
+
+    assert service.get_thumbnail_paths(MATERIAL) == expected
+    # 재시도 간격 전에는 다시 렌더링하지 않음
+    assert service.get_thumbnail_paths(MATERIAL) == expected
+    assert pdf.rendered_pages == [[1, 2, 3]]
+
+    # 간격이 지나면 실패한 페이지만 재시도, 또 실패하면 attempts 증가
+    _age_pages(db, 301)
+    assert service.get_thumbnail_paths(MATERIAL) == expected
+    assert pdf.rendered_pages == [[1, 2, 3], [2]]
+    assert db.get_material_pages('M001')[1]['attempts'] == 2
+
+    # 두 번째 실패 뒤에는 간격이 600초
+    _age_pages(db, 301)
+    service.get_thumbnail_paths(MATERIAL)
+    assert len(pdf.rendered_pages) == 2
+
+    validator = db.get_material_pages_validator('M001')
+    pdf.failed = set()
+    _age_pages(db, 300)
+    assert len(service.get_thumbnail_paths(MATERIAL)) == 3
+    assert pdf.rendered_pages[-1] == [2]
+    assert [(p['render_status'], p['attempts']) for p in db.get_material_pages('M001')] == [('rendered', 0)] * 3
+    # 다시 렌더링되면 썸네일 목록 ETag 검증값도 바뀜
+    assert db.get_material_pages_validator('M001') != validator
+    # 기록이 없던 첫 조회에서만 GCS 목록 확인
+    assert storage.list_calls == 1
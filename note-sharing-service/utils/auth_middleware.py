@@ -1,13 +1,76 @@
 # -*- coding: utf-8 -*-
 """
-인증 미들웨어 - 세션 또는 헤더 기반 인증
+인증 미들웨어 - 서명 토큰 또는 세션 기반 인증
+(서명 없는 X-User-* 헤더는 AUTH_ALLOW_HEADER_IDENTITY=True 인 개발 환경에서만 허용)
+
+요청 사용자는 요청당 한 번만 확인해 flask.g에 저장하고,
+핸들러는 get_current_user()로 재사용합니다 (핸들러마다 DB 조회하지 않음).
 """
-from flask import session, request, jsonify
+from flask import session, request, jsonify, g, current_app
 from functools import wraps
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from config import Config
+
+_TOKEN_SALT = 'auth-token'
+_db = None  # 사용자 레코드 조회용 (최초 사용 시 생성)
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=_TOKEN_SALT)
+
+def issue_token(user: dict) -> str:
+    """로그인 사용자용 서명 토큰 발급 (user_id, role, email, name 포함)"""
+    return _serializer().dumps({
+        'user_id': user['user_id'],
+        'role': user['role'],
+        'email': user.get('email'),
+        'name': user.get('name')
+    })
+
+def _identity_from_token():
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return None
+    try:
+        return _serializer().loads(auth_header[7:], max_age=Config.AUTH_TOKEN_MAX_AGE)
+    except BadSignature:  # 만료(SignatureExpired) 포함
+        return None
+
+def _identity_from_headers():
+    """서명 없는 X-User-* 헤더 (AUTH_ALLOW_HEADER_IDENTITY=True 인 경우만)"""
+    if not Config.AUTH_ALLOW_HEADER_IDENTITY:
+        return None
+    user_id = request.headers.get('X-User-ID')
+    user_role = request.headers.get('X-User-Role')
+    user_email = request.headers.get('X-User-Email')
+    if user_id and user_role and user_email:
+        return {'user_id': user_id, 'role': user_role, 'email': user_email, 'name': None}
+    return None
+
+def _resolve_identity():
+    """서명 토큰 → 세션 → (개발 환경) 헤더 순으로 요청 사용자 확인"""
+    identity = _identity_from_token()
+    if identity:
+        return identity
+    
+    if 'user_id' in session:
+        return {
+            'user_id': session.get('user_id'),
+            'role': session.get('role'),
+            'email': session.get('email'),
+            'name': session.get('name')
+        }
+    
+    return _identity_from_headers()
+
+def get_identity():
+    """요청 사용자 정보 (요청당 한 번만 확인해 g.identity에 저장, 미인증이면 None)"""
+    if 'identity' not in g:
+        g.identity = _resolve_identity()
+    return g.identity
 
 def check_auth(required_role=None):
     """
-    인증 확인 - 세션 또는 헤더
+    인증 확인 - 서명 토큰 또는 세션 (개발 환경에서는 헤더)
     required_role: 'student', 'professor', None (둘 다 허용)
     
     반환값:
@@ -18,35 +81,44 @@ def check_auth(required_role=None):
     if request.method == 'OPTIONS':
         return ('', 200)
     
-    # 1. 세션 확인
-    if 'user_id' in session:
-        if required_role and session.get('role') != required_role:
-            return jsonify({'success': False, 'message': f'{required_role} 권한이 필요합니다.'}), 403
-        return None
+    identity = get_identity()
+    if not identity:
+        return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
     
-    # 2. 헤더 확인
-    user_id = request.headers.get('X-User-ID')
-    user_role = request.headers.get('X-User-Role')
-    user_email = request.headers.get('X-User-Email')
+    if required_role and identity.get('role') != required_role:
+        return jsonify({'success': False, 'message': f'{required_role} 권한이 필요합니다.'}), 403
     
-    if user_id and user_role and user_email:
-        # 헤더 정보를 세션에 저장
-        session['user_id'] = user_id
-        session['role'] = user_role
-        session['email'] = user_email
-        
-        if required_role and user_role != required_role:
-            return jsonify({'success': False, 'message': f'{required_role} 권한이 필요합니다.'}), 403
-        
-        return None
+    return None
+
+def _get_db():
+    global _db
+    if _db is None:
+        from services.database_service import DatabaseService
+        _db = DatabaseService()
+    return _db
+
+def check_course_access(course):
+    """
+    강의 접근 권한 확인 - 담당 교수 또는 수강 학생 (course_enrollments 조회)
+    check_auth() 통과 후 호출
     
-    return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
+    반환값:
+    - None: 접근 가능
+    - (jsonify Response, status_code): 접근 불가
+    """
+    identity = get_identity()
+    if identity.get('role') == 'professor':
+        if course['professor_id'] == identity['user_id']:
+            return None
+    elif _get_db().is_enrolled(course['course_id'], identity['user_id']):
+        return None
+    return jsonify({'success': False, 'message': '수강 중인 강의만 접근할 수 있습니다.'}), 403
 
 def require_auth(f):
-    """인증 필요 데코레이터 - 세션 또는 헤더 확인"""
+    """인증 필요 데코레이터"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not check_auth():
+        if not get_identity():
             return jsonify({
                 'success': False,
                 'message': '로그인이 필요합니다.'
@@ -56,10 +128,24 @@ def require_auth(f):
     return decorated_function
 
 def get_current_user():
-    """현재 사용자 정보 가져오기"""
-    return {
-        'user_id': session.get('user_id'),
-        'role': session.get('role'),
-        'email': session.get('email')
-    }
+    """
+    현재 사용자 정보 (user_id, role, email, name)
+    
+    토큰/세션에 이름이 없으면 요청당 한 번만 DB(읽기 캐시)에서 채웁니다.
+    """
+    identity = get_identity()
+    if identity is None:
+        return {'user_id': None, 'role': None, 'email': None, 'name': None}
+    if not identity.get('name') and identity.get('user_id'):
+        user = get_current_user_record()
+        identity['name'] = user['name'] if user else None
+    return identity
 
+def get_current_user_record():
+    """현재 사용자의 DB 레코드 (요청당 한 번 조회, 없으면 None)"""
+    if 'user_record' not in g:
+        identity = get_identity()
+        g.user_record = None
+        if identity and identity.get('user_id'):
+            g.user_record = _get_db().get_user_by_id(identity['user_id'])
+    return g.user_record
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+저장소 파일 응답 유틸리티 (청크 스트리밍 / 서명 URL 리다이렉트)
+
+응답 본문은 제너레이터로 청크 단위 전송하므로 파일 크기와 무관하게 메모리 사용이 일정하고
+임시 파일을 만들지 않습니다.
+"""
+import os
+from datetime import datetime
+from urllib.parse import quote
+from flask import Response, jsonify, redirect, request
+from werkzeug.datastructures import ContentRange
+from config import Config
+from utils.http_cache import NO_CACHE, make_etag, not_modified, with_validators
+
+_LOCAL_READ_SIZE = 64 * 1024  # 디스크 캐시 파일 읽기 단위
+
+def content_disposition(filename: str, as_attachment: bool = True) -> str:
+    """
+    Content-Disposition 헤더 값 (한글 파일명은 RFC 5987 filename*로 전달)
+
+    ASCII가 아닌 문자는 filename에서 '_'로 바꾼 대체 이름을 함께 넣습니다.
+    """
+    disposition = 'attachment' if as_attachment else 'inline'
+    fallback = ''.join(c if 32 <= ord(c) < 127 and c not in '"\\' else '_' for c in filename)
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+def _redirect_to_signed_url(storage, gcs_path: str, download_name: str, as_attachment: bool):
+    """파일명을 담은 짧은 수명의 서명 URL로 302 (서명 실패 시 None)"""
+    url = storage.get_signed_url(
+        gcs_path,
+        expiration=Config.SIGNED_URL_REDIRECT_TTL,
+        response_disposition=content_disposition(download_name, as_attachment),
+        response_type='application/pdf'
+    )
+    if not url:
+        print(f"[WARNING] 서명 URL 생성 실패, 직접 전송으로 대체: {gcs_path}")
+        return None
+    response = redirect(url, code=302)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+def _iter_local(f, start: int, stop: int):
+    """디스크 캐시 파일의 [start, stop) 구간을 나눠 반환 (응답이 끝나면 파일 닫음)"""
+    with f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = f.read(min(_LOCAL_READ_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def _requested_range(size: int, etag: str, last_modified: datetime = None):
+    """
+    요청의 Range 헤더 해석
+
+    Returns:
+        (start, stop, partial) 또는 만족할 수 없는 범위면 None
+        (여러 구간 요청, bytes 외 단위, If-Range 불일치는 전체 응답으로 처리)
+    """
+    rng = request.range
+    if rng is None or rng.units != 'bytes' or len(rng.ranges) != 1:
+        return 0, size, False
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return 0, size, False
+    if if_range.date is not None and (last_modified is None or
+                                      last_modified.replace(microsecond=0) > if_range.date):
+        return 0, size, False
+    bounds = rng.range_for_length(size)
+    if bounds is None:
+        return None
+    return bounds[0], bounds[1], True
+
+def stream_storage_file(storage, gcs_path: str, download_name: str,
+                        as_attachment: bool = False, content_hash: str = None,
+                        last_modified: datetime = None):
+    """
+    저장소 파일을 Range(206 Partial Content)와 조건부 GET(304)을 지원하며 스트리밍 응답
+
+    디스크 캐시에 있으면 캐시 파일에서, 없으면 GCS 범위 읽기로 전송합니다 (첫 바이트까지의 시간이
+    파일 크기와 무관). 전체 요청이면 보내는 바이트로 캐시를 함께 채우고, Range 요청은 요청 구간만 읽고
+    캐시는 채우지 않습니다 (GCS에서 같은 객체를 두 번 받지 않음).
+    redirect 모드에서는 서명 URL로 302 (GCS가 Range를 직접 처리).
+
+    ETag는 내용 해시(있으면) 또는 GCS 경로 + generation입니다.
+    내용 해시가 있으면 저장소를 조회하기 전에 304를 판단합니다.
+    """
+    if Config.MATERIAL_DELIVERY_MODE == 'redirect':
+        response = _redirect_to_signed_url(storage, gcs_path, download_name, as_attachment)
+        if response is not None:
+            return response
+
+    # 내용 해시가 있으면 내용이 바뀌지 않으므로 브라우저 캐시 허용
+    cache_control = f'private, max-age={Config.MATERIAL_MAX_AGE}' if content_hash else NO_CACHE
+    if content_hash:
+        response = not_modified(content_hash, last_modified, cache_control)
+        if response is not None:
+            return response
+
+    cached = storage.open_cached(gcs_path, content_hash)
+    generation = None
+    if cached is not None and content_hash:
+        size = os.fstat(cached.fileno()).st_size
+    else:
+        info = storage.get_blob_info(gcs_path)
+        if info is None:
+            if cached is not None:
+                cached.close()
+            return jsonify({'success': False, 'message': 'GCS 다운로드 실패'}), 500
+        size, generation = info
+        if cached is not None:
+            size = os.fstat(cached.fileno()).st_size
+
+    etag = content_hash or make_etag(gcs_path, generation)
+    if not content_hash:
+        response = not_modified(etag, last_modified, cache_control)
+        if response is not None:
+            if cached is not None:
+                cached.close()
+            return response
+
+    bounds = _requested_range(size, etag, last_modified)
+    if bounds is None:
+        if cached is not None:
+            cached.close()
+        response = Response(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
+    start, stop, partial = bounds
+
+    if cached is not None:
+        body = _iter_local(cached, start, stop)
+    elif partial:
+        body = storage.iter_range(gcs_path, start, stop, generation=generation)
+    else:
+        body = storage.iter_and_cache(gcs_path, size, generation=generation, content_hash=content_hash)
+
+    response = Response(body, status=206 if partial else 200,
+                        mimetype='application/pdf', direct_passthrough=True)
+    response.content_length = stop - start
+    if partial:
+        response.content_range = ContentRange('bytes', start, stop, size)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Disposition'] = content_disposition(download_name, as_attachment)
+    return with_validators(response, etag, last_modified, cache_control)
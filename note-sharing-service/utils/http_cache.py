@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+조건부 GET(ETag / Last-Modified)과 Cache-Control 유틸리티
+
+핸들러는 응답 본문을 만들기 전에 검증값으로 not_modified()를 확인해
+일치하면 304를 바로 반환합니다 (목록 조회/직렬화 생략).
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+from flask import Response, request
+
+# 엔드포인트별 Cache-Control 정책
+NO_CACHE = 'private, no-cache'  # 매번 재검증 (목록 등 자주 바뀌는 응답)
+
+def make_etag(*parts) -> str:
+    """검증값 조각들로 ETag 문자열 생성"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def parse_db_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """SQLite CURRENT_TIMESTAMP 문자열(UTC) → timezone 포함 datetime (해석 불가면 None)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '')).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def with_validators(response: Response, etag: str, last_modified: datetime = None,
+                    cache_control: str = NO_CACHE, weak: bool = False) -> Response:
+    """응답에 ETag / Last-Modified / Cache-Control 설정"""
+    response.set_etag(etag, weak=weak)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def is_not_modified(etag: str, last_modified: datetime = None) -> bool:
+    """
+    요청의 조건부 헤더가 현재 검증값과 일치하는지 확인
+
+    If-None-Match가 있으면 그것만 비교하고 (RFC 9110), 없을 때만 If-Modified-Since를 비교합니다.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def not_modified(etag: str, last_modified: datetime = None,
+                 cache_control: str = NO_CACHE, weak: bool = False) -> Optional[Response]:
+    """조건부 요청이 일치하면 304 응답, 아니면 None"""
+    if not is_not_modified(etag, last_modified):
+        return None
+    return with_validators(Response(status=304), etag, last_modified, cache_control, weak)
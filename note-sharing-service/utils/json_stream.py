@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+대용량 JSON 파일 스트리밍 읽기 유틸리티
+"""
+import json
+import re
+from typing import Iterator
+
+_SEPARATORS = ' \t\r\n,'
+
+def iter_json_array(path: str, key: str, chunk_size: int = 1 << 16) -> Iterator:
+    """
+    {"key": [...]} 형태 파일의 배열 항목을 하나씩 읽어 반환 (파일 전체를 메모리에 올리지 않음)
+
+    Args:
+        path: JSON 파일 경로
+        key: 배열이 들어 있는 최상위 키 (없으면 빈 목록으로 취급)
+        chunk_size: 한 번에 읽을 문자 수
+
+    Raises:
+        ValueError: 배열이 닫히지 않은 채 파일이 끝난 경우
+        json.JSONDecodeError: 항목 형식 오류
+    """
+    decoder = json.JSONDecoder()
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        eof = False
+
+        # 배열 시작 위치 찾기
+        while True:
+            match = start.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+        pos = 0
+        while True:
+            # 항목 사이의 공백/쉼표 건너뛰기
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f'{path}: "{key}" 배열이 닫히지 않았습니다.')
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = chunk, 0
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 항목이 청크 경계에 걸친 경우 더 읽고 다시 시도
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+
+            yield item
+            pos = end
+            if pos >= chunk_size:
+                buffer, pos = buffer[pos:], 0
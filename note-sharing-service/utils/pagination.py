@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+keyset(커서) 페이지네이션 유틸리티
+"""
+import base64
+import json
+from flask import request
+
+def encode_cursor(*values) -> str:
+    """정렬 키 값들을 URL에 넣을 수 있는 불투명한 커서 문자열로 변환"""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, size: int) -> tuple:
+    """
+    커서 문자열을 정렬 키 튜플로 복원
+
+    Raises:
+        ValueError: 형식이 잘못된 커서
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError('잘못된 커서입니다.')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('잘못된 커서입니다.')
+    return tuple(values)
+
+def get_page_args(default_limit: int, max_limit: int, cursor_size: int):
+    """
+    요청의 ?limit=&cursor= 파라미터 해석
+
+    Returns:
+        (limit, after) - after는 커서가 없으면 None
+
+    Raises:
+        ValueError: limit 또는 cursor 형식 오류
+    """
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except (TypeError, ValueError):
+        raise ValueError('limit은 숫자여야 합니다.')
+    limit = max(1, min(limit, max_limit))
+
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor, cursor_size) if cursor else None
+    return limit, after